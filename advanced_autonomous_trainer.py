@@ -16,6 +16,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import numpy as np
 from improved_dual_personality_chatbot import ImprovedDualPersonalityChatbot
+from market_data_client import api_base
 
 class AdvancedAutonomousTrainer:
     def __init__(self, chatbot: ImprovedDualPersonalityChatbot):
@@ -90,7 +91,7 @@ class AdvancedAutonomousTrainer:
         try:
             # Get trending cryptocurrencies
             trending_response = requests.get(
-                "https://api.coingecko.com/api/v3/search/trending",
+                f"{api_base('coingecko')}/search/trending",
                 timeout=10
             )
             if trending_response.status_code == 200:
@@ -98,7 +99,7 @@ class AdvancedAutonomousTrainer:
             
             # Get top market data
             market_response = requests.get(
-                "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=10&page=1",
+                f"{api_base('coingecko')}/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=10&page=1",
                 timeout=10
             )
             if market_response.status_code == 200:
@@ -215,13 +216,14 @@ class AdvancedAutonomousTrainer:
                 
                 # Train on scenarios
                 session_scores = []
-                for scenario in training_scenarios[:5]:  # Limit to 5 per cycle
-                    question = scenario["question"]
+                questions = [scenario["question"] for scenario in training_scenarios[:5]]  # Limit to 5 per cycle
+                
+                # Get responses from chatbot in one batch
+                responses = self.chatbot.get_responses(questions)
+                
+                for question, response in zip(questions, responses):
                     print(f"🤔 Training on: {question}")
                     
-                    # Get response from chatbot
-                    response = self.chatbot.get_response(question)
-                    
                     # Evaluate response quality
                     quality_score = self.self_evaluate_response(question, response)
                     session_scores.append(quality_score)
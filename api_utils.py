@@ -1,7 +1,16 @@
-import time
-from pycoingecko import CoinGeckoAPI
 import logging
+import sqlite3
+import time
 import requests
+from circuit_breaker import CircuitOpenError, call_all, get_breaker, hedged_call
+from coin_registry import resolve_coin_id
+from market_data_client import api_base, get_market_data_client, run_in_thread
+from market_frame import MarketFrame
+from market_snapshot import snapshot_price
+from market_store import format_age, get_market_store
+from price_coalescer import PriceCoalescer
+from price_feed import feed_price
+from rate_limiter import get_limiter
 
 # Optional KuCoin import with graceful fallback
 try:
@@ -12,7 +21,7 @@ except (ImportError, ModuleNotFoundError, Exception) as e:
     KUCOIN_AVAILABLE = False
     print(f"⚠️ KuCoin API not available: {e}")
 
-RATE_LIMIT_DELAY = 0.5  # Reduced delay for faster responses
+RATE_LIMIT_DELAY = 0.5  # Legacy fixed delay; upstream calls now draw from rate_limiter buckets
 API_TIMEOUT = 5  # Reduced timeout
 
 # Set up logger for non-Streamlit environments
@@ -20,15 +29,27 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 # Global API instances
-_coingecko_api = None
 _crypto_apis = None
 
-def _get_coingecko_api():
-    """Get or create CoinGecko API instance"""
-    global _coingecko_api
-    if _coingecko_api is None:
-        _coingecko_api = CoinGeckoAPI()
-    return _coingecko_api
+def _fetch_prices(coin_ids):
+    """One rate-limited multi-id CoinGecko price request, failing fast while CoinGecko's breaker is open"""
+    breaker = get_breaker('coingecko')
+    if breaker.rejecting():
+        raise CircuitOpenError("coingecko circuit is open")
+    
+    # Wait for a token only when the CoinGecko budget is spent; give up past the API timeout
+    get_limiter('coingecko').acquire(timeout=API_TIMEOUT)
+    prices = breaker.call(get_market_data_client().get_prices, coin_ids)
+    
+    # Write through so restarts and outages can fall back to last-known prices
+    try:
+        get_market_store().save_prices(prices)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not persist prices: {e}")
+    return prices
+
+# Concurrent lookups within a few ms share one batched request
+_price_coalescer = PriceCoalescer(_fetch_prices)
 
 def get_crypto_price(coin_id: str):
     """Get current price for a cryptocurrency with better error handling"""
@@ -36,28 +57,34 @@ def get_crypto_price(coin_id: str):
         # Quick return for invalid requests
         if not coin_id or len(coin_id) < 2:
             return None
-            
-        api = _get_coingecko_api()
-        time.sleep(RATE_LIMIT_DELAY)
         
-        # Try exact ID first with timeout protection
+        # Accept symbols and aliases ('btc', 'pi coin') as well as CoinGecko ids
+        coin_id = resolve_coin_id(coin_id) or coin_id
+        
+        # A fresh streamed tick or background market snapshot answers without any request
+        price = feed_price(coin_id) or snapshot_price(coin_id)
+        if price:
+            return price
+        
+        # The pooled session already retried transient errors with backoff
         try:
-            result = api.get_price(ids=[coin_id], vs_currencies=['usd'])
-            if coin_id in result and 'usd' in result[coin_id]:
-                return result[coin_id]['usd']
-        except Exception as e:
+            return _price_coalescer.get(coin_id)
+        except requests.RequestException as e:
             logger.debug(f"Direct price lookup failed for {coin_id}: {e}")
-            # Quick fail for common issues
-            if "timeout" in str(e).lower() or "connection" in str(e).lower():
-                return None
-        
-        # Skip search if we've already failed (avoid double timeout)
-        return None
+            return None
         
     except Exception as e:
         logger.warning(f"Error fetching price for {coin_id}: {e}")
         return None
 
+async def get_crypto_price_async(coin_id: str):
+    """Non-blocking get_crypto_price for async callers such as the FastAPI server"""
+    return await run_in_thread(get_crypto_price, coin_id)
+
+def get_price_coalescing_stats():
+    """Lookup, coalesced-lookup and batch counters for live price requests"""
+    return _price_coalescer.stats()
+
 def get_crypto_info(coin_id: str):
     """Get detailed info for a cryptocurrency with better error handling"""
     try:
@@ -103,18 +130,23 @@ def get_crypto_news(limit: int = 5):
         return []
 
 class CryptoAPIs:
-    def __init__(self):
+    """Market listings merged from CoinGecko and (optionally) KuCoin"""
+
+    def __init__(self, hedge: bool = False):
+        """Set up the API clients; with hedge, KuCoin is only asked when CoinGecko is slow or failing"""
+        self.hedge = hedge
         self.apis = {}
         self.initialize_apis()
     
     def initialize_apis(self):
+        """Attach the shared pooled CoinGecko client and the optional KuCoin client"""
         try:
             # CoinGecko API
-            self.apis['coingecko'] = CoinGeckoAPI()
+            self.apis['coingecko'] = get_market_data_client()
             
             # KuCoin API (optional)
             if KUCOIN_AVAILABLE and Market:
-                self.apis['kucoin'] = Market()
+                self.apis['kucoin'] = Market(url=api_base('kucoin'))
                 print("✅ KuCoin API initialized")
             else:
                 self.apis['kucoin'] = None
@@ -126,76 +158,92 @@ class CryptoAPIs:
             return False
 
     def get_markets_data(self):
-        all_markets = []
-        
-        # Try CoinGecko
-        try:
-            time.sleep(RATE_LIMIT_DELAY)
-            markets = self.apis['coingecko'].get_coins_markets(
-                vs_currency='usd',
-                order='market_cap_desc',
-                per_page=250,
-                sparkline=False,
-                price_change_percentage='24h'
-            )
-            if markets:
-                all_markets.extend(markets)
-        except Exception as e:
-            logger.warning(f"CoinGecko API error: {str(e)}")        # Try KuCoin (if available)
+        """Top CoinGecko markets merged with KuCoin USDT pairs, sorted by market cap"""
+        frame = self.get_market_frame()
+        return frame.records(frame.top(len(frame)))
+
+    async def get_markets_data_async(self):
+        """Non-blocking get_markets_data"""
+        frame = await self.get_market_frame_async()
+        return frame.records(frame.top(len(frame)))
+
+    def get_market_frame(self):
+        """Top CoinGecko markets merged with KuCoin USDT pairs as a columnar MarketFrame"""
+        providers = [('coingecko', self.fetch_coingecko_markets)]
         if self.apis.get('kucoin') is not None:
+            providers.append(('kucoin', self.fetch_kucoin_markets))
+        else:
+            logger.info("KuCoin API not available - using CoinGecko data only")
+        
+        if self.hedge:
+            # Ask KuCoin only when CoinGecko is slower than its p95, failing or tripped
             try:
-                time.sleep(RATE_LIMIT_DELAY)
-                kucoin_markets = self.apis['kucoin'].get_all_tickers()
-                if kucoin_markets and 'ticker' in kucoin_markets:
-                    for ticker in kucoin_markets['ticker']:
-                        if ticker['symbol'].endswith('USDT'):
-                            try:
-                                last_price = float(ticker.get('last', 0))
-                                volume = float(ticker.get('vol', 0))
-                                if last_price and volume:  # Only add if valid numbers
-                                    symbol = ticker['symbol'].replace('-USDT', '')
-                                    all_markets.append({
-                                        'id': symbol.lower(),
-                                        'symbol': symbol,
-                                        'name': symbol,
-                                        'current_price': last_price,
-                                        'price_change_percentage_24h': float(ticker.get('changeRate', 0)) * 100,
-                                        'market_cap': volume * last_price,
-                                        'total_volume': volume
-                                    })
-                            except (TypeError, ValueError) as e:
-                                continue  # Skip this ticker if number conversion fails
+                results, errors = hedged_call(providers), {}
             except Exception as e:
-                logger.warning(f"KuCoin API error: {str(e)}")
+                results, errors = {}, {'all providers': e}
         else:
-            logger.info("KuCoin API not available - using CoinGecko data only")
-
-        # Deduplicate and sort by market cap
-        if all_markets:
-            seen = set()
-            unique_markets = []
-            for market in all_markets:
-                if market['id'] not in seen:
-                    seen.add(market['id'])
-                    unique_markets.append(market)
-            return sorted(unique_markets, key=lambda x: x.get('market_cap', 0), reverse=True)
+            # Providers run concurrently, so latency is the slowest healthy one rather than the sum
+            results, errors = call_all(providers)
         
-        return []
+        for name, error in errors.items():
+            logger.warning(f"{name} market data error: {str(error)}")
+        return self.merge_markets(results.get('coingecko'), results.get('kucoin'))
+
+    async def get_market_frame_async(self):
+        """Non-blocking get_market_frame"""
+        return await run_in_thread(self.get_market_frame)
+
+    def fetch_coingecko_markets(self):
+        """Rate-limited top-250 CoinGecko markets, raising on errors"""
+        get_limiter('coingecko').acquire(timeout=API_TIMEOUT)
+        return self.apis['coingecko'].get_markets(per_page=250)
+
+    def fetch_kucoin_markets(self):
+        """KuCoin USDT pairs in CoinGecko market format, raising on errors"""
+        get_limiter('kucoin').acquire(timeout=API_TIMEOUT)
+        kucoin_markets = self.apis['kucoin'].get_all_tickers()
+        kucoin_markets_data = []
+        if kucoin_markets and 'ticker' in kucoin_markets:
+            for ticker in kucoin_markets['ticker']:
+                if ticker['symbol'].endswith('USDT'):
+                    try:
+                        last_price = float(ticker.get('last', 0))
+                        volume = float(ticker.get('vol', 0))
+                        if last_price and volume:  # Only add if valid numbers
+                            symbol = ticker['symbol'].replace('-USDT', '')
+                            kucoin_markets_data.append({
+                                'id': symbol.lower(),
+                                'symbol': symbol,
+                                'name': symbol,
+                                'current_price': last_price,
+                                'price_change_percentage_24h': float(ticker.get('changeRate', 0)) * 100,
+                                'market_cap': volume * last_price,
+                                'total_volume': volume
+                            })
+                    except (TypeError, ValueError) as e:
+                        continue  # Skip this ticker if number conversion fails
+        return kucoin_markets_data
+
+    @staticmethod
+    def merge_markets(*sources):
+        """Columnar frame of the sources' markets, deduplicated by id (earlier sources win)"""
+        return MarketFrame([market for markets in sources for market in markets or []])
 
     def get_coin_price(self, coin_id):
+        """Market entry (price, cap, 24h change) for one coin"""
         try:
-            time.sleep(RATE_LIMIT_DELAY)
-            markets = self.apis['coingecko'].get_coins_markets(
-                vs_currency='usd',
-                ids=[coin_id],
-                per_page=1
-            )
+            get_limiter('coingecko').acquire(timeout=API_TIMEOUT)
+            markets = get_breaker('coingecko').call(self.apis['coingecko'].get_markets, per_page=1, ids=[coin_id])
             if markets:
                 return markets[0]
         except Exception as e:
             logger.warning(f"CoinGecko API error: {str(e)}")
         return None
 
+    async def get_coin_price_async(self, coin_id):
+        """Non-blocking get_coin_price"""
+        return await run_in_thread(self.get_coin_price, coin_id)
+
 # Fallback static data for common cryptocurrencies
 STATIC_CRYPTO_DATA = {
     'bitcoin': {
@@ -220,16 +268,55 @@ STATIC_CRYPTO_DATA = {
     }
 }
 
+def get_last_known_price(coin_id: str):
+    """Last persisted (price, age in seconds) for a coin, or None"""
+    try:
+        stored = get_market_store().load_price(resolve_coin_id(coin_id) or coin_id.lower())
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read persisted prices: {e}")
+        return None
+    if not stored:
+        return None
+    price, updated = stored
+    return price, time.time() - updated
+
 def get_static_crypto_info(coin_id: str):
-    """Get static information for common cryptocurrencies"""
-    coin_data = STATIC_CRYPTO_DATA.get(coin_id.lower())
-    if coin_data:
-        return {
-            'name': coin_data['name'],
-            'symbol': coin_data['symbol'],
-            'current_price': 0,
-            'market_cap': 0,
-            'price_change_24h': 0,
-            'description': coin_data['description'] + " (Note: Live price data unavailable - check CoinGecko or CoinMarketCap for current prices.)"
-        }
-    return None
\ No newline at end of file
+    """Get static information for common cryptocurrencies, with last-known market data when persisted"""
+    coin_id = resolve_coin_id(coin_id) or coin_id.lower()
+    coin_data = STATIC_CRYPTO_DATA.get(coin_id)
+    
+    try:
+        stored = get_market_store().load_coin(coin_id)
+        last_price = get_market_store().load_price(coin_id)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not read persisted market data: {e}")
+        stored = last_price = None
+    if not coin_data and not stored:
+        return None
+    
+    market = stored[0] if stored else {}
+    info = {
+        'name': coin_data['name'] if coin_data else market.get('name', coin_id),
+        'symbol': coin_data['symbol'] if coin_data else str(market.get('symbol', '')).upper(),
+        'current_price': 0,
+        'market_cap': 0,
+        'price_change_24h': 0,
+        'description': coin_data['description'] if coin_data else f"{market.get('name', coin_id)} is a listed cryptocurrency."
+    }
+    
+    # Prefer the newest of the stored market entry and the stored price
+    if stored and (not last_price or stored[1] >= last_price[1]):
+        info.update({
+            'current_price': market.get('current_price') or 0,
+            'market_cap': market.get('market_cap') or 0,
+            'price_change_24h': market.get('price_change_percentage_24h') or 0,
+            'data_age': time.time() - stored[1]
+        })
+    elif last_price:
+        info.update({'current_price': last_price[0], 'data_age': time.time() - last_price[1]})
+    
+    if 'data_age' in info:
+        info['description'] += f" (Note: Live data unavailable - showing last known market data from {format_age(info['data_age'])} ago.)"
+    else:
+        info['description'] += " (Note: Live price data unavailable - check CoinGecko or CoinMarketCap for current prices.)"
+    return info
\ No newline at end of file
@@ -249,15 +249,15 @@ class AutonomousTrainingSystem:
             
             print(f"   Training on: {category}")
             
-            for question in questions:
-                # Test both personalities
-                for personality in ['normal', 'subzero']:
-                    # Switch personality
-                    self.chatbot.switch_personality(personality)
-                    
-                    # Get response
-                    response = self.chatbot.get_response(question)
-                    
+            # Test both personalities
+            for personality in ['normal', 'subzero']:
+                # Switch personality
+                self.chatbot.switch_personality(personality)
+                
+                # Get responses for all questions in one batch
+                responses = self.chatbot.get_responses(questions)
+                
+                for question, response in zip(questions, responses):
                     # Evaluate response quality
                     quality_score = self._evaluate_response_quality(
                         question, response['message'], expected_quality
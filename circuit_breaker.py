@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker - Per-provider health tracking and hedged requests
+Each upstream provider gets a breaker that opens when its recent error rate or
+slow-call rate crosses a threshold, fails fast while open, and lets a trial
+call through after a cool-down (half-open). hedged_call queries providers in
+preference order, starting the next one only when the current one has not
+answered within its p95 latency, so a degraded provider costs at most that
+delay instead of its full timeout
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+WINDOW_SIZE = 20  # recent calls considered for the error and slow-call rates
+MIN_CALLS = 5  # calls needed in the window before the breaker may open
+FAILURE_RATE_THRESHOLD = 0.5
+SLOW_CALL_THRESHOLD = 3.0  # seconds
+SLOW_RATE_THRESHOLD = 0.8
+OPEN_DURATION = 30.0  # seconds before an open breaker lets a trial call through
+
+DEFAULT_HEDGE_DELAY = 1.0  # seconds, until a provider has latency history
+MIN_HEDGE_DELAY = 0.05
+MAX_HEDGE_DELAY = 5.0
+LATENCY_SAMPLES = 100
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by recent error and slow-call rates"""
+
+    def __init__(self, name: str, window_size: int = WINDOW_SIZE, min_calls: int = MIN_CALLS,
+                 failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+                 slow_call_threshold: float = SLOW_CALL_THRESHOLD, slow_rate_threshold: float = SLOW_RATE_THRESHOLD,
+                 open_duration: float = OPEN_DURATION, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_duration = open_duration
+        self.clock = clock
+        self.state = CLOSED
+        self._calls = deque(maxlen=window_size)  # (failed, slow)
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)  # successful call durations
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (an open breaker admits one trial after its cool-down)"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.open_duration:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def rejecting(self) -> bool:
+        """Whether the breaker is open and still cooling down (read-only check)"""
+        with self._lock:
+            return self.state == OPEN and self.clock() - self._opened_at < self.open_duration
+
+    def record(self, success: bool, latency: float):
+        """Record a finished call and move between states"""
+        slow = latency >= self.slow_call_threshold
+        with self._lock:
+            if success:
+                self._latencies.append(latency)
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open()
+                return
+
+            self._calls.append((not success, slow))
+            if len(self._calls) >= self.min_calls:
+                failures = sum(failed for failed, _ in self._calls) / len(self._calls)
+                slow_calls = sum(was_slow for _, was_slow in self._calls) / len(self._calls)
+                if failures >= self.failure_rate_threshold or slow_calls >= self.slow_rate_threshold:
+                    self._open()
+
+    def _open(self):
+        """Trip the breaker (lock held)"""
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._trial_running = False
+        self._calls.clear()
+        self.opened += 1
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run fn through the breaker, raising CircuitOpenError when it is open"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        start = self.clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, self.clock() - start)
+            raise
+        self.record(True, self.clock() - start)
+        return result
+
+    def latency_quantile(self, q: float = 0.95) -> Optional[float]:
+        """Latency quantile of recent successful calls, or None without history"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def hedge_delay(self) -> float:
+        """How long to wait on this provider before also asking the next one"""
+        p95 = self.latency_quantile(0.95)
+        delay = DEFAULT_HEDGE_DELAY if p95 is None else p95
+        return min(MAX_HEDGE_DELAY, max(MIN_HEDGE_DELAY, delay))
+
+    def stats(self) -> Dict:
+        """State, window rates, latency and rejection counters"""
+        with self._lock:
+            calls = list(self._calls)
+        p95 = self.latency_quantile(0.95)
+        return {
+            'state': self.state,
+            'window_calls': len(calls),
+            'failure_rate': round(sum(failed for failed, _ in calls) / len(calls), 3) if calls else 0.0,
+            'slow_rate': round(sum(slow for _, slow in calls) / len(calls), 3) if calls else 0.0,
+            'p95_latency': round(p95, 3) if p95 is not None else None,
+            'rejected': self.rejected,
+            'opened': self.opened,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Shared breaker for a provider"""
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+
+def get_breaker_stats() -> Dict[str, Dict]:
+    """Stats for every provider breaker created so far"""
+    with _breakers_lock:
+        return {provider: breaker.stats() for provider, breaker in _breakers.items()}
+
+
+def call_all(providers: List[Tuple[str, Callable[[], Any]]],
+             breakers: Optional[Dict[str, CircuitBreaker]] = None,
+             executor: ThreadPoolExecutor = _hedge_executor) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+    """Query every provider concurrently through its breaker, returning (results, errors) by name"""
+    breakers = breakers if breakers is not None else {name: get_breaker(name) for name, _ in providers}
+    futures = {executor.submit(breakers[name].call, fn): name for name, fn in providers}
+    results, errors = {}, {}
+    for future, name in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = e
+    return results, errors
+
+
+def hedged_call(providers: List[Tuple[str, Callable[[], Any]]],
+                breakers: Optional[Dict[str, CircuitBreaker]] = None,
+                executor: ThreadPoolExecutor = _hedge_executor) -> Dict[str, Any]:
+    """Results of the first provider to succeed, plus any other that already succeeded by then
+
+    Providers are tried in preference order; the next one starts when the
+    current one fails, is skipped by its open breaker, or has not answered
+    within its hedge delay. Raises the last error when every provider fails.
+    """
+    breakers = breakers if breakers is not None else {name: get_breaker(name) for name, _ in providers}
+    pending = {}
+    results = {}
+    last_error: Exception = CircuitOpenError("no provider available")
+    remaining = list(providers)
+
+    while remaining or pending:
+        # Start the next provider its breaker allows
+        delay = None
+        while remaining and delay is None:
+            name, fn = remaining.pop(0)
+            breaker = breakers[name]
+            if breaker.allow():
+                pending[executor.submit(_timed, fn)] = name
+                delay = breaker.hedge_delay()
+            else:
+                last_error = CircuitOpenError(f"{name} circuit is open")
+
+        if not pending:
+            break
+        done, _ = wait(pending, timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            success, value, latency = future.result()
+            breakers[name].record(success, latency)
+            if success:
+                results[name] = value
+            else:
+                last_error = value
+
+        if results:
+            # Keep answers that are already in; never wait for the slower providers
+            for future in [future for future in pending if future.done()]:
+                name = pending.pop(future)
+                success, value, latency = future.result()
+                breakers[name].record(success, latency)
+                if success:
+                    results[name] = value
+            for future, name in pending.items():
+                future.add_done_callback(lambda f, breaker=breakers[name]: breaker.record(f.result()[0], f.result()[2]))
+            return results
+
+    raise last_error
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[bool, Any, float]:
+    """Run fn, returning (succeeded, result or exception, seconds taken)"""
+    start = time.monotonic()
+    try:
+        return True, fn(), time.monotonic() - start
+    except Exception as e:
+        return False, e, time.monotonic() - start
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Coin Registry - One alias index for every asset the bot can recognize
+Loads an offline snapshot of the CoinGecko coin list (id, symbol, name,
+aliases) into a hash index for O(1) id/symbol/alias resolution and a token
+trie for longest-match scanning of user input, so recognizing thousands of
+assets costs no more per request than recognizing a handful
+
+The bundled snapshot is a placeholder of the top ~160 coins with curated
+aliases until `python coin_registry.py --refresh` pulls the full 10k+ list;
+unknown names resolve to None and price lookups use them as live CoinGecko ids
+"""
+
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+SNAPSHOT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coin_registry_snapshot.json')
+COINGECKO_API = 'https://api.coingecko.com/api/v3'
+
+# Only the highest-ranked coins are read out of free text; the long tail of
+# tickers collides with everyday words but still resolves by explicit lookup
+SCAN_MAX_PRIORITY = 500
+
+# Aliases that are everyday words or too short to mean a coin in free text
+FREE_TEXT_EXCLUDED = {
+    'one', 'near', 'link', 'flow', 'dash', 'sand', 'mana', 'ape', 'magic', 'not', 'hot', 'uni', 'comp',
+    'band', 'uma', 'bal', 'hive', 'nano', 'gala', 'icon', 'wax', 'blur', 'ocean', 'frax', 'render',
+    'stacks', 'maker', 'quant', 'audio', 'golem', 'celo', 'verge', 'waves', 'sushi', 'bonk',
+    'op', 'ar', 'zk', 'sc', 'the', 'dai', 'sei', 'sui', 'eos', 'neo', 'ton', 'leo', 'gmx', 'bat',
+}
+
+# Trie key holding the coin id where an alias ends; never equal to a token
+TERMINAL = object()
+
+
+def alias_tokens(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens shared by alias keys and input scanning"""
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def alias_key(text: str) -> str:
+    """Normalized hash key for an id, symbol, name or alias"""
+    return ' '.join(alias_tokens(text))
+
+
+class CoinRegistry:
+    """Hash and trie index over coin ids, symbols, names and aliases"""
+
+    def __init__(self, coins: List[Dict], scan_max_priority: Optional[int] = SCAN_MAX_PRIORITY):
+        self.coins: Dict[str, Dict] = {}
+        self._lookup: Dict[str, str] = {}
+        self._trie: Dict = {}
+
+        # Coins arrive in priority (market cap) order: on alias collisions the first one wins
+        for priority, coin in enumerate(coins):
+            coin_id = coin['id']
+            if coin_id in self.coins:
+                continue
+            entry = {
+                'id': coin_id,
+                'symbol': coin.get('symbol', '').lower(),
+                'name': coin.get('name', coin_id),
+                'aliases': list(coin.get('aliases', [])),
+                'priority': priority,
+            }
+            self.coins[coin_id] = entry
+
+            scannable = scan_max_priority is None or priority < scan_max_priority
+            for alias in [coin_id, entry['symbol'], entry['name']] + entry['aliases']:
+                key = alias_key(alias)
+                if not key:
+                    continue
+                self._lookup.setdefault(key, coin_id)
+                if scannable and key not in FREE_TEXT_EXCLUDED:
+                    self._insert(key.split(), coin_id)
+
+    def _insert(self, tokens: List[str], coin_id: str):
+        """Add an alias token sequence to the scanning trie"""
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(TERMINAL, coin_id)
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def __contains__(self, coin_id: str) -> bool:
+        return coin_id in self.coins
+
+    def get(self, coin_id: str) -> Optional[Dict]:
+        """Registry entry (id, symbol, name, aliases, priority) for a coin id"""
+        return self.coins.get(coin_id)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Coin id for any id, symbol, name or alias ('BTC', 'pi coin', 'shiba-inu')"""
+        if not name:
+            return None
+        return self._lookup.get(alias_key(name))
+
+    def recognize(self, word: str) -> Optional[str]:
+        """Coin id when a single free-text word names a scannable coin"""
+        found = self.scan(word)
+        return found[0] if len(found) == 1 else None
+
+    def scan(self, text: str) -> List[str]:
+        """Coin ids mentioned in text, longest alias match first, in order of appearance"""
+        tokens = alias_tokens(text)
+        found: List[str] = []
+        i = 0
+        while i < len(tokens):
+            node, match, end = self._trie, None, i
+            for j in range(i, len(tokens)):
+                token = tokens[j]
+                # Plurals ('bitcoins') match their alias; the 's' of a possessive is not stripped to nothing
+                node = node.get(token) or (node.get(token[:-1]) if len(token) > 1 and token.endswith('s') else None)
+                if node is None:
+                    break
+                if TERMINAL in node:
+                    match, end = node[TERMINAL], j + 1
+            if match:
+                if match not in found:
+                    found.append(match)
+                i = end
+            else:
+                i += 1
+        return found
+
+
+def load_registry(snapshot_file: str = SNAPSHOT_FILE) -> CoinRegistry:
+    """Build a registry from a coin list snapshot file"""
+    with open(snapshot_file, 'r', encoding='utf-8') as f:
+        return CoinRegistry(json.load(f)['coins'])
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> CoinRegistry:
+    """Process-wide registry loaded from the bundled snapshot"""
+    return load_registry()
+
+
+def resolve_coin_id(name: str) -> Optional[str]:
+    """Coin id for a name, symbol or alias using the shared registry"""
+    return get_registry().resolve(name)
+
+
+def write_snapshot(coins: List[Dict], snapshot_file: str = SNAPSHOT_FILE):
+    """Write a snapshot with one coin per line so diffs stay readable"""
+    lines = [json.dumps(coin, ensure_ascii=False) for coin in coins]
+    with open(snapshot_file, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        f.write(f'  "source": {json.dumps(COINGECKO_API + "/coins/list")},\n')
+        f.write('  "ordering": "market_cap_desc",\n')
+        f.write('  "coins": [\n    ' + ',\n    '.join(lines) + '\n  ]\n}\n')
+
+
+def refresh_snapshot(snapshot_file: str = SNAPSHOT_FILE, ranked_pages: int = 4) -> int:
+    """Re-download the CoinGecko coin list, ordered by market cap, keeping curated aliases"""
+    import requests
+
+    coin_list = requests.get(f'{COINGECKO_API}/coins/list', timeout=30).json()
+
+    ranked = []
+    for page in range(1, ranked_pages + 1):
+        markets = requests.get(f'{COINGECKO_API}/coins/markets', timeout=30, params={
+            'vs_currency': 'usd', 'order': 'market_cap_desc', 'per_page': 250, 'page': page,
+        }).json()
+        ranked.extend(market['id'] for market in markets)
+    rank = {coin_id: i for i, coin_id in enumerate(ranked)}
+
+    aliases = {}
+    if os.path.exists(snapshot_file):
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            aliases = {coin['id']: coin['aliases'] for coin in json.load(f)['coins'] if coin.get('aliases')}
+
+    coin_list.sort(key=lambda coin: rank.get(coin['id'], len(rank)))
+    coins = []
+    for coin in coin_list:
+        entry = {'id': coin['id'], 'symbol': coin['symbol'].lower(), 'name': coin['name']}
+        if coin['id'] in aliases:
+            entry['aliases'] = aliases[coin['id']]
+        coins.append(entry)
+
+    write_snapshot(coins, snapshot_file)
+    return len(coins)
+
+
+if __name__ == "__main__":
+    # Refresh step: python coin_registry.py --refresh
+    if '--refresh' in sys.argv:
+        print(f"✅ Snapshot refreshed with {refresh_snapshot()} coins -> {SNAPSHOT_FILE}")
+    registry = get_registry()
+    print(f"🪙 Coin registry: {len(registry)} coins")
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Compiled Dataset Index - Versioned binary retrieval index opened with mmap
+Compiles a conversation dataset once into vocabulary, postings, norms and a
+string arena so every trainer process maps the same pages instead of
+re-parsing the JSON and rebuilding the index on startup
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from query_canonicalizer import canonical_terms
+from retrieval_engine import InvertedIndex, tokenize_text
+
+INDEX_MAGIC = b'KTIDX\x00\x00\x00'
+INDEX_VERSION = 2
+INDEX_SUFFIX = '.kidx'
+
+# Tokenizers an index can be compiled with, by the name recorded in its source hash
+TOKENIZERS = {'words': tokenize_text, 'canonical': canonical_terms}
+
+# magic, version, source sha256, docs, terms, postings, vocab bytes, question bytes, response bytes
+HEADER_FORMAT = '<8sI32sIIIQQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the next 8-byte boundary"""
+    return (offset + 7) & ~7
+
+
+def _layout(n_docs: int, n_terms: int, n_postings: int,
+            vocab_bytes: int, question_bytes: int, response_bytes: int) -> Dict[str, Tuple[int, int]]:
+    """Byte offset and size of every section following the header"""
+    sections = [
+        ('term_offsets', (n_terms + 1) * 8),
+        ('postings_indptr', (n_terms + 1) * 8),
+        ('posting_docs', n_postings * 4),
+        ('posting_weights', n_postings * 8),
+        ('norms', n_docs * 8),
+        ('doc_lengths', n_docs * 4),
+        ('question_offsets', (n_docs + 1) * 8),
+        ('response_offsets', (n_docs + 1) * 8),
+        ('vocab', vocab_bytes),
+        ('questions', question_bytes),
+        ('responses', response_bytes),
+    ]
+    layout = {}
+    offset = _align(HEADER_SIZE)
+    for name, size in sections:
+        layout[name] = (offset, size)
+        offset = _align(offset + size)
+    return layout
+
+
+def index_path_for(dataset_file: str) -> str:
+    """Location of the compiled index that belongs to a dataset file"""
+    return os.path.splitext(dataset_file)[0] + INDEX_SUFFIX
+
+
+def hash_source(raw: bytes, tokenizer: str = 'words') -> bytes:
+    """Content hash identifying the dataset and tokenizer an index was compiled from"""
+    digest = hashlib.sha256(raw)
+    if tokenizer != 'words':  # indexes compiled before tokenizers were selectable keep their hash
+        digest.update(b'\0' + tokenizer.encode('utf-8'))
+    return digest.digest()
+
+
+def extract_pairs(data, response_key: str) -> Tuple[List[str], List[str]]:
+    """Pull (question, response) pairs out of a list or {'conversations': [...]} dataset"""
+    if isinstance(data, dict) and 'conversations' in data:
+        conversations = data['conversations']
+    elif isinstance(data, list):
+        conversations = data
+    else:
+        conversations = []
+
+    questions, responses = [], []
+    for conv in conversations:
+        if 'user' in conv and response_key in conv:
+            questions.append(conv['user'])
+            responses.append(conv[response_key])
+    return questions, responses
+
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, bytes]:
+    """Encode strings into one UTF-8 arena plus an offsets array"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+    return offsets, b''.join(encoded)
+
+
+def compile_index(dataset_file: str, response_key: str, index_file: Optional[str] = None,
+                  tokenizer: str = 'words') -> str:
+    """Compile a conversation dataset into a binary index file and return its path"""
+    index_file = index_file or index_path_for(dataset_file)
+
+    with open(dataset_file, 'rb') as f:
+        raw = f.read()
+
+    questions, responses = extract_pairs(json.loads(raw.decode('utf-8')), response_key)
+
+    index = InvertedIndex(TOKENIZERS[tokenizer])
+    index.build(questions)
+
+    terms = sorted(index.postings)
+    term_offsets, vocab_blob = _pack_strings(terms)
+    question_offsets, question_blob = _pack_strings(questions)
+    response_offsets, response_blob = _pack_strings(responses)
+
+    postings_indptr = np.zeros(len(terms) + 1, dtype='<u8')
+    postings_indptr[1:] = np.cumsum([len(index.postings[term]) for term in terms])
+    posting_docs = np.array([doc for term in terms for doc, _ in index.postings[term]], dtype='<u4')
+    posting_weights = np.array([weight for term in terms for _, weight in index.postings[term]], dtype='<f8')
+    norms = np.array(index.norms, dtype='<f8')
+    doc_lengths = np.array(index.doc_lengths, dtype='<u4')
+
+    counts = (len(questions), len(terms), len(posting_docs),
+              len(vocab_blob), len(question_blob), len(response_blob))
+    layout = _layout(*counts)
+    payloads = {
+        'term_offsets': term_offsets.tobytes(),
+        'postings_indptr': postings_indptr.tobytes(),
+        'posting_docs': posting_docs.tobytes(),
+        'posting_weights': posting_weights.tobytes(),
+        'norms': norms.tobytes(),
+        'doc_lengths': doc_lengths.tobytes(),
+        'question_offsets': question_offsets.tobytes(),
+        'response_offsets': response_offsets.tobytes(),
+        'vocab': vocab_blob,
+        'questions': question_blob,
+        'responses': response_blob,
+    }
+
+    total_size = max(offset + size for offset, size in layout.values())
+    buffer = bytearray(total_size)
+    buffer[:HEADER_SIZE] = struct.pack(HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION, hash_source(raw, tokenizer), *counts)
+    for name, (offset, size) in layout.items():
+        buffer[offset:offset + size] = payloads[name]
+
+    # Write to a temporary file and swap it in so concurrent readers never see a partial index
+    tmp_file = f"{index_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp_file, index_file)
+    return index_file
+
+
+class StringArena(Sequence):
+    """Read-only sequence of strings decoded lazily from an mmap'd arena"""
+
+    def __init__(self, buffer, offsets: np.ndarray, base: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('string arena index out of range')
+        start = self._base + int(self._offsets[i])
+        end = self._base + int(self._offsets[i + 1])
+        return self._buffer[start:end].decode('utf-8')
+
+
+class MappedPostings(Mapping):
+    """Term -> [(sample id, weight)] view over CSC-style postings arrays"""
+
+    def __init__(self, term_ids: Dict[str, int], indptr: np.ndarray, docs: np.ndarray, weights: np.ndarray):
+        self.term_ids = term_ids
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+
+    def __getitem__(self, term: str) -> List[Tuple[int, float]]:
+        term_id = self.term_ids[term]
+        start, end = int(self.indptr[term_id]), int(self.indptr[term_id + 1])
+        return list(zip(self.docs[start:end].tolist(), self.weights[start:end].tolist()))
+
+    def __contains__(self, term) -> bool:
+        return term in self.term_ids
+
+    def __iter__(self):
+        return iter(self.term_ids)
+
+    def __len__(self) -> int:
+        return len(self.term_ids)
+
+
+class MappedIndex(InvertedIndex):
+    """Read-only InvertedIndex whose postings and norms live in an mmap'd file"""
+
+    def __init__(self, index_file: str, scoring: str = 'cosine', tokenizer: str = 'words'):
+        super().__init__(TOKENIZERS[tokenizer], scoring)
+        with open(index_file, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        magic, version, self.source_hash = header[:3]
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Unsupported index format in {index_file}")
+
+        n_docs, n_terms, n_postings = header[3:6]
+        layout = _layout(*header[3:])
+
+        def array(name, dtype, count):
+            return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=layout[name][0])
+
+        term_offsets = array('term_offsets', '<u8', n_terms + 1)
+        vocab = StringArena(self._mmap, term_offsets, layout['vocab'][0])
+        term_ids = {vocab[i]: i for i in range(n_terms)}
+
+        self.postings = MappedPostings(
+            term_ids,
+            array('postings_indptr', '<u8', n_terms + 1),
+            array('posting_docs', '<u4', n_postings),
+            array('posting_weights', '<f8', n_postings),
+        )
+        self.norms = array('norms', '<f8', n_docs)
+        self.doc_lengths = array('doc_lengths', '<u4', n_docs)
+        self.total_length = int(self.doc_lengths.sum())
+        self.questions = StringArena(self._mmap, array('question_offsets', '<u8', n_docs + 1), layout['questions'][0])
+        self.responses = StringArena(self._mmap, array('response_offsets', '<u8', n_docs + 1), layout['responses'][0])
+        # IDF depends on the scoring mode, so it is derived from the mapped postings at load
+        self.compute_statistics()
+
+    def postings_arrays(self) -> Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+        """CSC-style view of the postings straight from the mapped file"""
+        return self.postings.term_ids, self.postings.indptr, self.postings.docs, self.postings.weights
+
+    def build(self, documents):
+        """Mapped indexes are compiled offline and cannot be rebuilt in place"""
+        raise TypeError("MappedIndex is read-only; use compile_index() to rebuild it")
+
+    def add_document(self, text: str) -> int:
+        """Mapped indexes are compiled offline and cannot grow in place"""
+        raise TypeError("MappedIndex is read-only; use compile_index() to rebuild it")
+
+
+def open_index(dataset_file: str, response_key: str, scoring: str = 'cosine',
+               tokenizer: str = 'words') -> MappedIndex:
+    """Open the compiled index for a dataset, recompiling it when the JSON content or tokenizer changed"""
+    index_file = index_path_for(dataset_file)
+
+    with open(dataset_file, 'rb') as f:
+        source_hash = hash_source(f.read(), tokenizer)
+
+    try:
+        index = MappedIndex(index_file, scoring, tokenizer)
+        if index.source_hash == source_hash:
+            return index
+    except (OSError, ValueError, struct.error):
+        pass
+
+    compile_index(dataset_file, response_key, index_file, tokenizer)
+    return MappedIndex(index_file, scoring, tokenizer)
+
+
+if __name__ == "__main__":
+    # Compile step: python compiled_index.py <dataset.json> <response_key> [words|canonical]
+    dataset = sys.argv[1] if len(sys.argv) > 1 else 'sub_zero_crypto_comprehensive_dataset.json'
+    key = sys.argv[2] if len(sys.argv) > 2 else 'sub_zero'
+    tokenizer_name = sys.argv[3] if len(sys.argv) > 3 else 'words'
+    path = compile_index(dataset, key, tokenizer=tokenizer_name)
+    compiled = MappedIndex(path, tokenizer=tokenizer_name)
+    print(f"✅ Compiled {len(compiled)} conversations, {compiled.vocabulary_size} terms -> {path}")
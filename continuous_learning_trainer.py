@@ -6,13 +6,14 @@ Uses simplified similarity matching without scikit-learn dependencies
 """
 
 import json
-import re
 import random
-import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 import numpy as np
 from datetime import datetime
 
+from query_canonicalizer import canonical_terms
+from retrieval_engine import InvertedIndex, top_k_array
+
 class ContinuousLearningTrainer:
     def __init__(self, dataset_file: str = 'crypto_normal_dataset.json'):
         self.dataset_file = dataset_file
@@ -23,6 +24,9 @@ class ContinuousLearningTrainer:
         self.input_vectors = None
         self.response_cache = {}
         
+        # Inverted index over user inputs; dynamic conversations are appended in place
+        self.index = InvertedIndex(self.simple_tokenize)
+        
         # Continuous learning components
         self.conversation_history = []
         self.response_quality_scores = {}
@@ -150,75 +154,24 @@ class ContinuousLearningTrainer:
             return
         
         try:
-            # Create simple word-based vectors for similarity calculation
-            self.word_vectors = []
-            self.vocabulary = set()
-            
-            # Build vocabulary from all inputs
-            for text in self.user_inputs:
-                words = self.simple_tokenize(text.lower())
-                self.vocabulary.update(words)
-            
-            self.vocabulary = list(self.vocabulary)
+            # Index word postings for similarity calculation
+            self.index.build(self.user_inputs)
             
-            # Convert texts to simple vectors
-            for text in self.user_inputs:
-                vector = self.text_to_vector(text)
-                self.word_vectors.append(vector)
-            
-            print(f"✅ Built simplified similarity model with {len(self.user_inputs)} conversations")
-            print(f"📊 Vocabulary size: {len(self.vocabulary)}")
+            print(f"✅ Built simplified similarity model with {len(self.index)} conversations")
+            print(f"📊 Vocabulary size: {self.index.vocabulary_size}")
             print(f"🎯 Current similarity threshold: {self.similarity_threshold}")
             
         except Exception as e:
             print(f"❌ Error building similarity model: {e}")
-            self.word_vectors = None
+            self.index = InvertedIndex(self.simple_tokenize)
     
     def simple_tokenize(self, text: str) -> List[str]:
-        """Simple tokenization without external dependencies"""
-        # Remove punctuation and split on whitespace
-        text = re.sub(r'[^\w\s]', ' ', text)
-        words = text.split()
-        
-        # Filter out very short words and common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'}
-        
-        filtered_words = [word for word in words if len(word) > 2 and word.lower() not in stop_words]
-        return filtered_words
-    
-    def text_to_vector(self, text: str) -> List[float]:
-        """Convert text to simple vector representation"""
-        words = self.simple_tokenize(text.lower())
-        vector = [0.0] * len(self.vocabulary)
-        
-        for word in words:
-            if word in self.vocabulary:
-                idx = self.vocabulary.index(word)
-                vector[idx] += 1.0
-          # Normalize vector
-        total = sum(vector)
-        if total > 0:
-            vector = [v / total for v in vector]
-        
-        return vector
-    
-    def simple_cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors"""
-        if len(vec1) != len(vec2):
-            return 0.0
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = sum(a * a for a in vec1) ** 0.5
-        magnitude2 = sum(b * b for b in vec2) ** 0.5
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        return dot_product / (magnitude1 * magnitude2)
+        """Canonical terms: synonyms mapped (btc -> bitcoin), punctuation and stop words stripped"""
+        return canonical_terms(text)
     
     def find_best_response_with_learning(self, user_input: str, conversation_id: str = None) -> Dict:
         """Enhanced response finding with simplified similarity calculation"""
-        if not self.user_inputs or not self.word_vectors:
+        if not self.user_inputs or not len(self.index):
             return {
                 'response': "I'm still learning about cryptocurrency! Please ask me about Bitcoin, Ethereum, or blockchain.",
                 'confidence': 0.1,
@@ -236,9 +189,6 @@ class ContinuousLearningTrainer:
         # Check conversation context
         context_boost = self.get_context_boost(user_input, conversation_id)
         
-        # Enhanced preprocessing
-        processed_input = self.enhanced_preprocess(user_input)
-        
         # Try pattern matching first
         pattern_response = self.try_pattern_matching(user_input)
         if pattern_response:
@@ -249,16 +199,10 @@ class ContinuousLearningTrainer:
             }
         
         try:
-            # Convert user input to vector
-            user_vector = self.text_to_vector(processed_input)
-            
-            # Calculate similarities with context boost
-            similarities = []
-            for stored_vector in self.word_vectors:
-                similarity = self.simple_cosine_similarity(user_vector, stored_vector)
-                similarities.append(similarity)
-            
-            similarities = np.array(similarities)
+            # Cosine similarity over canonical terms, scored only for inputs sharing one with the query
+            similarities = np.zeros(len(self.index))
+            for idx, similarity in self.index.score(user_input).items():
+                similarities[idx] = similarity
             
             # Apply context and pattern boosts
             enhanced_similarities = self.apply_similarity_boosts(similarities, user_input, context_boost)
@@ -266,15 +210,14 @@ class ContinuousLearningTrainer:
             # Adaptive threshold based on recent performance
             adaptive_threshold = self.get_adaptive_threshold()
             
-            # Get best matches
-            valid_indices = np.where(enhanced_similarities >= adaptive_threshold)[0]
-            
-            if len(valid_indices) == 0:
-                # Progressive threshold lowering
-                for lower_threshold in [adaptive_threshold * 0.7, adaptive_threshold * 0.5, adaptive_threshold * 0.3]:
-                    valid_indices = np.where(enhanced_similarities >= lower_threshold)[0]
-                    if len(valid_indices) > 0:
-                        break
+            # Get best matches, lowering the threshold progressively; the best score
+            # alone decides which step applies, so the scores are filtered once
+            best_similarity = enhanced_similarities.max()
+            valid_indices = np.array([], dtype=int)
+            for current_threshold in [adaptive_threshold, adaptive_threshold * 0.7, adaptive_threshold * 0.5, adaptive_threshold * 0.3]:
+                if best_similarity >= current_threshold:
+                    valid_indices = np.flatnonzero(enhanced_similarities >= current_threshold)
+                    break
             
             if len(valid_indices) > 0:
                 # Smart selection based on quality scores and usage
@@ -313,32 +256,6 @@ class ContinuousLearningTrainer:
                 'source': 'error_fallback'
             }
     
-    def enhanced_preprocess(self, user_input: str) -> str:
-        """Enhanced preprocessing with crypto-specific optimizations"""
-        text = user_input.lower()
-        
-        # Normalize common variations
-        normalizations = {
-            'btc': 'bitcoin',
-            'eth': 'ethereum', 
-            'crypto': 'cryptocurrency',
-            'defi': 'decentralized finance',
-            'nft': 'non fungible token',
-            'dao': 'decentralized autonomous organization',
-            'hodl': 'hold',
-            'fomo': 'fear of missing out',
-            'fud': 'fear uncertainty doubt'
-        }
-        
-        for abbr, full in normalizations.items():
-            text = text.replace(abbr, full)
-        
-        # Clean up common variations
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces
-        text = re.sub(r'[^\w\s]', ' ', text)  # Non-alphanumeric except spaces
-        
-        return text.strip()
-    
     def get_context_boost(self, user_input: str, conversation_id: str) -> float:
         """Calculate context boost based on conversation history"""
         if not conversation_id or conversation_id not in self.context_memory:
@@ -388,28 +305,16 @@ class ContinuousLearningTrainer:
     
     def smart_response_selection(self, valid_indices: np.ndarray, similarities: np.ndarray) -> int:
         """Smart selection considering quality, freshness, and similarity"""
-        scores = []
+        quality_scores = np.array([self.conversations[idx]['quality_score'] for idx in valid_indices])
+        usage_counts = np.array([self.conversations[idx]['usage_count'] for idx in valid_indices])
         
-        for idx in valid_indices:
-            conversation = self.conversations[idx]
-            
-            # Base similarity score
-            score = similarities[idx]
-            
-            # Quality score boost
-            score += conversation['quality_score'] * 0.2
-            
-            # Freshness penalty (reduce overused responses)
-            usage_penalty = min(conversation['usage_count'] * 0.05, 0.3)
-            score -= usage_penalty
-            
-            scores.append(score)
-          # Select best score, but add some randomness for variety
-        scores = np.array(scores)
-        top_indices = valid_indices[np.argsort(scores)]
+        # Base similarity score plus quality boost, minus a freshness penalty (reduce overused responses)
+        scores = similarities[valid_indices] + quality_scores * 0.2 - np.minimum(usage_counts * 0.05, 0.3)
         
-        # Take the top 3 or all if fewer than 3
-        top_3_indices = top_indices[-3:] if len(top_indices) >= 3 else top_indices
+        # Select best score, but add some randomness for variety: take the top 3 (or all
+        # if fewer) without sorting every candidate, ordered worst to best for the weights
+        top_positions = [position for position, _ in reversed(top_k_array(scores, 3))]
+        top_3_indices = valid_indices[top_positions]
         
         # Weighted random selection from top candidates
         if len(top_3_indices) == 1:
@@ -517,10 +422,11 @@ class ContinuousLearningTrainer:
             self.user_inputs.append(user_input)
             self.bot_responses.append(bot_response)
             
-            # Rebuild model if we have enough new conversations
+            # Append its postings so it can be matched right away, no rebuild needed
+            self.index.add_document(user_input)
+            
+            # Persist every 10 new conversations
             if len(self.dynamic_conversations) % 10 == 0:
-                print(f"🔄 Rebuilding model with {len(self.dynamic_conversations)} new conversations...")
-                self.build_similarity_model()
                 self.save_dynamic_conversations()
     
     def save_dynamic_conversations(self):
@@ -555,6 +461,7 @@ class ContinuousLearningTrainer:
                         self.conversations.append(conv)
                         self.user_inputs.append(conv['user'])
                         self.bot_responses.append(conv['bot'])
+                        self.index.add_document(conv['user'])
         except Exception as e:
             print(f"⚠️ Error loading dynamic conversations: {e}")
     
@@ -566,7 +473,8 @@ class ContinuousLearningTrainer:
         accuracy_rate = 0
         if self.accuracy_metrics['total_responses'] > 0:
             accuracy_rate = self.accuracy_metrics['high_quality_responses'] / self.accuracy_metrics['total_responses']
-          context_rate = 0
+        
+        context_rate = 0
         if self.accuracy_metrics['total_responses'] > 0:
             context_rate = self.accuracy_metrics['context_aware_responses'] / self.accuracy_metrics['total_responses']
         
@@ -577,7 +485,7 @@ class ContinuousLearningTrainer:
             'accuracy_rate': round(accuracy_rate * 100, 1),
             'context_awareness_rate': round(context_rate * 100, 1),
             'current_threshold': round(self.similarity_threshold, 3),
-            'vocabulary_size': len(self.vocabulary) if hasattr(self, 'vocabulary') else 0,
+            'vocabulary_size': self.index.vocabulary_size,
             'total_responses_given': self.accuracy_metrics['total_responses'],
             'high_quality_responses': self.accuracy_metrics['high_quality_responses'],
             'learning_iterations': self.accuracy_metrics['learning_iterations'],
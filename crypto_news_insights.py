@@ -4,18 +4,24 @@ News Insights Module for Crypto Chatbot
 Fetches and analyzes cryptocurrency news from multiple sources
 """
 
+import os
 import requests
 import json
-import time
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import re
 
+from circuit_breaker import call_all
+from market_data_client import api_base
+from news_ingest import NewsIngestor
+from news_store import ALL_TOPICS, NEWS_POOL_SIZE, NewsPool, NewsStore
+from sentiment_engine import SentimentEngine, summarize
+from sentiment_service import score_texts
+
 class CryptoNewsInsights:
-    def __init__(self):
-        self.news_cache = {}
-        self.cache_expiry = 3600  # 1 hour cache
-        self.last_update = {}
+    def __init__(self, fetch_news: Optional[Callable[[], List[Dict]]] = None):
+        self.cache_expiry = 3600  # 1 hour before the article pool is refreshed in the background
         
         # News API sources (free tiers available)
         self.news_sources = {
@@ -67,68 +73,85 @@ class CryptoNewsInsights:
             'technology': ['upgrade', 'hard fork', 'scalability', 'consensus', 'blockchain'],
             'market_structure': ['ETF', 'derivatives', 'futures', 'options', 'custody']
         }
+        
+        # Every lexicon above compiled into one automaton
+        self.sentiment_engine = SentimentEngine(self.sentiment_keywords, self.technical_keywords,
+                                                self.fundamental_keywords)
+        
+        # Every source is ingested into one deduplicated log; each unique article is scored once
+        self.news_ingestor = NewsIngestor(score=self._score_articles)
+        # Newest ingested articles for market insights, followed by cursor so each read only takes new ones
+        self.insight_articles: List[Dict] = []
+        self.insight_cursor = 0
+        self._insight_lock = threading.Lock()
+        
+        # One article pool for every topic; demo articles serve until the first read's fetch lands
+        self.news_store = NewsStore(fetch_news or self._fetch_news_pool, fallback=self._get_mock_pool,
+                                    stale_after=self.cache_expiry)
     
     def get_latest_news(self, topic: str = "cryptocurrency", limit: int = 5) -> List[Dict]:
-        """Fetch latest crypto news with caching"""
-        
-        cache_key = f"{topic}_{limit}"
-        current_time = time.time()
+        """Latest crypto news on a topic, served from the shared article pool without waiting on the API"""
+        return self.news_store.get(topic, limit)
+    
+    def _fetch_news_pool(self) -> List[Dict]:
+        """Ingest every configured source concurrently and pool the newest unique articles"""
+        sources = [('coingecko_news', lambda: self._fetch_coingecko_news(ALL_TOPICS, NEWS_POOL_SIZE))]
+        if os.environ.get('NEWSAPI_KEY'):
+            sources.append(('newsapi', self._fetch_newsapi_news))
+        results, errors = call_all(sources)
+        for name, error in errors.items():
+            print(f"{name} error: {error}")
+        if not results:
+            # Every source failed: let the store count the failure and back off
+            raise next(iter(errors.values()))
+        for name, items in results.items():
+            self.news_ingestor.ingest(items, source=name)
+        return self.news_ingestor.latest(NEWS_POOL_SIZE)
+    
+    def _fetch_newsapi_news(self) -> List[Dict]:
+        """Raw NewsAPI articles (needs a NEWSAPI_KEY), raising on errors so the breaker sees them"""
+        config = self.news_sources['newsapi']
+        response = requests.get(config['url'], params={**config['params'], 'apiKey': os.environ['NEWSAPI_KEY']},
+                                timeout=10)
+        response.raise_for_status()
+        return response.json().get('articles', [])
+    
+    def _get_mock_pool(self) -> List[Dict]:
+        """Every demo article, scored, as the pool used before the first fetch"""
+        return self._score_articles(self._get_mock_news(ALL_TOPICS, NEWS_POOL_SIZE))
+    
+    def _score_articles(self, articles: List[Dict]) -> List[Dict]:
+        """Attach each article's lexicon analysis and VADER compound score (skipped without VADER)"""
+        texts = [f"{article.get('title', '')} {article.get('description', '')}" for article in articles]
+        batch = self.sentiment_engine.score_batch(texts)
+        for i, article in enumerate(articles):
+            article['analysis'] = batch.analysis(i)
+        for article, score in zip(articles, score_texts(texts) or []):
+            article['sentiment_score'] = score['compound']
+        return articles
+    
+    def _fetch_coingecko_news(self, topic: str, limit: int) -> List[Dict]:
+        """Fetch news from CoinGecko API (free tier), raising on errors so the breaker sees them"""
+        # CoinGecko doesn't require API key for basic endpoints
+        url = f"{api_base('coingecko')}/news"
         
-        # Check cache
-        if (cache_key in self.news_cache and 
-            cache_key in self.last_update and
-            current_time - self.last_update[cache_key] < self.cache_expiry):
-            return self.news_cache[cache_key]
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
         
-        # Fetch fresh news
         news_articles = []
-        
-        try:
-            # Use a free crypto news service (CoinGecko has free endpoints)
-            news_articles = self._fetch_coingecko_news(topic, limit)
-            
-            if not news_articles:
-                # Fallback to mock news for demo
-                news_articles = self._get_mock_news(topic, limit)
-            
-            # Cache results
-            self.news_cache[cache_key] = news_articles
-            self.last_update[cache_key] = current_time
-            
-        except Exception as e:
-            print(f"Error fetching news: {e}")
-            # Return mock data as fallback
-            news_articles = self._get_mock_news(topic, limit)
+        for item in data.get('data', [])[:limit]:
+            article = {
+                'title': item.get('title', 'Crypto News'),
+                'description': item.get('description', 'Latest cryptocurrency news'),
+                'url': item.get('url', ''),
+                'published_at': item.get('created_at', ''),
+                'source': 'CoinGecko'
+            }
+            news_articles.append(article)
         
         return news_articles
     
-    def _fetch_coingecko_news(self, topic: str, limit: int) -> List[Dict]:
-        """Fetch news from CoinGecko API (free tier)"""
-        try:
-            # CoinGecko doesn't require API key for basic endpoints
-            url = "https://api.coingecko.com/api/v3/news"
-            
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                
-                news_articles = []
-                for item in data.get('data', [])[:limit]:
-                    article = {
-                        'title': item.get('title', 'Crypto News'),
-                        'description': item.get('description', 'Latest cryptocurrency news'),
-                        'url': item.get('url', ''),
-                        'published_at': item.get('created_at', ''),
-                        'source': 'CoinGecko'
-                    }
-                    news_articles.append(article)
-                
-                return news_articles
-                
-        except Exception as e:
-            print(f"CoinGecko API error: {e}")
-            return []
-    
     def _get_mock_news(self, topic: str, limit: int) -> List[Dict]:
         """Generate realistic mock news for demo purposes"""
         
@@ -175,104 +198,45 @@ class CryptoNewsInsights:
             }
         ]
         
-        # Filter by topic if specific
+        # Filter by topic if specific: the same coin/tag index lookup the article pool uses
         if topic.lower() != "cryptocurrency":
-            filtered_articles = []
-            for article in mock_articles:
-                if topic.lower() in article['title'].lower() or topic.lower() in article['description'].lower():
-                    filtered_articles.append(article)
-            mock_articles = filtered_articles if filtered_articles else mock_articles
+            return list(NewsPool(mock_articles, fetched_at=None).select(topic)[:limit])
         
         return mock_articles[:limit]
     def analyze_sentiment(self, text: str) -> Dict:
         """Enhanced sentiment analysis with intensity and reasoning"""
-        text_lower = text.lower()
-        
-        # Calculate sentiment scores with weights
-        bullish_strong = sum(2 for word in self.sentiment_keywords['bullish']['strong'] if word in text_lower)
-        bullish_moderate = sum(1 for word in self.sentiment_keywords['bullish']['moderate'] if word in text_lower)
-        bullish_weak = sum(0.5 for word in self.sentiment_keywords['bullish']['weak'] if word in text_lower)
-        
-        bearish_strong = sum(2 for word in self.sentiment_keywords['bearish']['strong'] if word in text_lower)
-        bearish_moderate = sum(1 for word in self.sentiment_keywords['bearish']['moderate'] if word in text_lower)
-        bearish_weak = sum(0.5 for word in self.sentiment_keywords['bearish']['weak'] if word in text_lower)
-        
-        neutral_score = sum(1 for word in self.sentiment_keywords['neutral'] if word in text_lower)
-        
-        total_bullish = bullish_strong + bullish_moderate + bullish_weak
-        total_bearish = bearish_strong + bearish_moderate + bearish_weak
-        
-        # Determine sentiment and intensity
-        if total_bullish > total_bearish + neutral_score:
-            if bullish_strong > 0:
-                sentiment, intensity = 'bullish', 'strong'
-            elif bullish_moderate > bullish_weak:
-                sentiment, intensity = 'bullish', 'moderate'
-            else:
-                sentiment, intensity = 'bullish', 'weak'
-        elif total_bearish > total_bullish + neutral_score:
-            if bearish_strong > 0:
-                sentiment, intensity = 'bearish', 'strong'
-            elif bearish_moderate > bearish_weak:
-                sentiment, intensity = 'bearish', 'moderate'
-            else:
-                sentiment, intensity = 'bearish', 'weak'
-        else:
-            sentiment, intensity = 'neutral', 'balanced'
-        
-        # Analyze technical and fundamental factors
-        technical_factors = []
-        for category, keywords in self.technical_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                technical_factors.append(category)
-        
-        fundamental_factors = []
-        for category, keywords in self.fundamental_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                fundamental_factors.append(category)
-        
-        return {
-            'sentiment': sentiment,
-            'intensity': intensity,
-            'bullish_score': total_bullish,
-            'bearish_score': total_bearish,
-            'technical_factors': technical_factors,
-            'fundamental_factors': fundamental_factors
-        }
+        return self.sentiment_engine.analyze(text)
+    def _latest_scored_news(self, limit: int = 5) -> List[Dict]:
+        """Newest scored articles: the ingested log read past the cursor, else the current pool"""
+        pool = self.news_store.current()  # keeps the pool refreshing in the background
+        with self._insight_lock:
+            added, self.insight_cursor = self.news_ingestor.since(self.insight_cursor)
+            if added:
+                # Newer arrivals first, so publication-time ties go to the later article as in the log
+                merged = list(reversed(added)) + self.insight_articles
+                self.insight_articles = sorted(merged, key=lambda article: article['published_ts'],
+                                               reverse=True)[:limit]
+            if self.insight_articles:
+                return self.insight_articles[:limit]
+        articles = list(pool.select(ALL_TOPICS)[:limit])
+        unscored = [article for article in articles if 'analysis' not in article]
+        if unscored:
+            self._score_articles(unscored)
+        return articles
+    
     def get_market_insights(self, personality: str = "normal") -> str:
         """Generate enhanced market insights with deep analysis"""
         
-        news_articles = self.get_latest_news("cryptocurrency", 5)
+        news_articles = self._latest_scored_news(5)
         
         if not news_articles:
             return "Unable to fetch current market news at the moment."
         
-        # Enhanced sentiment analysis
-        sentiment_analyses = []
-        technical_factors = []
-        fundamental_factors = []
-        
-        for article in news_articles:
-            text = article['title'] + ' ' + article['description']
-            analysis = self.analyze_sentiment(text)
-            sentiment_analyses.append(analysis)
-            technical_factors.extend(analysis['technical_factors'])
-            fundamental_factors.extend(analysis['fundamental_factors'])
-        
-        # Aggregate analysis
-        strong_bullish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bullish' and a['intensity'] == 'strong')
-        moderate_bullish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bullish' and a['intensity'] == 'moderate')
-        weak_bullish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bullish' and a['intensity'] == 'weak')
-        
-        strong_bearish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bearish' and a['intensity'] == 'strong')
-        moderate_bearish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bearish' and a['intensity'] == 'moderate')
-        weak_bearish = sum(1 for a in sentiment_analyses if a['sentiment'] == 'bearish' and a['intensity'] == 'weak')
-        
-        neutral_count = sum(1 for a in sentiment_analyses if a['sentiment'] == 'neutral')
-        
-        # Count factor occurrences
-        tech_factor_counts = {factor: technical_factors.count(factor) for factor in set(technical_factors)}
-        fund_factor_counts = {factor: fundamental_factors.count(factor) for factor in set(fundamental_factors)}
+        # Enhanced sentiment analysis: every article was scored once when it arrived, so this only aggregates
+        label_counts, tech_factor_counts, fund_factor_counts = summarize(
+            [article['analysis'] for article in news_articles])
+        (strong_bullish, moderate_bullish, weak_bullish,
+         strong_bearish, moderate_bearish, weak_bearish, neutral_count) = label_counts.tolist()
         
         # Generate personality-specific insights
         if personality == "subzero":
@@ -459,7 +423,9 @@ class CryptoNewsInsights:
     def get_specific_coin_news(self, coin: str, personality: str = "normal") -> str:
         """Get news specific to a cryptocurrency"""
         
-        coin_articles = self.get_latest_news(coin, 3)
+        # Index lookup over every ingested article, else the current pool (demo articles before the first fetch)
+        pool = self.news_store.current()
+        coin_articles = self.news_ingestor.search(coin, 3) or list(pool.select(coin)[:3])
         
         if not coin_articles:
             if personality == "subzero":
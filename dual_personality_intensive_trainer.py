@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 import numpy as np
 from improved_dual_personality_chatbot import ImprovedDualPersonalityChatbot
+from market_data_client import api_base
 
 class DualPersonalityAdvancedTrainer:
     def __init__(self, chatbot: ImprovedDualPersonalityChatbot):
@@ -195,7 +196,7 @@ class DualPersonalityAdvancedTrainer:
         try:
             # Get trending cryptocurrencies
             trending_response = requests.get(
-                "https://api.coingecko.com/api/v3/search/trending",
+                f"{api_base('coingecko')}/search/trending",
                 timeout=10
             )
             if trending_response.status_code == 200:
@@ -208,7 +209,7 @@ class DualPersonalityAdvancedTrainer:
             
             # Get detailed market data
             market_response = requests.get(
-                "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=20&page=1",
+                f"{api_base('coingecko')}/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=20&page=1",
                 timeout=10
             )
             if market_response.status_code == 200:
@@ -221,7 +222,7 @@ class DualPersonalityAdvancedTrainer:
             # Get fear and greed index (if available)
             try:
                 fear_greed_response = requests.get(
-                    "https://api.alternative.me/fng/?limit=1",
+                    f"{api_base('fear_greed')}/fng/?limit=1",
                     timeout=5
                 )
                 if fear_greed_response.status_code == 200:
@@ -451,9 +452,11 @@ class DualPersonalityAdvancedTrainer:
                 normal_training_data = self.generate_personality_specific_training("normal", market_data)
                 normal_session_scores = []
                 
-                for scenario in normal_training_data[:3]:  # Train on 3 scenarios
-                    self.chatbot.switch_personality("normal")
-                    response = self.chatbot.get_response(scenario["question"])
+                normal_scenarios = normal_training_data[:3]  # Train on 3 scenarios
+                self.chatbot.switch_personality("normal")
+                normal_responses = self.chatbot.get_responses([scenario["question"] for scenario in normal_scenarios])
+                
+                for scenario, response in zip(normal_scenarios, normal_responses):
                     scores = self.evaluate_personality_response(scenario["question"], response, "normal")
                     normal_session_scores.append(scores["overall"])
                     
@@ -465,9 +468,11 @@ class DualPersonalityAdvancedTrainer:
                 subzero_training_data = self.generate_personality_specific_training("subzero", market_data)
                 subzero_session_scores = []
                 
-                for scenario in subzero_training_data[:3]:  # Train on 3 scenarios
-                    self.chatbot.switch_personality("subzero")
-                    response = self.chatbot.get_response(scenario["question"])
+                subzero_scenarios = subzero_training_data[:3]  # Train on 3 scenarios
+                self.chatbot.switch_personality("subzero")
+                subzero_responses = self.chatbot.get_responses([scenario["question"] for scenario in subzero_scenarios])
+                
+                for scenario, response in zip(subzero_scenarios, subzero_responses):
                     scores = self.evaluate_personality_response(scenario["question"], response, "subzero")
                     subzero_session_scores.append(scores["overall"])
                     
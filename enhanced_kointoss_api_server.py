@@ -10,6 +10,7 @@ Enhanced KoinToss FastAPI Server for Production App Integration
 
 import asyncio
 import json
+import threading
 import time
 import uuid
 from datetime import datetime, timedelta
@@ -33,6 +34,11 @@ except ImportError as e:
 try:
     from improved_dual_personality_chatbot import ImprovedDualPersonalityChatbot
     from advanced_autonomous_trainer import AdvancedAutonomousTrainer
+    from rate_limiter import get_rate_limit_stats
+    from circuit_breaker import get_breaker_stats
+    from price_feed import get_price_feed_stats, start_price_feed, stop_price_feed
+    from market_snapshot import get_market_snapshot_service, stop_market_snapshot_service
+    from market_data_client import run_in_thread
 except ImportError as e:
     print(f"❌ Could not import chatbot modules: {e}")
     exit(1)
@@ -66,6 +72,23 @@ app.add_middleware(
 chatbot = None
 autonomous_trainer = None
 
+# One chatbot serves every session, so switching its personality and answering happen under one lock
+chat_lock = threading.Lock()
+
+
+def respond_as(personality: Optional[str], message: str) -> Dict:
+    """Chatbot response in a session's personality; runs in a worker thread"""
+    with chat_lock:
+        if personality and personality != chatbot.personality_mode:
+            chatbot.switch_personality(personality)
+        return chatbot.get_response(message)
+
+
+def switch_locked(personality: str) -> str:
+    """switch_personality without interleaving with a response in progress"""
+    with chat_lock:
+        return chatbot.switch_personality(personality)
+
 # Session management
 class SessionManager:
     def __init__(self):
@@ -209,6 +232,17 @@ async def startup_event():
         autonomous_trainer.start_autonomous_training()
         logger.info("✅ Autonomous training started")
         
+        # Start background market snapshot refreshes
+        get_market_snapshot_service()
+        logger.info("✅ Market snapshot service started")
+        
+        # Stream tickers so live prices need no polling (reconnects in the background)
+        try:
+            start_price_feed()
+            logger.info("✅ Streaming price feed started")
+        except RuntimeError as e:
+            logger.warning(f"⚠️ Streaming price feed unavailable: {e}")
+        
         logger.info("🎉 KoinToss API Server ready!")
         
     except Exception as e:
@@ -227,6 +261,9 @@ async def shutdown_event():
         autonomous_trainer.stop_autonomous_training()
         autonomous_trainer.export_training_data()
         logger.info("✅ Training data exported")
+    
+    stop_market_snapshot_service()
+    stop_price_feed()
 
 # Dependency functions
 async def get_current_session(request: ChatRequest) -> str:
@@ -285,12 +322,13 @@ async def chat_endpoint(
         session = session_manager.get_session(session_id)
         
         # Switch personality if requested
-        if request.personality and request.personality != session["personality"]:
-            chatbot.switch_personality(request.personality)
+        if request.personality:
             session["personality"] = request.personality
         
-        # Get response from chatbot
-        response = chatbot.get_response(request.message)
+        # Get response from chatbot off the event loop (live price lookups block on HTTP),
+        # in this session's personality whatever other sessions switched the chatbot to
+        response = await run_in_thread(respond_as, session["personality"], request.message)
+        session["personality"] = response["personality"]  # the message itself may have switched it
         
         # Create response
         message_id = str(uuid.uuid4())
@@ -348,8 +386,13 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             if not user_message:
                 continue
             
-            # Get chatbot response
-            response = chatbot.get_response(user_message)
+            # Get chatbot response off the event loop, in this session's personality
+            session = session_manager.get_session(session_id) or session_manager.sessions[
+                session_manager.create_session(session_id)]
+            if message_data.get("personality"):
+                session["personality"] = message_data["personality"]
+            response = await run_in_thread(respond_as, session["personality"], user_message)
+            session["personality"] = response["personality"]
             
             # Send response
             await websocket.send_text(json.dumps({
@@ -376,7 +419,7 @@ async def switch_personality(request: PersonalityRequest):
         if request.personality not in ["normal", "subzero"]:
             raise HTTPException(status_code=400, detail="Invalid personality. Use 'normal' or 'subzero'")
         
-        switch_message = chatbot.switch_personality(request.personality)
+        switch_message = await run_in_thread(switch_locked, request.personality)
         
         # Update session if provided
         if request.session_id:
@@ -387,7 +430,7 @@ async def switch_personality(request: PersonalityRequest):
         
         return {
             "message": switch_message,
-            "personality": chatbot.personality_mode,
+            "personality": request.personality,
             "session_id": request.session_id,
             "timestamp": datetime.now().isoformat()
         }
@@ -418,7 +461,11 @@ async def get_status():
             "status": "ready" if chatbot else "not_initialized",
             "timestamp": datetime.now().isoformat(),
             "active_sessions": len(session_manager.sessions),
-            "websocket_connections": len(manager.active_connections)
+            "websocket_connections": len(manager.active_connections),
+            "rate_limits": get_rate_limit_stats(),
+            "circuit_breakers": get_breaker_stats(),
+            "price_feed": get_price_feed_stats(),
+            "market_snapshot": get_market_snapshot_service().status()
         }
         
         if chatbot:
@@ -438,6 +485,16 @@ async def get_status():
         logger.error(f"Status error: {e}")
         return {"status": "error", "error": str(e)}
 
+@app.get("/api/markets")
+async def get_markets(limit: int = 10):
+    """Top markets from the background snapshot, with its age"""
+    service = get_market_snapshot_service()
+    snapshot = await run_in_thread(service.get_snapshot)
+    return {
+        "markets": snapshot.top(max(1, min(limit, 250))),
+        "snapshot": service.status()
+    }
+
 @app.get("/api/training")
 async def get_training_status():
     """Get autonomous training status"""
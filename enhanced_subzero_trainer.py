@@ -6,14 +6,17 @@ Improves responses for price queries and crypto-specific questions
 
 import json
 import random
-import re
-import math
-from typing import Dict, List, Optional
-import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from coin_registry import get_registry
+from compiled_index import MappedIndex, open_index
+from keyword_router import route
+from retrieval_engine import BATCH_CHUNK_SIZE, InvertedIndex, tokenize_text, top_k, top_k_array
 
 class EnhancedSubZeroTrainer:
-    def __init__(self, dataset_file: str = 'sub_zero_crypto_comprehensive_dataset.json'):
+    def __init__(self, dataset_file: str = 'sub_zero_crypto_comprehensive_dataset.json', scoring: str = 'cosine'):
         self.dataset_file = dataset_file
+        self.scoring = scoring
         self.conversations = []
         self.user_questions = []
         self.sub_zero_responses = []
@@ -43,8 +46,7 @@ class EnhancedSubZeroTrainer:
         }
         
         # Custom similarity components
-        self.word_vectors = []
-        self.all_words = []
+        self.index = InvertedIndex(self.tokenize_text, self.scoring)
         self.vocab_size = 0
         
         # Load and process the dataset
@@ -53,16 +55,12 @@ class EnhancedSubZeroTrainer:
 
     def detect_price_query(self, user_input: str) -> tuple:
         """Detect if user is asking for price information"""
-        price_indicators = ['price', 'cost', 'value', 'worth', 'trading at', 'current', 'how much', 'what is the price']
-        crypto_mentions = []
-        
-        user_lower = user_input.lower()
-        is_price_query = any(indicator in user_lower for indicator in price_indicators)
+        keywords = route(user_input)
+        is_price_query = keywords.has('price')
         
-        # Check for crypto mentions
-        for crypto in self.crypto_knowledge.keys():
-            if crypto in user_lower or crypto.upper() in user_input:
-                crypto_mentions.append(crypto)
+        # Check for crypto mentions by any registered name, symbol or alias
+        mentioned = set(get_registry().scan(user_input))
+        crypto_mentions = [crypto for crypto in self.crypto_knowledge if crypto in mentioned]
         
         return is_price_query, crypto_mentions
 
@@ -78,37 +76,34 @@ class EnhancedSubZeroTrainer:
 
     def tokenize_text(self, text: str) -> List[str]:
         """Simple tokenization function"""
-        text = re.sub(r'[^\w\s]', ' ', text)
-        words = text.split()
-        return [word for word in words if len(word) > 2]
-    
-    def text_to_vector(self, text: str) -> List[float]:
-        """Convert text to simple word count vector"""
-        words = self.tokenize_text(text)
-        vector = [0.0] * self.vocab_size
-        
-        for i, vocab_word in enumerate(self.all_words):
-            vector[i] = words.count(vocab_word)
-        
-        return vector
-    
-    def cosine_similarity_custom(self, vec1: List[float], vec2: List[float]) -> float:
-        """Custom cosine similarity implementation"""
-        if not vec1 or not vec2:
-            return 0.0
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(a * a for a in vec2))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+        return tokenize_text(text)
+
+    @property
+    def conversation_count(self) -> int:
+        """Conversations loaded, whether mapped from the compiled index or read from the JSON dataset"""
+        return len(self.index) if isinstance(self.index, MappedIndex) else len(self.conversations)
+
+    def load_compiled_index(self) -> bool:
+        """Map the precompiled dataset index, recompiling it if the JSON changed"""
+        try:
+            self.index = open_index(self.dataset_file, 'sub_zero', self.scoring)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Compiled index unavailable, loading JSON instead: {e}")
+            return False
         
-        return dot_product / (magnitude1 * magnitude2)
+        self.user_questions = self.index.questions
+        self.sub_zero_responses = self.index.responses
+        print(f"✅ Enhanced SubZero mapped {len(self.index)} conversations from compiled index")
+        return True
 
     def load_dataset(self):
         """Load the Sub-Zero conversation dataset"""
         try:
+            if self.load_compiled_index():
+                return
+            
             with open(self.dataset_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
@@ -148,38 +143,26 @@ class EnhancedSubZeroTrainer:
         ]
 
     def build_similarity_model(self):
-        """Build simplified similarity model"""
+        """Build the inverted similarity index"""
         if not self.user_questions:
             print("❌ No training questions available for similarity model")
             return
         
         try:
-            self.word_vectors = []
-            self.all_words = set()
-            
-            # Build vocabulary from all questions
-            for question in self.user_questions:
-                words = self.tokenize_text(question.lower())
-                self.all_words.update(words)
-            
-            self.all_words = sorted(list(self.all_words))
-            self.vocab_size = len(self.all_words)
-            
-            # Create word vectors for each question
-            for question in self.user_questions:
-                vector = self.text_to_vector(question.lower())
-                self.word_vectors.append(vector)
+            # Index term counts of every question; norms are precomputed per sample
+            if not isinstance(self.index, MappedIndex):
+                self.index.build(self.user_questions)
+            self.vocab_size = self.index.vocabulary_size
             
-            print(f"✅ Enhanced SubZero similarity model: {len(self.word_vectors)} conversations, {self.vocab_size} vocab")
+            print(f"✅ Enhanced SubZero similarity model: {len(self.index)} conversations, {self.vocab_size} vocab")
             
         except Exception as e:
             print(f"❌ Error building enhanced SubZero similarity model: {e}")
-            self.word_vectors = None
+            self.index = InvertedIndex(self.tokenize_text, self.scoring)
             self.vocab_size = 0
 
-    def find_best_response(self, user_input: str, threshold: float = 0.1) -> str:
-        """Find the best Sub-Zero response with enhanced crypto handling"""
-        
+    def get_direct_response(self, user_input: str) -> Optional[str]:
+        """Price or crypto-knowledge response that needs no similarity scoring"""
         # First, check for price queries
         is_price_query, crypto_mentions = self.detect_price_query(user_input)
         
@@ -189,49 +172,72 @@ class EnhancedSubZeroTrainer:
             return self.generate_subzero_price_response(crypto_name)
         
         # Check for specific crypto knowledge
-        for crypto_name, crypto_info in self.crypto_knowledge.items():
-            if crypto_name in user_input.lower():
-                return crypto_info['subzero_response']
+        if crypto_mentions:
+            return self.crypto_knowledge[crypto_mentions[0]]['subzero_response']
+        
+        return None
+
+    def select_similar_response(self, matches: List[Tuple[int, float]], threshold: float = 0.1) -> Optional[str]:
+        """Pick the best match (top_k ties go to the earliest sample) above the index's score cut-off"""
+        if not matches or matches[0][1] <= 0:
+            return None
+        
+        best_idx, best_score = matches[0]
+        if self.index.min_score(best_score, threshold) is None:
+            return None
+        
+        return self.sub_zero_responses[best_idx]
+
+    def find_best_response(self, user_input: str, threshold: float = 0.1) -> str:
+        """Find the best Sub-Zero response with enhanced crypto handling"""
+        direct_response = self.get_direct_response(user_input)
+        if direct_response:
+            return direct_response
         
         # Use similarity matching for dataset responses
-        if not self.user_questions or not hasattr(self, 'word_vectors') or not self.word_vectors:
+        if not self.user_questions or not len(self.index):
             return self.get_subzero_fallback(user_input)
         
         try:
-            user_vector = self.text_to_vector(user_input.lower())
-            similarities = []
-            
-            for i, training_vector in enumerate(self.word_vectors):
-                similarity = self.cosine_similarity_custom(user_vector, training_vector)
-                similarities.append(similarity)
-            
-            similarities = np.array(similarities)
-            
-            # Find the best match above threshold
-            valid_indices = np.where(similarities >= threshold)[0]
-            
-            if len(valid_indices) == 0:
-                # Lower threshold progressively
-                for lower_threshold in [0.05, 0.02, 0.01]:
-                    valid_indices = np.where(similarities >= lower_threshold)[0]
-                    if len(valid_indices) > 0:
-                        break
-            
-            if len(valid_indices) > 0:
-                best_idx = valid_indices[np.argmax(similarities[valid_indices])]
-                response = self.sub_zero_responses[best_idx]
-                return response
-            else:
-                return self.get_subzero_fallback(user_input)
+            # Score only the questions that share a term with the query
+            matches = top_k(self.index.score(user_input), 1)
+            response = self.select_similar_response(matches, threshold)
+            return response if response is not None else self.get_subzero_fallback(user_input)
                 
         except Exception as e:
             print(f"⚠️ Error in enhanced SubZero similarity matching: {e}")
             return self.get_subzero_fallback(user_input)
 
+    def find_best_responses(self, user_inputs: List[str], threshold: float = 0.1) -> List[str]:
+        """Batch find_best_response that scores all similarity lookups in one sparse product"""
+        responses = [self.get_direct_response(user_input) for user_input in user_inputs]
+        pending = [i for i, response in enumerate(responses) if not response]
+        
+        if not self.user_questions or not len(self.index):
+            for i in pending:
+                responses[i] = self.get_subzero_fallback(user_inputs[i])
+            return responses
+        
+        # Score the remaining inputs chunk by chunk to bound the (queries x samples) matrix
+        for start in range(0, len(pending), BATCH_CHUNK_SIZE):
+            chunk = pending[start:start + BATCH_CHUNK_SIZE]
+            try:
+                scores = self.index.score_batch([user_inputs[i] for i in chunk])
+                for row, i in zip(scores, chunk):
+                    response = self.select_similar_response(top_k_array(row, 1), threshold)
+                    responses[i] = response if response is not None else self.get_subzero_fallback(user_inputs[i])
+            except Exception as e:
+                print(f"⚠️ Error in enhanced SubZero batch similarity matching: {e}")
+                for i in chunk:
+                    responses[i] = self.get_subzero_fallback(user_inputs[i])
+        
+        return responses
+
     def get_subzero_fallback(self, user_input: str) -> str:
         """Enhanced Sub-Zero themed fallback responses"""
         crypto_keywords = ['bitcoin', 'ethereum', 'crypto', 'blockchain', 'trading', 'mining', 'defi', 'nft']
-        has_crypto_terms = any(keyword in user_input.lower() for keyword in crypto_keywords)
+        keywords = route(user_input)
+        has_crypto_terms = any(keywords.has('crypto_term', keyword) for keyword in crypto_keywords)
         
         if has_crypto_terms:
             crypto_fallbacks = [
@@ -251,10 +257,8 @@ class EnhancedSubZeroTrainer:
             ]
             return random.choice(general_fallbacks)
 
-    def get_response(self, user_input: str) -> Dict:
-        """Get Sub-Zero response with metadata"""
-        response_text = self.find_best_response(user_input)
-        
+    def build_response(self, response_text: str) -> Dict:
+        """Wrap a Sub-Zero response text with metadata"""
         return {
             "message": response_text,
             "type": "enhanced_subzero_response",
@@ -263,10 +267,18 @@ class EnhancedSubZeroTrainer:
             "training_source": "enhanced_subzero_trainer"
         }
 
+    def get_response(self, user_input: str) -> Dict:
+        """Get Sub-Zero response with metadata"""
+        return self.build_response(self.find_best_response(user_input))
+
+    def get_responses(self, user_inputs: List[str]) -> List[Dict]:
+        """Get Sub-Zero responses with metadata for a batch of inputs"""
+        return [self.build_response(text) for text in self.find_best_responses(user_inputs)]
+
     def get_training_stats(self) -> Dict:
         """Get training statistics"""
         return {
-            "total_conversations": len(self.conversations),
+            "total_conversations": len(self.user_questions),
             "vocabulary_size": self.vocab_size,
             "crypto_knowledge_base": len(self.crypto_knowledge),
             "features": [
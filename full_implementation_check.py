@@ -109,14 +109,14 @@ def check_full_implementation():
             implementation_status["training_features"]["continuous_learning"] = False
         
         # Normal trainer capabilities
-        if hasattr(bot.normal_trainer, 'conversations'):
-            normal_data = len(bot.normal_trainer.conversations)
+        if hasattr(bot.normal_trainer, 'conversation_count'):
+            normal_data = bot.normal_trainer.conversation_count
             print(f"✅ Normal training data: {normal_data} conversations")
             implementation_status["training_features"]["normal_data"] = normal_data > 0
         
         # Sub-Zero trainer capabilities
-        if hasattr(bot.subzero_trainer, 'conversations'):
-            subzero_data = len(bot.subzero_trainer.conversations)
+        if hasattr(bot.subzero_trainer, 'conversation_count'):
+            subzero_data = bot.subzero_trainer.conversation_count
             print(f"✅ Sub-Zero training data: {subzero_data} conversations")
             implementation_status["training_features"]["subzero_data"] = subzero_data > 0
         
@@ -13,6 +13,8 @@ from typing import Dict, Optional, List
 from enhanced_normal_trainer import PureNormalTrainer
 from enhanced_subzero_trainer import EnhancedSubZeroTrainer as PureSubZeroTrainer
 from crypto_news_insights import CryptoNewsInsights
+from coin_registry import get_registry
+from keyword_router import route
 from datetime import datetime
 
 class ImprovedDualPersonalityChatbot:
@@ -91,14 +93,12 @@ class ImprovedDualPersonalityChatbot:
         if not self.news_service:
             return ""
         
-        # Extract potential crypto symbols from user input
-        crypto_words = ['bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'defi', 'nft']
-        found_crypto = None
-        
-        for word in crypto_words:
-            if word in user_input.lower():
-                found_crypto = word
-                break
+        # Extract the first mentioned coin's symbol, or a general crypto term, from user input
+        registry = get_registry()
+        coins = registry.scan(user_input)
+        keywords = route(user_input)
+        found_crypto = (registry.get(coins[0])['symbol'] if coins
+                        else next((word for word in ['crypto', 'defi', 'nft'] if keywords.has('crypto_term', word)), None))
         
         if not found_crypto:
             return ""
@@ -124,23 +124,25 @@ class ImprovedDualPersonalityChatbot:
         
         return f"{intro}\n\n{news_content}\n\n{outro}"
     
-    def get_response(self, user_input: str) -> Dict:
-        """Get response from the current personality with fixed strip() handling"""
-        
-        # CRITICAL FIX: Ensure user_input is always a string
-        if not isinstance(user_input, str):
-            user_input = str(user_input)
-            
+    def extract_message(self, response_raw, default_confidence: float):
+        """Pull message text and confidence out of a dict or string trainer response"""
+        if isinstance(response_raw, dict):
+            return response_raw.get('message', str(response_raw)), response_raw.get('confidence', default_confidence)
+        return str(response_raw), default_confidence
+
+    def is_personality_switch(self, user_input: str) -> bool:
+        """Check whether the input is a personality switch command"""
+        return route(user_input).has('switch')
+
+    def get_direct_response(self, user_input: str) -> Optional[Dict]:
+        """Handle empty input, switch commands and built-in knowledge before any trainer runs"""
         if not user_input.strip():
             # Use personality-appropriate prompts
             if self.personality_mode == "subzero":
                 if self.subzero_trainer:
                     prompt_response = self.subzero_trainer.get_response("hello")
                     # Handle both dict and string responses
-                    if isinstance(prompt_response, dict):
-                        message = prompt_response.get('message', str(prompt_response))
-                    else:
-                        message = str(prompt_response)
+                    message, _ = self.extract_message(prompt_response, 0.8)
                     return {
                         "message": message,
                         "personality": self.personality_mode,
@@ -150,10 +152,7 @@ class ImprovedDualPersonalityChatbot:
                 if self.normal_trainer:
                     prompt_response = self.normal_trainer.find_best_response("hello how are you")
                     # Handle both dict and string responses
-                    if isinstance(prompt_response, dict):
-                        message = prompt_response.get('message', str(prompt_response))
-                    else:
-                        message = str(prompt_response)
+                    message, _ = self.extract_message(prompt_response, 0.7)
                     return {
                         "message": message,
                         "personality": self.personality_mode,
@@ -167,15 +166,15 @@ class ImprovedDualPersonalityChatbot:
             }
         
         # Check for personality switch commands
-        user_lower = user_input.lower()
-        if any(phrase in user_lower for phrase in ['switch to subzero', 'switch to sub-zero', 'activate subzero']):
+        keywords = route(user_input)
+        if keywords.has('switch', 'subzero'):
             switch_msg = self.switch_personality('subzero')
             return {
                 "message": switch_msg,
                 "personality": self.personality_mode,
                 "type": "personality_switch"
             }
-        elif any(phrase in user_lower for phrase in ['switch to normal', 'normal mode', 'activate normal']):
+        elif keywords.has('switch', 'normal'):
             switch_msg = self.switch_personality('normal')
             return {
                 "message": switch_msg,
@@ -193,6 +192,10 @@ class ImprovedDualPersonalityChatbot:
         if crypto_response:
             return crypto_response
         
+        return None
+
+    def get_trainer_response(self, user_input: str, response_raw=None):
+        """Get (message, type, confidence) from the current personality's trainer"""
         # Initialize response variables
         response_message = ""
         response_type = "unknown"
@@ -201,36 +204,29 @@ class ImprovedDualPersonalityChatbot:
         # Get response based on current personality
         if self.personality_mode == "subzero" and self.subzero_trainer:
             # Sub-Zero personality response
-            response_raw = self.subzero_trainer.get_response(user_input)
-            if isinstance(response_raw, dict):
-                response_message = response_raw.get('message', str(response_raw))
-                confidence = response_raw.get('confidence', 0.8)
-            else:
-                response_message = str(response_raw)
-                confidence = 0.8
+            if response_raw is None:
+                response_raw = self.subzero_trainer.get_response(user_input)
+            response_message, confidence = self.extract_message(response_raw, 0.8)
             response_type = "subzero_response"
             
         elif self.personality_mode == "normal" and self.normal_trainer:
             # Normal personality response
-            response_raw = self.normal_trainer.get_response(user_input)
-            if isinstance(response_raw, dict):
-                response_message = response_raw.get('message', str(response_raw))
-                confidence = response_raw.get('confidence', 0.7)
-            else:
-                response_message = str(response_raw)
-                confidence = 0.7
+            if response_raw is None:
+                response_raw = self.normal_trainer.get_response(user_input)
+            response_message, confidence = self.extract_message(response_raw, 0.7)
             response_type = "normal_response"
         else:
             # Fallback if no trainer available
             response_raw = self.normal_trainer.find_best_response(user_input) if self.normal_trainer else None
             if response_raw:
-                if isinstance(response_raw, dict):
-                    response_message = response_raw.get('message', str(response_raw))
-                else:
-                    response_message = str(response_raw)
+                response_message, _ = self.extract_message(response_raw, 0.6)
                 response_type = "normal_response"
                 confidence = 0.6
         
+        return response_message, response_type, confidence
+
+    def finalize_response(self, user_input: str, response_message, response_type: str, confidence: float) -> Dict:
+        """Apply fallbacks, record history and stats, and build the response dict"""
         # CRITICAL FIX: Ensure response_message is a string before strip() operations
         if not isinstance(response_message, str):
             response_message = str(response_message)
@@ -240,18 +236,12 @@ class ImprovedDualPersonalityChatbot:
             if self.personality_mode == "subzero" and self.subzero_trainer:
                 # Try a more general Sub-Zero response
                 fallback_response = self.subzero_trainer.get_response("crypto")
-                if isinstance(fallback_response, dict):
-                    response_message = fallback_response.get('message', str(fallback_response))
-                else:
-                    response_message = str(fallback_response)
+                response_message, _ = self.extract_message(fallback_response, confidence)
                 response_type = "subzero_fallback"
             elif self.personality_mode == "normal" and self.normal_trainer:
                 # Try a more general normal response
                 fallback_response = self.normal_trainer.find_best_response("help")
-                if isinstance(fallback_response, dict):
-                    response_message = fallback_response.get('message', str(fallback_response))
-                else:
-                    response_message = str(fallback_response)
+                response_message, _ = self.extract_message(fallback_response, confidence)
                 response_type = "normal_fallback"
         
         # CRITICAL FIX: Final type check before strip()
@@ -287,14 +277,57 @@ class ImprovedDualPersonalityChatbot:
             "type": response_type,
             "confidence": confidence
         }
+
+    def get_response(self, user_input: str) -> Dict:
+        """Get response from the current personality with fixed strip() handling"""
+        
+        # CRITICAL FIX: Ensure user_input is always a string
+        if not isinstance(user_input, str):
+            user_input = str(user_input)
+        
+        direct_response = self.get_direct_response(user_input)
+        if direct_response:
+            return direct_response
+        
+        response_message, response_type, confidence = self.get_trainer_response(user_input)
+        return self.finalize_response(user_input, response_message, response_type, confidence)
+
+    def get_responses(self, user_inputs: List[str]) -> List[Dict]:
+        """Get responses for a batch of inputs, scoring trainer lookups in one vectorized pass"""
+        user_inputs = [text if isinstance(text, str) else str(text) for text in user_inputs]
+        results = [None] * len(user_inputs)
+        pending = []
+        
+        def flush_pending():
+            """Answer queued inputs with one batch call to the current trainer"""
+            if not pending:
+                return
+            trainer = self.subzero_trainer if self.personality_mode == "subzero" else self.normal_trainer
+            texts = [user_inputs[i] for i in pending]
+            raw_responses = trainer.get_responses(texts) if trainer else [None] * len(texts)
+            for i, response_raw in zip(pending, raw_responses):
+                response_message, response_type, confidence = self.get_trainer_response(user_inputs[i], response_raw)
+                results[i] = self.finalize_response(user_inputs[i], response_message, response_type, confidence)
+            pending.clear()
+        
+        for i, user_input in enumerate(user_inputs):
+            # Queued inputs belong to the personality active before a switch command
+            if self.is_personality_switch(user_input):
+                flush_pending()
+            
+            direct_response = self.get_direct_response(user_input)
+            if direct_response:
+                results[i] = direct_response
+            else:
+                pending.append(i)
+        
+        flush_pending()
+        return results
     
     def get_project_info(self, user_input: str) -> Optional[Dict]:
         """Handle questions about the KoinToss project specifically"""
-        user_lower = user_input.lower()
-        
         # KoinToss project questions
-        kointoss_keywords = ['kointoss', 'koin toss', 'coin toss', 'this project', 'your project', 'about you']
-        if any(keyword in user_lower for keyword in kointoss_keywords):
+        if route(user_input).has('project', 'kointoss'):
             if self.personality_mode == "subzero":
                 return {
                     "message": "🧊 KOINTOSS IS THE ULTIMATE CRYPTO WEAPON! A dual-personality AI assistant forged in the ice of digital warfare! I am your WARRIOR mode - providing COLD, calculated market insights and aggressive trading wisdom! The educational mode teaches, but I DOMINATE! Together we conquer the crypto realm with UNSTOPPABLE POWER! This project combines advanced AI, real-time market data, and pure DETERMINATION! ❄️⚔️💎",
@@ -314,10 +347,10 @@ class ImprovedDualPersonalityChatbot:
 
     def get_enhanced_crypto_knowledge(self, user_input: str) -> Optional[Dict]:
         """Provide enhanced crypto knowledge responses"""
-        user_lower = user_input.lower()
+        keywords = route(user_input)
         
         # Bitcoin questions
-        if any(word in user_lower for word in ['bitcoin', 'btc']):
+        if keywords.has('topic', 'bitcoin'):
             if self.personality_mode == "subzero":
                 return {
                     "message": "🧊 BITCOIN - THE APEX PREDATOR OF CRYPTO! Created by the legendary Satoshi Nakamoto in 2009, this digital beast commands RESPECT! 💎 21 million coins maximum - SCARCITY breeds POWER! No banks, no government control - PURE DECENTRALIZATION! When institutions tremble, you know it's UNSTOPPABLE! Bitcoin doesn't ask permission - it TAKES what it deserves! The blockchain fortress is UNBREAKABLE! This is the KING of all cryptocurrencies! ❄️⚔️👑",
@@ -334,7 +367,7 @@ class ImprovedDualPersonalityChatbot:
                 }
         
         # Ethereum questions
-        if any(word in user_lower for word in ['ethereum', 'eth']):
+        if keywords.has('topic', 'ethereum'):
             if self.personality_mode == "subzero":
                 return {
                     "message": "🧊 ETHEREUM - THE PROGRAMMABLE ICE FORTRESS! Created by the brilliant Vitalik Buterin in 2015, this platform is BUILT FOR WAR! 💪 Smart contracts = UNSTOPPABLE automation! DeFi kingdoms run on Ethereum's FROZEN rails! After 'The Merge' upgrade, ETH became a STAKING POWERHOUSE! 🔥 Supply burns while stakers earn - DEFLATIONARY DOMINANCE! This is where innovation meets PURE POWER! ❄️⚔️🚀",
@@ -351,7 +384,7 @@ class ImprovedDualPersonalityChatbot:
                 }
         
         # General crypto questions
-        if any(word in user_lower for word in ['crypto', 'cryptocurrency', 'what is crypto']):
+        if keywords.has('topic', 'crypto'):
             if self.personality_mode == "subzero":
                 return {
                     "message": "🧊 CRYPTOCURRENCY IS DIGITAL WARFARE! Decentralized money that CRUSHES traditional banking! Built on unbreakable blockchain technology, crypto offers TOTAL FREEDOM from government control! 💀 No central authority can stop the crypto revolution! Bitcoin leads the charge, Ethereum powers innovation, and thousands of altcoins follow! This is the future of money - COLD, CALCULATED, and UNSTOPPABLE! Join the revolution or get left in the ice! ❄️⚔️💎",
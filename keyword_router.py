@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Keyword Router - One Aho-Corasick pass over user input for every keyword table
+Compiles switch phrases, project keywords, crypto topics, price indicators and
+greeting words into a single automaton so a request is scanned once and every
+stage reads the same intent result (coin names live in coin_registry)
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Substring keyword tables: category -> value -> phrases that select it
+KEYWORD_TABLES = {
+    'switch': {
+        'subzero': ['switch to subzero', 'switch to sub-zero', 'activate subzero'],
+        'normal': ['switch to normal', 'normal mode', 'activate normal'],
+    },
+    'project': {
+        'kointoss': ['kointoss', 'koin toss', 'coin toss', 'this project', 'your project', 'about you'],
+    },
+    'topic': {
+        'bitcoin': ['bitcoin', 'btc'],
+        'ethereum': ['ethereum', 'eth'],
+        'crypto': ['crypto', 'cryptocurrency', 'what is crypto'],
+    },
+    'price': {indicator: [indicator] for indicator in [
+        'price', 'cost', 'value', 'worth', 'trading at', 'current', 'how much', 'what is the price',
+    ]},
+    'crypto_term': {term: [term] for term in [
+        'bitcoin', 'ethereum', 'crypto', 'blockchain', 'defi', 'trading', 'mining', 'wallet', 'pi', 'coin', 'nft',
+    ]},
+}
+
+# Whole-word keyword tables (the old \b...\b regexes)
+WORD_TABLES = {
+    'greeting': {'hello': ['hello', 'hi', 'hey']},
+    'farewell': {'goodbye': ['bye', 'goodbye', 'see you']},
+    'price_word': {word: [word] for word in ['price', 'cost', 'value']},
+}
+
+ROUTE_CACHE_SIZE = 1024
+
+
+def _is_word_char(char: str) -> bool:
+    """Regex \\w equivalent for a single character"""
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (category, value) whose phrase occurs in a text"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[int]] = [[]]
+        self.patterns: List[Tuple[str, str, int, bool]] = []  # category, value, length, whole word
+        self.delta: List[Dict[str, int]] = [{}]  # goto with failure links folded in (one lookup per char)
+        self.compiled = False
+
+    def add(self, phrase: str, category: str, value: str, whole_word: bool = False):
+        """Register a lowercase phrase; call compile() once every phrase is added"""
+        state = 0
+        for char in phrase.lower():
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.outputs[state].append(len(self.patterns))
+        self.patterns.append((category, value, len(phrase), whole_word))
+        self.compiled = False
+
+    def compile(self):
+        """Compute failure links breadth-first, merge outputs along them and build the transition table"""
+        queue = deque()
+        self.delta = [{} for _ in self.goto]
+        self.delta[0] = dict(self.goto[0])
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            # Parents are dequeued first, so the failure state's row is already complete
+            self.delta[state] = {**self.delta[self.fail[state]], **self.goto[state]}
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+        self.compiled = True
+
+    def matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Single pass over lowercase text yielding (end offset, pattern id) for every match"""
+        if not self.compiled:
+            self.compile()
+
+        delta, outputs, patterns = self.delta, self.outputs, self.patterns
+        state = 0
+        for end, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if not outputs[state]:
+                continue
+
+            for pattern_id in outputs[state]:
+                if patterns[pattern_id][3]:  # whole word
+                    start = end - patterns[pattern_id][2] + 1
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                        continue
+                yield end, pattern_id
+
+    def scan(self, text: str) -> Dict[str, FrozenSet[str]]:
+        """Single pass over lowercase text: matched values grouped by category"""
+        found: Dict[str, set] = {}
+        for _, pattern_id in self.matches(text):
+            category, value, _, _ = self.patterns[pattern_id]
+            found.setdefault(category, set()).add(value)
+        return {category: frozenset(values) for category, values in found.items()}
+
+
+class KeywordRoute:
+    """Intent/entity result of routing one input: matched values per keyword category"""
+
+    def __init__(self, text: str, matches: Dict[str, FrozenSet[str]]):
+        self.text = text
+        self.matches = matches
+
+    def has(self, category: str, value: Optional[str] = None) -> bool:
+        """Whether any (or the given) value of a category matched"""
+        values = self.matches.get(category, frozenset())
+        return bool(values) if value is None else value in values
+
+    def values(self, category: str) -> FrozenSet[str]:
+        """All matched values of a category"""
+        return self.matches.get(category, frozenset())
+
+    def first(self, category: str, priority: Iterable[str]) -> Optional[str]:
+        """First value in priority order that matched"""
+        values = self.matches.get(category, frozenset())
+        return next((value for value in priority if value in values), None)
+
+    def __repr__(self) -> str:
+        return f"KeywordRoute({self.matches!r})"
+
+
+def build_automaton() -> KeywordAutomaton:
+    """Compile every keyword table into one automaton"""
+    automaton = KeywordAutomaton()
+    for tables, whole_word in ((KEYWORD_TABLES, False), (WORD_TABLES, True)):
+        for category, entries in tables.items():
+            for value, phrases in entries.items():
+                for phrase in phrases:
+                    automaton.add(phrase, category, value, whole_word)
+    automaton.compile()
+    return automaton
+
+
+AUTOMATON = build_automaton()
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _route_lower(text: str) -> KeywordRoute:
+    """Scan an already lowercased input"""
+    return KeywordRoute(text, AUTOMATON.scan(text))
+
+
+def route(text: str) -> KeywordRoute:
+    """Route an input; repeated calls for the same text reuse the first scan"""
+    return _route_lower(text.lower())
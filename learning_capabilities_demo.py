@@ -73,14 +73,14 @@ def demonstrate_learning_capabilities():
         print("\n3. 📚 ADAPTIVE TRAINING DATA:")
         
         # Normal trainer stats
-        if hasattr(bot.normal_trainer, 'conversations'):
-            print(f"   📈 Normal Conversations: {len(bot.normal_trainer.conversations)} loaded")
+        if hasattr(bot.normal_trainer, 'conversation_count'):
+            print(f"   📈 Normal Conversations: {bot.normal_trainer.conversation_count} loaded")
             if hasattr(bot.normal_trainer, 'vocab_size'):
                 print(f"   📖 Vocabulary Size: {bot.normal_trainer.vocab_size} words")
         
         # Sub-Zero trainer stats  
-        if hasattr(bot.subzero_trainer, 'conversations'):
-            print(f"   🧊 Sub-Zero Conversations: {len(bot.subzero_trainer.conversations)} loaded")
+        if hasattr(bot.subzero_trainer, 'conversation_count'):
+            print(f"   🧊 Sub-Zero Conversations: {bot.subzero_trainer.conversation_count} loaded")
             if hasattr(bot.subzero_trainer, 'vocab_size'):
                 print(f"   ❄️ Sub-Zero Vocabulary: {bot.subzero_trainer.vocab_size} words")
         
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Market Data Client - Pooled keep-alive HTTP access to CoinGecko-style APIs
+One shared requests session with per-host connection pools, bounded per-host
+concurrency, (connect, read) timeouts and retries with backoff on 429/5xx.
+MarketDataClient is the blocking facade the trainers use; AsyncMarketDataClient
+runs the same pooled requests off the event loop for async callers
+"""
+
+import asyncio
+import os
+import threading
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+COINGECKO_API = 'https://api.coingecko.com/api/v3'
+KUCOIN_API = 'https://api.kucoin.com'
+FEAR_GREED_API = 'https://api.alternative.me'
+
+# Provider base URLs can be redirected (e.g. to mock_market_server) through these variables
+API_BASE_ENV = {
+    'coingecko': ('KOINTOSS_COINGECKO_API', COINGECKO_API),
+    'kucoin': ('KOINTOSS_KUCOIN_API', KUCOIN_API),
+    'fear_greed': ('KOINTOSS_FEAR_GREED_API', FEAR_GREED_API),
+}
+
+MAX_CONNECTIONS_PER_HOST = 4
+CONNECT_TIMEOUT = 3.0  # seconds
+READ_TIMEOUT = 5.0  # seconds
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3  # seconds, doubled on each retry
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def api_base(provider: str) -> str:
+    """Base URL for 'coingecko', 'kucoin' or 'fear_greed', honouring its environment override"""
+    env_var, default = API_BASE_ENV[provider]
+    return os.environ.get(env_var, default).rstrip('/')
+
+
+class MarketDataClient:
+    """Blocking market-data client over one pooled keep-alive session"""
+
+    def __init__(self, base_url: Optional[str] = None, max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+                 timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT), retries: int = MAX_RETRIES,
+                 backoff: float = RETRY_BACKOFF, session: Optional[requests.Session] = None):
+        if max_per_host <= 0:
+            raise ValueError("max_per_host must be positive")
+        self.base_url = (base_url or api_base('coingecko')).rstrip('/')
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.session = session or self._build_session(max_per_host, retries, backoff)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+
+    @staticmethod
+    def _build_session(max_per_host: int, retries: int, backoff: float) -> requests.Session:
+        """Session whose adapters keep up to max_per_host connections alive per host"""
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset(['GET']), respect_retry_after_header=True,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max_per_host, pool_block=True,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept': 'application/json', 'User-Agent': 'kointoss-market-data'})
+        return session
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Semaphore bounding in-flight requests to the url's host"""
+        host = urlsplit(url).netloc
+        with self._slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def get_json(self, path: str, params: Optional[Dict] = None):
+        """GET base_url/path and decode the JSON body, raising on HTTP errors"""
+        url = path if path.startswith('http') else f"{self.base_url}/{path.lstrip('/')}"
+        with self._host_slot(url):
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_prices(self, coin_ids: List[str], vs_currency: str = 'usd') -> Dict[str, float]:
+        """Current prices for several coin ids in one /simple/price request"""
+        if not coin_ids:
+            return {}
+        result = self.get_json('simple/price', {'ids': ','.join(coin_ids), 'vs_currencies': vs_currency})
+        return {coin_id: data[vs_currency] for coin_id, data in result.items() if vs_currency in data}
+
+    def get_markets(self, vs_currency: str = 'usd', per_page: int = 250, page: int = 1,
+                    ids: Optional[List[str]] = None) -> List[Dict]:
+        """One page of /coins/markets ordered by market cap"""
+        params = {
+            'vs_currency': vs_currency,
+            'order': 'market_cap_desc',
+            'per_page': per_page,
+            'page': page,
+            'sparkline': 'false',
+            'price_change_percentage': '24h',
+        }
+        if ids:
+            params['ids'] = ','.join(ids)
+        return self.get_json('coins/markets', params)
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+async def run_in_thread(func: Callable, *args, **kwargs):
+    """Await a blocking call on the loop's default executor (asyncio.to_thread needs Python 3.9)"""
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+
+class AsyncMarketDataClient:
+    """Awaitable facade that runs pooled requests in worker threads, keeping the event loop free"""
+
+    def __init__(self, client: Optional[MarketDataClient] = None):
+        self.client = client or get_market_data_client()
+
+    async def get_json(self, path: str, params: Optional[Dict] = None):
+        """Awaitable MarketDataClient.get_json"""
+        return await run_in_thread(self.client.get_json, path, params)
+
+    async def get_prices(self, coin_ids: List[str], vs_currency: str = 'usd') -> Dict[str, float]:
+        """Awaitable MarketDataClient.get_prices"""
+        return await run_in_thread(self.client.get_prices, coin_ids, vs_currency)
+
+    async def get_markets(self, vs_currency: str = 'usd', per_page: int = 250, page: int = 1,
+                          ids: Optional[List[str]] = None) -> List[Dict]:
+        """Awaitable MarketDataClient.get_markets"""
+        return await run_in_thread(self.client.get_markets, vs_currency, per_page, page, ids)
+
+    async def get_markets_pages(self, pages: int, vs_currency: str = 'usd', per_page: int = 250) -> List[Dict]:
+        """Several /coins/markets pages fetched concurrently, within the per-host limit"""
+        results = await asyncio.gather(*(self.get_markets(vs_currency, per_page, page)
+                                         for page in range(1, pages + 1)))
+        return [market for page in results for market in page]
+
+
+@lru_cache(maxsize=1)
+def get_market_data_client() -> MarketDataClient:
+    """Process-wide client so every caller shares one connection pool"""
+    return MarketDataClient()
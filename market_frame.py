@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Market Frame - Columnar market data with vectorized ranking and filters
+Stores merged market rows as a NumPy structured array (id, symbol, name and
+float price/cap/volume/change columns). Deduplication, top-N by any column
+(argpartition), gainers/losers and range filters run on whole columns; dicts
+are only produced for the rows a caller actually renders
+"""
+
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from retrieval_engine import top_k_array
+
+NUMERIC_COLUMNS = ('current_price', 'market_cap', 'total_volume', 'price_change_percentage_24h')
+
+MARKET_DTYPE = np.dtype([
+    ('id', object),
+    ('symbol', object),
+    ('name', object),
+] + [(column, np.float64) for column in NUMERIC_COLUMNS])
+
+
+def as_float(value) -> float:
+    """Numeric column value, with missing or malformed values as 0 (the old sort's default)"""
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class MarketFrame:
+    """Deduplicated market rows in columnar form, with the source dicts kept for lazy rendering"""
+
+    def __init__(self, markets: Sequence[Dict]):
+        # First occurrence of each id wins (CoinGecko before KuCoin)
+        ids = np.array([str(market.get('id', '')) for market in markets], dtype=object)
+        if len(ids):
+            _, first = np.unique(ids.astype(str), return_index=True)
+            keep = np.sort(first)
+        else:
+            keep = np.zeros(0, dtype=np.int64)
+
+        self._rows = tuple(markets[i] for i in keep)
+        self.data = np.zeros(len(keep), dtype=MARKET_DTYPE)
+        for field in ('id', 'symbol', 'name'):
+            self.data[field] = [row.get(field, '') for row in self._rows]
+        for column in NUMERIC_COLUMNS:
+            self.data[column] = [as_float(row.get(column)) for row in self._rows]
+        self.data.flags.writeable = False
+
+        self._index = {}
+        for i, row in enumerate(self._rows):
+            self._index.setdefault(str(row.get('id', '')).lower(), i)
+        for i, row in enumerate(self._rows):
+            self._index.setdefault(str(row.get('symbol', '')).lower(), i)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def position(self, coin: str) -> Optional[int]:
+        """Row of a coin by id (preferred) or symbol"""
+        return self._index.get(coin.lower())
+
+    def get(self, coin: str) -> Optional[MappingProxyType]:
+        """Read-only market dict for a coin id or symbol"""
+        i = self.position(coin)
+        return MappingProxyType(self._rows[i]) if i is not None else None
+
+    def where(self, min_market_cap: Optional[float] = None, max_market_cap: Optional[float] = None,
+              min_volume: Optional[float] = None, min_change: Optional[float] = None,
+              max_change: Optional[float] = None) -> np.ndarray:
+        """Rows whose market cap, volume and 24h change fall in the given ranges"""
+        mask = np.ones(len(self.data), dtype=bool)
+        if min_market_cap is not None:
+            mask &= self.data['market_cap'] >= min_market_cap
+        if max_market_cap is not None:
+            mask &= self.data['market_cap'] <= max_market_cap
+        if min_volume is not None:
+            mask &= self.data['total_volume'] >= min_volume
+        if min_change is not None:
+            mask &= self.data['price_change_percentage_24h'] >= min_change
+        if max_change is not None:
+            mask &= self.data['price_change_percentage_24h'] <= max_change
+        return np.flatnonzero(mask)
+
+    def top(self, n: int, by: str = 'market_cap', ascending: bool = False,
+            candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows of the n largest (or smallest) values of a column, ties to the earlier row"""
+        values = self.data[by]
+        if ascending:
+            values = -values
+        return np.array([i for i, _ in top_k_array(values, n, candidates)], dtype=np.int64)
+
+    def gainers(self, n: int, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows with the largest positive 24h change"""
+        rising = self.where(min_change=np.nextafter(0, 1))
+        if candidates is not None:
+            rising = np.intersect1d(rising, candidates)
+        return self.top(n, by='price_change_percentage_24h', candidates=rising)
+
+    def losers(self, n: int, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows with the largest negative 24h change"""
+        falling = self.where(max_change=-np.nextafter(0, 1))
+        if candidates is not None:
+            falling = np.intersect1d(falling, candidates)
+        return self.top(n, by='price_change_percentage_24h', ascending=True, candidates=falling)
+
+    def records(self, rows: Optional[Sequence[int]] = None) -> List[Dict]:
+        """Plain market dicts for the given rows only (default: all rows in frame order)"""
+        rows = range(len(self._rows)) if rows is None else rows
+        return [dict(self._rows[i]) for i in rows]
+
+    def take(self, rows: Sequence[int]) -> 'MarketFrame':
+        """New frame holding only the given rows, in that order"""
+        return MarketFrame([self._rows[i] for i in rows])
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Market Snapshot Service - Background-refreshed top-N market data
+A daemon thread pulls the merged CoinGecko/KuCoin market list on a schedule
+and swaps in a new immutable snapshot. Readers get the current snapshot in
+O(1) with its age; once it goes stale they keep getting it while a refresh
+runs in the background (stale-while-revalidate), so a slow upstream never
+blocks a request
+"""
+
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Union
+
+from market_frame import MarketFrame
+from market_store import MarketStore, get_market_store
+
+REFRESH_INTERVAL = 60.0  # seconds between scheduled refreshes
+STALE_AFTER = 120.0  # snapshot age at which a read triggers a background refresh
+COLD_START_TIMEOUT = 10.0  # longest a first read waits for the initial snapshot
+SNAPSHOT_TOP_N = 250
+
+
+class MarketSnapshot:
+    """Immutable columnar market frame and the time it was fetched"""
+
+    def __init__(self, markets: Union[MarketFrame, List[Dict]], fetched_at: float):
+        self.frame = markets if isinstance(markets, MarketFrame) else MarketFrame(markets)
+        self.fetched_at = fetched_at
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def get(self, coin: str) -> Optional[MappingProxyType]:
+        """Read-only market entry by CoinGecko id or symbol"""
+        return self.frame.get(coin)
+
+    def top(self, n: int) -> List[Dict]:
+        """Largest n markets by market cap as plain dicts"""
+        return self.frame.records(self.frame.top(n))
+
+    def gainers(self, n: int) -> List[Dict]:
+        """n biggest 24h gainers as plain dicts"""
+        return self.frame.records(self.frame.gainers(n))
+
+    def losers(self, n: int) -> List[Dict]:
+        """n biggest 24h losers as plain dicts"""
+        return self.frame.records(self.frame.losers(n))
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the data was fetched"""
+        return (time.time() if now is None else now) - self.fetched_at
+
+
+EMPTY_SNAPSHOT = MarketSnapshot([], fetched_at=0.0)
+
+
+def fetch_market_frame(top_n: int = SNAPSHOT_TOP_N) -> MarketFrame:
+    """Merged CoinGecko/KuCoin markets, cut to the top_n by market cap"""
+    from api_utils import CryptoAPIs
+    frame = CryptoAPIs().get_market_frame()
+    return frame.take(frame.top(top_n))
+
+
+class MarketSnapshotService:
+    """Keeps a market snapshot fresh in the background and serves it without blocking"""
+
+    def __init__(self, fetch: Callable[[], Union[MarketFrame, List[Dict]]] = fetch_market_frame,
+                 refresh_interval: float = REFRESH_INTERVAL, stale_after: float = STALE_AFTER,
+                 clock: Callable[[], float] = time.time, store: Optional[MarketStore] = None):
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.stale_after = stale_after
+        self.clock = clock
+        self.snapshot = EMPTY_SNAPSHOT
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._loaded = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Warm from the last persisted snapshot; if it is stale the first read revalidates
+        self.store = store
+        stored = store.load_markets() if store else None
+        if stored:
+            self.snapshot = MarketSnapshot(*stored)
+            self._loaded.set()
+
+    def refresh(self) -> bool:
+        """Fetch once and swap in the new snapshot; on failure the previous one is kept"""
+        try:
+            snapshot = MarketSnapshot(self.fetch(), fetched_at=self.clock())
+            if not len(snapshot):
+                raise ValueError("upstream returned no markets")
+            self.snapshot = snapshot
+            self.refreshes += 1
+            self.last_error = None
+            self.persist(snapshot)
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            return False
+        finally:
+            self._loaded.set()
+
+    def persist(self, snapshot: MarketSnapshot):
+        """Write a snapshot through to the store; a storage error never fails the refresh"""
+        if not self.store:
+            return
+        try:
+            self.store.save_markets(snapshot.frame.records(), snapshot.fetched_at)
+        except sqlite3.Error as e:
+            self.last_error = f"store: {e}"
+
+    def _refresh_once(self):
+        """refresh() unless another thread is already refreshing"""
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def revalidate(self):
+        """Start a background refresh unless one is already running"""
+        if not self._refresh_lock.locked():
+            threading.Thread(target=self._refresh_once, daemon=True).start()
+
+    def _run(self):
+        """Scheduler loop: refresh, then wait for the interval or a stop request"""
+        while not self._stop.is_set():
+            self._refresh_once()
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Start the scheduled background refreshes"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduled refreshes"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+
+    def is_stale(self, snapshot: Optional[MarketSnapshot] = None) -> bool:
+        """Whether a snapshot (default: the current one) is older than stale_after"""
+        snapshot = self.snapshot if snapshot is None else snapshot
+        return snapshot is EMPTY_SNAPSHOT or snapshot.age(self.clock()) >= self.stale_after
+
+    def get_snapshot(self, cold_start_timeout: float = COLD_START_TIMEOUT) -> MarketSnapshot:
+        """Current snapshot; stale ones are returned as-is while a background refresh runs"""
+        if not self._loaded.is_set():
+            # Only the very first reads wait, and never longer than the cold-start timeout
+            self.revalidate()
+            self._loaded.wait(cold_start_timeout)
+
+        snapshot = self.snapshot
+        if self.is_stale(snapshot):
+            self.revalidate()
+        return snapshot
+
+    def peek(self) -> MarketSnapshot:
+        """Current snapshot without waiting or triggering refreshes"""
+        return self.snapshot
+
+    def status(self) -> Dict:
+        """Snapshot age and refresh metadata"""
+        snapshot = self.snapshot
+        return {
+            'markets': len(snapshot),
+            'fetched_at': snapshot.fetched_at or None,
+            'age': round(snapshot.age(self.clock()), 1) if snapshot is not EMPTY_SNAPSHOT else None,
+            'stale': self.is_stale(snapshot),
+            'refreshing': self._refresh_lock.locked(),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_market_snapshot_service() -> MarketSnapshotService:
+    """Process-wide snapshot service, started on first use"""
+    service = MarketSnapshotService(store=get_market_store())
+    service.start()
+    return service
+
+
+def stop_market_snapshot_service():
+    """Stop the shared service if it was ever started; never creates one just to stop it"""
+    if get_market_snapshot_service.cache_info().currsize:
+        get_market_snapshot_service().stop()
+        get_market_snapshot_service.cache_clear()
+
+
+def snapshot_price(coin_id: str) -> Optional[float]:
+    """Price from the shared service's snapshot while fresh; never starts the service or waits"""
+    if get_market_snapshot_service.cache_info().currsize == 0:
+        return None
+    service = get_market_snapshot_service()
+    snapshot = service.peek()
+    if service.is_stale(snapshot):
+        return None
+    market = snapshot.get(coin_id)
+    return market.get('current_price') if market else None
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Market Store - SQLite tier under api_utils for prices, market snapshots and coin data
+Every successful upstream fetch is written through with its timestamp, so a
+restarted process warms from disk instead of stampeding CoinGecko, and the
+fallback path can quote last-known values with their age
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+MARKET_STORE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'market_cache.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    coin_id TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS coins (
+    coin_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def format_age(seconds: float) -> str:
+    """Human-readable age such as '45 seconds', '3 minutes' or '2 hours'"""
+    seconds = max(0, int(seconds))
+    for unit, size in (('day', 86400), ('hour', 3600), ('minute', 60)):
+        if seconds >= size:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{seconds} second{'s' if seconds != 1 else ''}"
+
+
+class MarketStore:
+    """Write-through SQLite cache of last-known prices, coin market entries and snapshots"""
+
+    def __init__(self, path: str = MARKET_STORE_FILE, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        # One connection shared under a lock; WAL lets several worker processes share the file
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _write(self, sql: str, rows: List[tuple]):
+        """Run one statement for many rows in a single transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+
+    def _read_one(self, sql: str, params: tuple) -> Optional[tuple]:
+        """First row of a query"""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def save_prices(self, prices: Dict[str, float], updated: Optional[float] = None):
+        """Record fetched prices (coin id -> USD)"""
+        updated = self.clock() if updated is None else updated
+        self._write('INSERT OR REPLACE INTO prices VALUES (?, ?, ?)',
+                    [(coin_id, float(price), updated) for coin_id, price in prices.items() if price is not None])
+
+    def load_price(self, coin_id: str) -> Optional[Tuple[float, float]]:
+        """Last-known (price, updated) for a coin"""
+        return self._read_one('SELECT price, updated FROM prices WHERE coin_id = ?', (coin_id,))
+
+    def save_markets(self, markets: List[Dict], fetched_at: Optional[float] = None, name: str = 'top'):
+        """Record a market snapshot, plus each coin's entry and price"""
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        self._write('INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)', [(name, json.dumps(markets), fetched_at)])
+        self._write('INSERT OR REPLACE INTO coins VALUES (?, ?, ?)',
+                    [(market['id'], json.dumps(market), fetched_at) for market in markets if market.get('id')])
+        self.save_prices({market['id']: market.get('current_price') for market in markets if market.get('id')},
+                         fetched_at)
+
+    def load_markets(self, name: str = 'top') -> Optional[Tuple[List[Dict], float]]:
+        """Last stored (markets, fetched_at) snapshot"""
+        row = self._read_one('SELECT data, fetched_at FROM snapshots WHERE name = ?', (name,))
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def load_coin(self, coin_id: str) -> Optional[Tuple[Dict, float]]:
+        """Last stored (market entry, updated) for a coin"""
+        row = self._read_one('SELECT data, updated FROM coins WHERE coin_id = ?', (coin_id,))
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_market_store() -> MarketStore:
+    """Process-wide store backed by MARKET_STORE_FILE"""
+    return MarketStore()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Mock Market Server - Local record/replay stand-in for the market and news APIs
+Serves CoinGecko (/api/v3/simple/price, /coins/markets, /search/trending, /news),
+KuCoin (/api/v1/market/allTickers) and alternative.me (/fng/) from one fixture
+file, with configurable latency, jitter and error injection per route, so the
+I/O paths in api_utils, crypto_news_insights and the trainers can be
+benchmarked and regression-tested without the internet. Point them at it with
+the KOINTOSS_*_API variables from environ(); --record captures fresh fixtures
+from the live APIs
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from coin_registry import SNAPSHOT_FILE
+from market_data_client import COINGECKO_API, FEAR_GREED_API, KUCOIN_API
+
+# Request path -> fixture route name
+ROUTES = {
+    '/api/v3/ping': 'ping',
+    '/api/v3/simple/price': 'simple_price',
+    '/api/v3/coins/markets': 'coins_markets',
+    '/api/v3/search/trending': 'search_trending',
+    '/api/v3/news': 'news',
+    '/api/v1/market/allTickers': 'kucoin_all_tickers',
+    '/fng/': 'fng',
+}
+
+# Fixture route -> live URL and query used by --record (simple_price is derived from coins_markets)
+RECORD_SOURCES = {
+    'coins_markets': (f'{COINGECKO_API}/coins/markets',
+                      {'vs_currency': 'usd', 'order': 'market_cap_desc', 'per_page': 250, 'page': 1,
+                       'sparkline': 'false', 'price_change_percentage': '24h'}),
+    'search_trending': (f'{COINGECKO_API}/search/trending', None),
+    'news': (f'{COINGECKO_API}/news', None),
+    'kucoin_all_tickers': (f'{KUCOIN_API}/api/v1/market/allTickers', None),
+    'fng': (f'{FEAR_GREED_API}/fng/', {'limit': 1}),
+}
+
+
+class FaultProfile:
+    """Latency, jitter and error injection applied to a route"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self, rng: random.Random) -> float:
+        """Seconds to hold a response: latency plus uniform jitter, never negative"""
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter)) if self.jitter else self.latency
+
+    def fails(self, rng: random.Random) -> bool:
+        """Whether to answer this request with error_status"""
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+def synthetic_fixtures(coins: int = 100, seed: int = 0) -> Dict:
+    """Deterministic fixtures for the top registry coins, used when no recording is available"""
+    rng = random.Random(seed)
+    with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+        listed = json.load(f)['coins'][:coins]
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    markets = []
+    for rank, coin in enumerate(listed, 1):
+        market_cap = 1.2e12 / rank ** 1.6
+        price = 1.0 if coin['symbol'] in ('usdt', 'usdc', 'dai') else round(10 ** rng.uniform(-2, 4.6), 6)
+        markets.append({
+            'id': coin['id'],
+            'symbol': coin['symbol'],
+            'name': coin['name'],
+            'current_price': price,
+            'market_cap': round(market_cap),
+            'market_cap_rank': rank,
+            'total_volume': round(market_cap * rng.uniform(0.02, 0.2)),
+            'price_change_percentage_24h': round(rng.gauss(0, 4), 3),
+            'price_change_percentage_7d': round(rng.gauss(0, 9), 3),
+            'last_updated': now.isoformat(),
+        })
+
+    trending = rng.sample(markets[:50], 7)
+    tickers = [{
+        'symbol': f"{market['symbol'].upper()}-USDT",
+        'symbolName': f"{market['symbol'].upper()}-USDT",
+        'last': str(market['current_price']),
+        'changeRate': str(round(market['price_change_percentage_24h'] / 100, 4)),
+        'vol': str(round(market['total_volume'] / market['current_price'], 2)),
+    } for market in markets if market['symbol'] != 'usdt']
+    fear_greed = rng.randint(10, 90)
+
+    return {
+        'coins_markets': markets,
+        'search_trending': {'coins': [{'item': {
+            'id': market['id'], 'coin_id': rank, 'name': market['name'], 'symbol': market['symbol'].upper(),
+            'market_cap_rank': market['market_cap_rank'], 'score': rank,
+        }} for rank, market in enumerate(trending)], 'nfts': [], 'categories': []},
+        'news': {'data': [{
+            'title': f"{market['name']} {'rallies' if market['price_change_percentage_24h'] > 0 else 'slides'} "
+                     f"{abs(market['price_change_percentage_24h']):.1f}% as traders watch volume",
+            'description': f"{market['name']} ({market['symbol'].upper()}) moved on the day.",
+            'url': f"https://news.example.com/{market['id']}-{i}",
+            'created_at': int((now - timedelta(hours=i)).timestamp()),
+            'news_site': 'Mock Wire',
+        } for i, market in enumerate(markets[:20])]},
+        'kucoin_all_tickers': {'code': '200000', 'data': {'time': int(now.timestamp() * 1000), 'ticker': tickers}},
+        'fng': {'name': 'Fear and Greed Index', 'metadata': {'error': None}, 'data': [{
+            'value': str(fear_greed),
+            'value_classification': 'Fear' if fear_greed < 45 else 'Neutral' if fear_greed <= 55 else 'Greed',
+            'timestamp': str(int(now.timestamp())),
+        }]},
+    }
+
+
+def load_fixtures(fixtures_file: str) -> Dict:
+    """Fixtures recorded by record_fixtures"""
+    with open(fixtures_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record_fixtures(fixtures_file: str, routes: Optional[List[str]] = None) -> List[str]:
+    """Fetch the live endpoints and save their bodies as fixtures, returning the routes recorded"""
+    fixtures = load_fixtures(fixtures_file) if os.path.exists(fixtures_file) else {}
+    recorded = []
+    for route in routes or RECORD_SOURCES:
+        url, params = RECORD_SOURCES[route]
+        try:
+            response = requests.get(url, params=params, timeout=15)
+            response.raise_for_status()
+            fixtures[route] = response.json()
+            recorded.append(route)
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Could not record {route}: {e}")
+    with open(fixtures_file, 'w', encoding='utf-8') as f:
+        json.dump(fixtures, f, indent=1)
+    return recorded
+
+
+class MockMarketServer:
+    """Threaded HTTP server replaying market and news fixtures with injected latency and errors"""
+
+    def __init__(self, fixtures: Optional[Dict] = None, fixtures_file: Optional[str] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 seed: Optional[int] = None, host: str = '127.0.0.1', port: int = 0):
+        # Routes missing from a partial recording fall back to synthetic data
+        self.fixtures = {**synthetic_fixtures(), **(fixtures or (load_fixtures(fixtures_file) if fixtures_file else {}))}
+        self.default_faults = FaultProfile(latency, jitter, error_rate, error_status)
+        self.faults: Dict[str, FaultProfile] = {}
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes: Dict[str, Callable[[Dict[str, str]], object]] = {
+            'ping': lambda query: {'gecko_says': '(V3) To the Moon!'},
+            'simple_price': self.simple_price,
+            'coins_markets': self.coins_markets,
+            'search_trending': lambda query: self.fixtures['search_trending'],
+            'news': lambda query: self.fixtures['news'],
+            'kucoin_all_tickers': lambda query: self.fixtures['kucoin_all_tickers'],
+            'fng': lambda query: self.fixtures['fng'],
+        }
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server"""
+        return f'http://{self.host}:{self.port}'
+
+    def environ(self) -> Dict[str, str]:
+        """Environment overrides that point market_data_client.api_base at this server"""
+        return {
+            'KOINTOSS_COINGECKO_API': f'{self.url}/api/v3',
+            'KOINTOSS_KUCOIN_API': self.url,
+            'KOINTOSS_FEAR_GREED_API': self.url,
+        }
+
+    def configure(self, route: str, **faults) -> FaultProfile:
+        """Give one route (a ROUTES value) its own latency, jitter, error_rate or error_status"""
+        if route not in self._routes:
+            raise KeyError(f"unknown route: {route}")
+        base = self.faults.get(route, self.default_faults)
+        settings = {name: getattr(base, name) for name in ('latency', 'jitter', 'error_rate', 'error_status')}
+        settings.update(faults)
+        self.faults[route] = FaultProfile(**settings)
+        return self.faults[route]
+
+    def simple_price(self, query: Dict[str, str]) -> Dict:
+        """/simple/price answered from the recorded market prices"""
+        vs_currency = query.get('vs_currencies', 'usd').split(',')[0]
+        prices = {market['id']: market.get('current_price') for market in self.fixtures['coins_markets']}
+        return {coin_id: {vs_currency: prices[coin_id]}
+                for coin_id in query.get('ids', '').split(',') if prices.get(coin_id) is not None}
+
+    def coins_markets(self, query: Dict[str, str]) -> List[Dict]:
+        """/coins/markets page (or ids filter) over the recorded listing, which is in market-cap order"""
+        markets = self.fixtures['coins_markets']
+        if query.get('ids'):
+            wanted = set(query['ids'].split(','))
+            markets = [market for market in markets if market['id'] in wanted]
+        per_page = min(int(query.get('per_page', 100)), 250)
+        start = (max(int(query.get('page', 1)), 1) - 1) * per_page
+        return markets[start:start + per_page]
+
+    def respond(self, path: str) -> tuple:
+        """(status, JSON body, route or None, delay) for a request path; counts it"""
+        parts = urlsplit(path)
+        path = parts.path.rstrip('/')
+        route = ROUTES.get(path) or ROUTES.get(path + '/')  # '/fng' and '/fng/' both match
+        if route is None:
+            return 404, {'error': 'Not Found'}, None, 0.0
+
+        faults = self.faults.get(route, self.default_faults)
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            delay = faults.delay(self.random)
+            failed = faults.fails(self.random)
+            if failed:
+                self.errors[route] = self.errors.get(route, 0) + 1
+        if failed:
+            return faults.error_status, {'error': 'injected failure'}, route, delay
+
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        try:
+            return 200, self._routes[route](query), route, delay
+        except (KeyError, ValueError) as e:
+            return 400, {'error': str(e)}, route, delay
+
+    def stats(self) -> Dict:
+        """Requests and injected errors per route"""
+        with self._lock:
+            return {'requests': dict(self.requests), 'errors': dict(self.errors)}
+
+    def start(self) -> str:
+        """Serve from a daemon thread, returning the base URL once listening"""
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Replays fixtures for GET requests"""
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+            disable_nagle_algorithm = True  # headers and body are separate writes
+
+            def do_GET(self):
+                """Answer after the route's injected delay"""
+                status, payload, _, delay = mock.respond(self.path)
+                if delay:
+                    time.sleep(delay)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                """Silence request logging"""
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def benchmark(server: MockMarketServer, rounds: int = 20) -> Dict[str, Dict[str, float]]:
+    """Time the market and news I/O paths against a running server (p50/p95/max in ms)"""
+    os.environ.update(server.environ())
+    from advanced_autonomous_trainer import AdvancedAutonomousTrainer
+    from crypto_news_insights import CryptoNewsInsights
+    from dual_personality_intensive_trainer import DualPersonalityAdvancedTrainer
+    from market_data_client import get_market_data_client
+
+    get_market_data_client.cache_clear()  # rebuild against the overridden base URL
+    client = get_market_data_client()
+    news = CryptoNewsInsights()
+    autonomous = AdvancedAutonomousTrainer(None)
+    dual = DualPersonalityAdvancedTrainer(None)
+    paths = {
+        'MarketDataClient.get_prices': lambda: client.get_prices(['bitcoin', 'ethereum', 'solana']),
+        'MarketDataClient.get_markets': lambda: client.get_markets(per_page=250),
+        'CryptoNewsInsights._fetch_coingecko_news': lambda: news._fetch_coingecko_news('bitcoin', 10),
+        'AdvancedAutonomousTrainer.fetch_real_time_data': autonomous.fetch_real_time_data,
+        'DualPersonalityAdvancedTrainer.fetch_enhanced_market_data': dual.fetch_enhanced_market_data,
+    }
+
+    results = {}
+    for name, call in paths.items():
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            'p50_ms': round(timings[len(timings) // 2], 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2),
+            'max_ms': round(timings[-1], 2),
+        }
+    get_market_data_client.cache_clear()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay market and news fixtures locally")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--fixtures', help="fixture file (default: synthetic fixtures from the coin registry)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="uniform +/- seconds around the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--record', metavar='FILE', help="record live responses into FILE and exit")
+    parser.add_argument('--bench', type=int, metavar='ROUNDS', help="benchmark the I/O paths and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        recorded = record_fixtures(args.record)
+        print(f"📼 Recorded {len(recorded)}/{len(RECORD_SOURCES)} routes into {args.record}")
+    else:
+        server = MockMarketServer(fixtures_file=args.fixtures, latency=args.latency, jitter=args.jitter,
+                                  error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+                                  port=0 if args.bench else args.port)
+        server.start()
+        if args.bench:
+            for name, timing in benchmark(server, args.bench).items():
+                print(f"⏱️ {name}: p50 {timing['p50_ms']} ms, p95 {timing['p95_ms']} ms, max {timing['max_ms']} ms")
+            server.stop()
+        else:
+            print(f"📡 Mock market server on {server.url} (Ctrl+C to stop)")
+            for name, value in server.environ().items():
+                print(f"   export {name}={value}")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                server.stop()
+                print("🛑 Mock server stopped")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+News Index - Inverted index over articles by coin id and topic tag
+Each article is posted under the coins it mentions (resolved through the coin
+registry, so 'BTC', 'btc' and 'Bitcoin' share one key) and under its words and
+analysis factors as topic tags. Posting lists stay in publication order, so a
+per-coin query is a dictionary lookup plus a top-k-by-recency merge instead of
+a substring scan of every title and description
+"""
+
+import bisect
+import heapq
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from coin_registry import CoinRegistry, alias_tokens, get_registry
+
+Posting = Tuple[float, int]  # (published_ts, ref): ref breaks ties, larger is newer
+
+
+def coin_key(coin_id: str) -> str:
+    """Posting key for a coin id"""
+    return f"coin:{coin_id}"
+
+
+def tag_key(tag: str) -> str:
+    """Posting key for a topic tag"""
+    return f"tag:{tag}"
+
+
+class NewsIndex:
+    """Posting lists by coin and topic tag, updated as articles are added and removed"""
+
+    def __init__(self, registry: Optional[CoinRegistry] = None):
+        self.registry = registry or get_registry()
+        self.articles: Dict[int, Dict] = {}
+        self.postings: Dict[str, List[Posting]] = {}
+        self.keys: Dict[int, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def __contains__(self, ref: int) -> bool:
+        return ref in self.articles
+
+    def article_keys(self, article: Dict) -> FrozenSet[str]:
+        """Coin keys (article['coins'] when ingest already scanned it) and tag keys for an article"""
+        text = f"{article.get('title', '')} {article.get('description', '')}"
+        coins = article['coins'] if 'coins' in article else self.registry.scan(text)
+        factors = article.get('analysis') or {}
+        tags = set(alias_tokens(text))
+        tags.update(factors.get('technical_factors', ()), factors.get('fundamental_factors', ()))
+        return frozenset([coin_key(coin_id) for coin_id in coins] + [tag_key(tag) for tag in tags])
+
+    def add(self, ref: int, article: Dict):
+        """Post an article under every key; ref must be unique and grow with arrival"""
+        posting = (article.get('published_ts', 0.0), ref)
+        keys = self.article_keys(article)
+        self.articles[ref] = article
+        self.keys[ref] = keys
+        for key in keys:
+            bisect.insort(self.postings.setdefault(key, []), posting)
+
+    def remove(self, ref: int):
+        """Drop an article from every posting list"""
+        article = self.articles.pop(ref, None)
+        if article is None:
+            return
+        posting = (article.get('published_ts', 0.0), ref)
+        for key in self.keys.pop(ref):
+            postings = self.postings[key]
+            i = bisect.bisect_left(postings, posting)
+            if i < len(postings) and postings[i] == posting:
+                del postings[i]
+            if not postings:
+                del self.postings[key]
+
+    def _newest(self, keys: List[str], limit: Optional[int]) -> List[Dict]:
+        """Newest articles posted under any of the keys, each once"""
+        merged: Iterator[Posting] = heapq.merge(*(reversed(self.postings[key]) for key in keys), reverse=True)
+        found, seen = [], set()
+        for _, ref in merged:
+            if ref not in seen:
+                seen.add(ref)
+                found.append(self.articles[ref])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def coins(self, topic: str) -> List[str]:
+        """Coin ids a query names: an exact id, symbol or alias, or the coins mentioned in it"""
+        coin_id = self.registry.resolve(topic)
+        return [coin_id] if coin_id else self.registry.scan(topic)
+
+    def search(self, topic: str, limit: Optional[int] = None) -> List[Dict]:
+        """Newest articles on the coins a topic names, else those tagged with every word of it"""
+        keys = [coin_key(coin_id) for coin_id in self.coins(topic) if coin_key(coin_id) in self.postings]
+        if keys:
+            return self._newest(keys, limit)
+
+        tags = [tag_key(tag) for tag in alias_tokens(topic)]
+        if not tags or any(tag not in self.postings for tag in tags):
+            return []
+        # Walk the shortest posting list newest first, keeping articles that carry every other tag
+        tags.sort(key=lambda tag: len(self.postings[tag]))
+        found = []
+        for _, ref in reversed(self.postings[tags[0]]):
+            if all(tag in self.keys[ref] for tag in tags[1:]):
+                found.append(self.articles[ref])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def stats(self) -> Dict:
+        """Articles, coins and tags indexed"""
+        coins = sum(key.startswith('coin:') for key in self.postings)
+        return {'articles': len(self.articles), 'coins': coins, 'tags': len(self.postings) - coins}
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+News Ingest - Streaming ingestion of every news source into one bounded article log
+Raw items from CoinGecko, NewsAPI or RSS-style feeds are normalized into the
+news_store schema and dropped when their canonical URL was seen before or when
+a near-identical title+description is already stored: SimHash within a few
+bits, confirmed by token overlap and the same coin mentions, so templated
+headlines about different coins stay apart. Each unique article is scored once
+per batch and kept in a log ordered by publication time that readers follow
+with a cursor or query through a coin/tag news_index, so a story syndicated by
+several outlets is counted once
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+from coin_registry import CoinRegistry, get_registry
+from news_index import NewsIndex
+from news_store import normalize_article
+from response_cache import ResponseCache
+
+NEWS_LOG_SIZE = 1000  # articles kept, oldest published evicted first
+SEEN_URLS_SIZE = 4 * NEWS_LOG_SIZE  # URLs remembered after eviction, so old stories are not re-scored
+SIMHASH_MAX_DISTANCE = 12  # bits; rewrites of one story land 7-9 apart, unrelated stories about 30
+NEAR_DUP_JACCARD = 0.5  # token overlap that confirms a SimHash candidate (templated headlines stay apart)
+
+# Source field names for each schema field; the first non-empty one wins
+FIELD_ALIASES = {
+    'title': ('title', 'headline'),
+    'description': ('description', 'summary', 'body', 'content'),
+    'url': ('url', 'link', 'guid'),
+    'published_at': ('published_at', 'publishedAt', 'created_at', 'pubDate', 'published_on', 'date'),
+    'source': ('source', 'news_site', 'source_name'),
+}
+ALIAS_KEYS = frozenset(key for aliases in FIELD_ALIASES.values() for key in aliases)
+TRACKING_PARAMS = frozenset(('fbclid', 'gclid', 'ref'))
+
+
+def normalize(item: Dict, source: Optional[str] = None) -> Dict:
+    """One article in the news_store schema plus published_ts, from any source's field names"""
+    article = {key: value for key, value in item.items() if key not in ALIAS_KEYS}
+    for field, aliases in FIELD_ALIASES.items():
+        article[field] = next((item[key] for key in aliases if item.get(key) not in (None, '')), None)
+    if isinstance(article['source'], dict):  # NewsAPI: {'id': ..., 'name': ...}
+        article['source'] = article['source'].get('name')
+    article['source'] = article['source'] or source
+    return normalize_article(article)
+
+
+def canonical_url(url: str) -> str:
+    """URL without scheme, 'www.', fragment, trailing slash or tracking parameters, query sorted"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith('www.') else host
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS)
+    canonical = host + parts.path.rstrip('/')
+    return f"{canonical}?{urlencode(query)}" if query else canonical
+
+
+def url_key(url: str) -> Optional[bytes]:
+    """Hash of the canonical URL, or None for articles without one"""
+    canonical = canonical_url(url) if url else ''
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest() if canonical else None
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercase words and numbers"""
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def simhash(words: Sequence[str]) -> int:
+    """64-bit SimHash over word unigrams and bigrams"""
+    features = list(words) + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    hashes = np.frombuffer(b''.join(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                                    for feature in features), dtype=np.uint8).reshape(-1, 8)
+    bits = np.unpackbits(hashes, axis=1, bitorder='little')
+    majority = (2 * bits.sum(axis=0, dtype=np.int64) > len(features)).astype(np.uint8)
+    return int.from_bytes(np.packbits(majority, bitorder='little').tobytes(), 'little')
+
+
+def hamming(fingerprints: np.ndarray, fingerprint: int) -> np.ndarray:
+    """Bits differing between each stored fingerprint and one fingerprint"""
+    xor = (fingerprints ^ np.uint64(fingerprint)).view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(xor, axis=1).sum(axis=1, dtype=np.int64)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Overlap of two token sets (0.0 when both are empty)"""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+class NewsIngestor:
+    """Dedups, scores once and stores articles arriving from any number of sources"""
+
+    def __init__(self, score: Optional[Callable[[List[Dict]], object]] = None, max_articles: int = NEWS_LOG_SIZE,
+                 max_distance: int = SIMHASH_MAX_DISTANCE, min_jaccard: float = NEAR_DUP_JACCARD,
+                 registry: Optional[CoinRegistry] = None):
+        self.score = score  # called once per batch with the new unique articles, may annotate them in place
+        self.registry = registry or get_registry()
+        self.max_articles = max_articles
+        self.max_distance = max_distance
+        self.min_jaccard = min_jaccard
+        self.entries: List[Tuple[float, int, Dict]] = []  # (published_ts, seq, article), oldest first
+        self.seen_urls = ResponseCache(max_size=max(SEEN_URLS_SIZE, 4 * max_articles), default_ttl=None)
+        # Near-duplicate state of the stored articles, aligned by position
+        self.fingerprints = np.zeros(0, dtype=np.uint64)
+        self.fingerprint_seqs = np.zeros(0, dtype=np.int64)
+        self.token_sets: List[FrozenSet[str]] = []
+        self.coin_sets: List[FrozenSet[str]] = []
+        self.index = NewsIndex(self.registry)  # by coin and tag, keyed by seq
+        self.seq = 0  # sequence number of the last stored article, the cursor for since()
+        self.duplicates = {'url': 0, 'near': 0}
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _near_duplicate(self, fingerprints: np.ndarray, token_sets: List[FrozenSet[str]],
+                        coin_sets: List[FrozenSet[str]], fingerprint: int, words: FrozenSet[str],
+                        coins: FrozenSet[str]) -> bool:
+        """Whether a SimHash candidate within max_distance mentions the same coins and shares enough tokens"""
+        candidates = np.flatnonzero(hamming(fingerprints, fingerprint) <= self.max_distance)
+        return any(coin_sets[i] == coins and jaccard(words, token_sets[i]) >= self.min_jaccard
+                   for i in candidates)
+
+    def ingest(self, items: Sequence[Dict], source: Optional[str] = None) -> List[Dict]:
+        """Normalize, dedup, score and store a batch, returning the articles that were new"""
+        with self._lock:
+            fingerprints = np.concatenate([self.fingerprints, np.zeros(len(items), dtype=np.uint64)])
+            token_sets = list(self.token_sets)
+            coin_sets = list(self.coin_sets)
+            batch_urls = set()
+            fresh = []
+            for item in items:
+                article = normalize(item, source)
+                key = url_key(article['url'])
+                if key is not None and (key in batch_urls or key in self.seen_urls):
+                    self.duplicates['url'] += 1
+                    continue
+                text = f"{article['title']} {article['description']}"
+                words = tokens(text)
+                article['coins'] = self.registry.scan(text)
+                fingerprint, word_set, coins = simhash(words), frozenset(words), frozenset(article['coins'])
+                if self._near_duplicate(fingerprints[:len(token_sets)], token_sets, coin_sets,
+                                        fingerprint, word_set, coins):
+                    self.duplicates['near'] += 1
+                    continue
+                if key is not None:
+                    batch_urls.add(key)
+                fingerprints[len(token_sets)] = fingerprint
+                token_sets.append(word_set)
+                coin_sets.append(coins)
+                fresh.append((article, key, fingerprint))
+
+            if not fresh:
+                return []
+            if self.score:
+                self.score([article for article, _, _ in fresh])
+
+            # Sequence numbers follow publication time within a batch
+            order = sorted(range(len(fresh)), key=lambda i: fresh[i][0]['published_ts'])
+            seqs = np.zeros(len(fresh), dtype=np.int64)
+            for i in order:
+                article, key, _ = fresh[i]
+                self.seq += 1
+                seqs[i] = self.seq
+                bisect.insort(self.entries, (article['published_ts'], self.seq, article))
+                self.index.add(self.seq, article)
+                if key is not None:
+                    self.seen_urls.set(key, self.seq)
+            self.fingerprints = fingerprints[:len(token_sets)]
+            self.fingerprint_seqs = np.concatenate([self.fingerprint_seqs, seqs])
+            self.token_sets = token_sets
+            self.coin_sets = coin_sets
+            self._evict()
+            return [article for _, seq, article in self.entries if seq > self.seq - len(fresh)]
+
+    def _evict(self):
+        """Drop the oldest published articles beyond max_articles (their URLs stay remembered)"""
+        excess = len(self.entries) - self.max_articles
+        if excess <= 0:
+            return
+        evicted = [seq for _, seq, _ in self.entries[:excess]]
+        del self.entries[:excess]
+        for seq in evicted:
+            self.index.remove(seq)
+        keep = ~np.isin(self.fingerprint_seqs, evicted)
+        self.fingerprints = self.fingerprints[keep]
+        self.fingerprint_seqs = self.fingerprint_seqs[keep]
+        self.token_sets = [words for words, kept in zip(self.token_sets, keep) if kept]
+        self.coin_sets = [coins for coins, kept in zip(self.coin_sets, keep) if kept]
+        self.evicted += excess
+
+    def since(self, cursor: int = 0) -> Tuple[List[Dict], int]:
+        """Stored articles added after a cursor, oldest published first, and the cursor to pass next time"""
+        with self._lock:
+            return [article for _, seq, article in self.entries if seq > cursor], self.seq
+
+    def latest(self, limit: int = 10) -> List[Dict]:
+        """Most recently published articles, newest first"""
+        with self._lock:
+            return [article for _, _, article in reversed(self.entries[-limit:])] if limit > 0 else []
+
+    def search(self, topic: str, limit: int = 10) -> List[Dict]:
+        """Newest stored articles on a coin or topic, from the index"""
+        with self._lock:
+            return self.index.search(topic, limit)
+
+    def stats(self) -> Dict:
+        """Stored, evicted and duplicate counts"""
+        return {
+            'stored': len(self.entries),
+            'cursor': self.seq,
+            'evicted': self.evicted,
+            'duplicates': dict(self.duplicates),
+            'index': self.index.stats(),
+        }
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+News Store - One normalized article pool, served by topic and refreshed in the background
+The whole upstream feed is fetched as a single pool; topic queries are
+news_index lookups by coin or tag (memoized per pool) and every limit is a
+slice of the same result, so '3 bitcoin articles' reuses the work done for
+'5 bitcoin articles'. A stale pool keeps being served while one background
+refresh replaces it (stale-while-revalidate), failed refreshes back off
+exponentially, and the demo articles stand in until the first fetch lands, so
+readers never wait on the news API
+"""
+
+import re
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from news_index import NewsIndex
+
+NEWS_STALE_AFTER = 3600.0  # seconds, the old per-key cache expiry
+RETRY_BACKOFF = 30.0  # seconds before retrying after a failed refresh, doubled per consecutive failure
+MAX_RETRY_BACKOFF = 1800.0
+NEWS_POOL_SIZE = 100  # articles kept from one fetch
+ALL_TOPICS = 'cryptocurrency'  # the topic that means 'everything'
+
+ARTICLE_FIELDS = ('title', 'description', 'url', 'published_at', 'source')
+
+
+def published_timestamp(value) -> float:
+    """Epoch seconds from epoch numbers (s or ms), ISO 8601 or RFC 822 dates; 0.0 when unparseable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) / 1000 if value > 1e12 else float(value)
+    text = str(value or '').strip()
+    if not text:
+        return 0.0
+    if re.fullmatch(r'\d+(\.\d+)?', text):
+        return published_timestamp(float(text))
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def normalize_article(article: Dict) -> Dict:
+    """Article with every standard field present as a string plus published_ts (extra fields are kept)"""
+    normalized = dict(article)
+    for field in ARTICLE_FIELDS:
+        value = article.get(field)
+        normalized[field] = '' if value is None else str(value)
+    if 'published_ts' not in normalized:
+        normalized['published_ts'] = published_timestamp(article.get('published_at'))
+    return normalized
+
+
+class NewsPool:
+    """Immutable set of articles, indexed by coin and tag, with per-topic matches memoized"""
+
+    def __init__(self, articles: List[Dict], fetched_at: Optional[float]):
+        self.articles: Tuple[Dict, ...] = tuple(normalize_article(article) for article in articles[:NEWS_POOL_SIZE])
+        self.fetched_at = fetched_at  # None: stand-in articles that were never fetched
+        self._topics: Dict[str, Tuple[Dict, ...]] = {}
+        # Pools arrive newest first, so earlier articles get larger refs and win publication-time ties
+        self.index = NewsIndex()
+        for position, article in enumerate(self.articles):
+            self.index.add(len(self.articles) - position, article)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def select(self, topic: str) -> Tuple[Dict, ...]:
+        """Newest articles on the coin or tags a topic names, or the whole pool when none match"""
+        key = topic.strip().lower()
+        matches = self._topics.get(key)
+        if matches is None:
+            if key in ('', ALL_TOPICS):
+                matches = self.articles
+            else:
+                matches = tuple(self.index.search(key)) or self.articles
+            self._topics[key] = matches
+        return matches
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the pool was fetched"""
+        return (time.time() if now is None else now) - self.fetched_at
+
+
+class NewsStore:
+    """Serves topic queries from the current pool and refreshes it without blocking readers"""
+
+    def __init__(self, fetch: Callable[[], List[Dict]], fallback: Optional[Callable[[], List[Dict]]] = None,
+                 stale_after: float = NEWS_STALE_AFTER, clock: Callable[[], float] = time.time):
+        self.fetch = fetch
+        self.stale_after = stale_after
+        self.clock = clock
+        # The fallback pool was never fetched, so the first read revalidates
+        self.pool = NewsPool(fallback() if fallback else [], fetched_at=None)
+        self.refreshes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.failed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Fetch the feed once and swap in the new pool; on failure or no articles the current one is kept"""
+        try:
+            pool = NewsPool(self.fetch() or [], fetched_at=self.clock())
+            if not len(pool):
+                raise ValueError("upstream returned no articles")
+            self.pool = pool
+            self.refreshes += 1
+            self.consecutive_failures = 0
+            self.failed_at = None
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.failed_at = self.clock()
+            self.last_error = str(e)
+            return False
+
+    def _refresh_once(self):
+        """refresh() unless another thread is already refreshing"""
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def revalidate(self):
+        """Start a background refresh unless one is already running"""
+        if not self._refresh_lock.locked():
+            threading.Thread(target=self._refresh_once, daemon=True).start()
+
+    def is_stale(self, pool: Optional[NewsPool] = None) -> bool:
+        """Whether a pool (default: the current one) is older than stale_after"""
+        pool = self.pool if pool is None else pool
+        return pool.fetched_at is None or pool.age(self.clock()) >= self.stale_after
+
+    def retry_delay(self) -> float:
+        """Seconds to wait after the last failed refresh before trying again (0 when the last one succeeded)"""
+        if not self.consecutive_failures:
+            return 0.0
+        return min(MAX_RETRY_BACKOFF, RETRY_BACKOFF * 2 ** (self.consecutive_failures - 1))
+
+    def backing_off(self) -> bool:
+        """Whether a recent failure still holds off the next refresh"""
+        return self.failed_at is not None and self.clock() - self.failed_at < self.retry_delay()
+
+    def current(self) -> NewsPool:
+        """The pool to serve now, starting a background refresh when it is stale and not backing off"""
+        pool = self.pool
+        if self.is_stale(pool) and not self.backing_off():
+            self.revalidate()
+        return pool
+
+    def get(self, topic: str = ALL_TOPICS, limit: int = 5) -> List[Dict]:
+        """Up to limit articles on a topic, from the current pool even while it is being refreshed"""
+        return list(self.current().select(topic)[:limit])
+
+    def status(self) -> Dict:
+        """Pool size, age and refresh metadata"""
+        pool = self.pool
+        return {
+            'articles': len(pool),
+            'age': round(pool.age(self.clock()), 1) if pool.fetched_at is not None else None,
+            'stale': self.is_stale(pool),
+            'refreshing': self._refresh_lock.locked(),
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'backing_off': self.backing_off(),
+            'last_error': self.last_error,
+        }
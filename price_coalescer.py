@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Price Coalescer - Batch concurrent price lookups into one multi-id request
+The first lookup of a window waits a few milliseconds for others to arrive,
+then fetches every queued coin id in one call and fans the prices back out.
+Lookups for a coin that is already queued or in flight join that request
+instead of issuing their own (singleflight)
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from market_data_client import run_in_thread
+
+COALESCE_WINDOW = 0.005  # seconds
+MAX_BATCH_IDS = 250  # CoinGecko accepts long id lists, keep URLs bounded
+
+
+class PriceCoalescer:
+    """Collects price lookups over a short window and resolves them with batched fetches"""
+
+    def __init__(self, fetch: Callable[[List[str]], Dict[str, float]], window: float = COALESCE_WINDOW,
+                 max_batch: int = MAX_BATCH_IDS):
+        self.fetch = fetch
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: Dict[str, Future] = {}  # queued or in-flight coin id -> shared result
+        self._queue: List[str] = []
+        self._collecting = False
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.coalesced = 0
+        self.batches = 0
+
+    def get(self, coin_id: str, timeout: Optional[float] = None) -> Optional[float]:
+        """Price of coin_id (None when the upstream has none), raising the fetch's error if it failed"""
+        leader = False
+        with self._lock:
+            self.lookups += 1
+            future = self._pending.get(coin_id)
+            if future is None:
+                future = self._pending[coin_id] = Future()
+                self._queue.append(coin_id)
+                # The first lookup of a window collects and sends the batch
+                leader = not self._collecting
+                self._collecting = True
+            else:
+                self.coalesced += 1
+
+        if leader:
+            time.sleep(self.window)
+            self._flush()
+        return future.result(timeout)
+
+    async def get_async(self, coin_id: str, timeout: Optional[float] = None) -> Optional[float]:
+        """Awaitable get that waits in a worker thread"""
+        return await run_in_thread(self.get, coin_id, timeout)
+
+    def _flush(self):
+        """Fetch everything queued during the window, in batches of at most max_batch ids"""
+        with self._lock:
+            queued, self._queue = self._queue, []
+            self._collecting = False
+
+        for start in range(0, len(queued), self.max_batch):
+            batch = queued[start:start + self.max_batch]
+            try:
+                prices, error = self.fetch(batch), None
+            except Exception as e:
+                prices, error = {}, e
+
+            with self._lock:
+                self.batches += 1
+                futures = [self._pending.pop(coin_id) for coin_id in batch]
+            for coin_id, future in zip(batch, futures):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(prices.get(coin_id))
+
+    def stats(self) -> Dict:
+        """Lookup, coalesced-lookup and upstream batch counters"""
+        return {
+            'lookups': self.lookups,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'in_flight': len(self._pending),
+        }
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Price Feed - Streaming ticker ingestion from a KuCoin-style WebSocket
+Fetches a public connect token (bullet-public), subscribes to /market/ticker
+topics, keeps the socket alive with pings and reconnects with backoff. Ticks
+land in a latest-price table that request threads read without locking, so
+get_crypto_price can answer from the stream instead of polling REST
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from coin_registry import get_registry
+from market_data_client import api_base, run_in_thread
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    websockets = None
+    WEBSOCKETS_AVAILABLE = False
+
+KUCOIN_BULLET_PATH = '/api/v1/bullet-public'  # under api_base('kucoin')
+QUOTE_CURRENCY = 'USDT'
+TOPICS_PER_SUBSCRIPTION = 100  # KuCoin's limit per subscribe message
+DEFAULT_PING_INTERVAL = 18.0  # seconds
+RECONNECT_DELAYS = [1, 2, 5, 10, 30]  # seconds, the last one repeats
+MAX_QUOTE_AGE = 30.0  # seconds before a streamed price is no longer served
+
+
+class PriceTable:
+    """Latest (price, received_at) per base symbol, written by one feed thread and read without locks"""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._quotes: Dict[str, Tuple[float, float]] = {}
+        self.updates = 0
+
+    def update(self, symbol: str, price: float):
+        """Replace a symbol's quote; a single dict store, so readers never see a partial write"""
+        self._quotes[symbol.upper()] = (price, self.clock())
+        self.updates += 1
+
+    def quote(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """Latest (price, received_at) for a symbol"""
+        return self._quotes.get(symbol.upper())
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Latest price for a symbol, or None when missing or older than max_age"""
+        quote = self._quotes.get(symbol.upper())
+        if quote is None or (max_age is not None and self.clock() - quote[1] > max_age):
+            return None
+        return quote[0]
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
+class TickerFeed:
+    """KuCoin-protocol ticker subscriber running on its own event loop thread"""
+
+    def __init__(self, table: Optional[PriceTable] = None, symbols: Optional[List[str]] = None,
+                 ws_url: Optional[str] = None, bullet_url: Optional[str] = None, quote: str = QUOTE_CURRENCY):
+        if not WEBSOCKETS_AVAILABLE:
+            raise RuntimeError("streaming prices need the websockets package")
+        self.table = table or PriceTable()
+        self.symbols = [symbol.upper() for symbol in symbols] if symbols else None  # None: every ticker
+        self.ws_url = ws_url  # connect directly (stand-in feed) instead of fetching a token
+        self.bullet_url = bullet_url or f"{api_base('kucoin')}{KUCOIN_BULLET_PATH}"
+        self.quote = quote
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self.last_error: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def topics(self) -> List[str]:
+        """Ticker subscription topics, chunked to the per-message limit"""
+        if self.symbols is None:
+            return ['/market/ticker:all']
+        pairs = [f'{symbol}-{self.quote}' for symbol in self.symbols]
+        return ['/market/ticker:' + ','.join(pairs[i:i + TOPICS_PER_SUBSCRIPTION])
+                for i in range(0, len(pairs), TOPICS_PER_SUBSCRIPTION)]
+
+    def resolve_endpoint(self) -> Tuple[str, float]:
+        """WebSocket URL (with a fresh public token) and the server's ping interval in seconds"""
+        if self.ws_url:
+            return self.ws_url, DEFAULT_PING_INTERVAL
+        data = requests.post(self.bullet_url, timeout=5).json()['data']
+        server = data['instanceServers'][0]
+        url = f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}"
+        return url, server.get('pingInterval', DEFAULT_PING_INTERVAL * 1000) / 1000
+
+    def handle_message(self, message: Dict):
+        """Apply one decoded feed message to the price table"""
+        if message.get('type') != 'message' or not message.get('topic', '').startswith('/market/ticker:'):
+            return
+        topic = message['topic']
+        pair = message.get('subject') if topic.endswith(':all') else topic.split(':', 1)[1]
+        base, _, quote = (pair or '').partition('-')
+        if quote != self.quote:
+            return
+        try:
+            self.table.update(base, float(message['data']['price']))
+            self.messages += 1
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    async def _session(self, url: str, ping_interval: float):
+        """One connection: wait for welcome, subscribe, then read ticks while pinging"""
+        async with websockets.connect(url) as ws:
+            welcome = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+            if welcome.get('type') != 'welcome':
+                raise ConnectionError(f"unexpected greeting: {welcome}")
+            for topic in self.topics():
+                await ws.send(json.dumps({'id': uuid.uuid4().hex, 'type': 'subscribe', 'topic': topic,
+                                          'privateChannel': False, 'response': True}))
+            self.connected = True
+            self.connects += 1
+            self._ready.set()
+
+            async def keepalive():
+                """Ping at the server's interval so it keeps the session open"""
+                while True:
+                    await asyncio.sleep(ping_interval)
+                    await ws.send(json.dumps({'id': uuid.uuid4().hex, 'type': 'ping'}))
+
+            pinger = asyncio.create_task(keepalive())
+            try:
+                async for raw in ws:
+                    self.handle_message(json.loads(raw))
+            finally:
+                pinger.cancel()
+                self.connected = False
+
+    async def run(self):
+        """Stay subscribed until cancelled, reconnecting with backoff"""
+        attempt = 0
+        while True:
+            try:
+                url, ping_interval = await run_in_thread(self.resolve_endpoint)
+                await self._session(url, ping_interval)
+                attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+            await asyncio.sleep(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    def _thread_main(self):
+        """Run the feed's event loop until stop() cancels it"""
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self.run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def start(self, wait: Optional[float] = None) -> bool:
+        """Start streaming in a daemon thread; optionally wait until subscribed"""
+        if not (self._thread and self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._thread_main, daemon=True)
+            self._thread.start()
+        return self._ready.wait(wait) if wait else self.connected
+
+    def stop(self):
+        """Cancel the feed and wait for its thread"""
+        if self._loop and self._task and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict:
+        """Connection and ingestion counters"""
+        return {
+            'connected': self.connected,
+            'connects': self.connects,
+            'messages': self.messages,
+            'symbols': len(self.table),
+            'last_error': self.last_error,
+        }
+
+
+_feed: Optional[TickerFeed] = None
+
+
+def start_price_feed(symbols: Optional[List[str]] = None, ws_url: Optional[str] = None) -> TickerFeed:
+    """Start the process-wide ticker feed (all USDT tickers by default)"""
+    global _feed
+    if _feed is None:
+        _feed = TickerFeed(symbols=symbols, ws_url=ws_url)
+        _feed.start()
+    return _feed
+
+
+def stop_price_feed():
+    """Stop the process-wide ticker feed"""
+    global _feed
+    if _feed is not None:
+        _feed.stop()
+        _feed = None
+
+
+def feed_price(coin_id: str, max_age: float = MAX_QUOTE_AGE) -> Optional[float]:
+    """Streamed price for a coin id while the feed is running and the quote is fresh"""
+    feed = _feed
+    if feed is None:
+        return None
+    entry = get_registry().get(coin_id)
+    return feed.table.get(entry['symbol'] if entry else coin_id, max_age)
+
+
+def get_price_feed_stats() -> Optional[Dict]:
+    """Counters for the process-wide feed, or None when it is not running"""
+    return _feed.stats() if _feed is not None else None
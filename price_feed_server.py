@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Stand-in Price Feed Server - Local KuCoin-protocol ticker WebSocket
+Speaks the subset of the KuCoin public feed that price_feed uses (welcome,
+subscribe/ack, ping/pong, /market/ticker messages) and publishes either a
+random walk or a recorded JSONL tick file on a loop, for offline development
+and load tests of streaming ingestion
+"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    websockets = None
+    WEBSOCKETS_AVAILABLE = False
+
+DEFAULT_PRICES = {
+    'BTC': 43250.0, 'ETH': 2580.0, 'SOL': 98.5, 'ADA': 0.47, 'DOGE': 0.08, 'XRP': 0.62, 'PI': 0.65,
+}
+TICK_INTERVAL = 0.1  # seconds between publish rounds
+QUOTE_CURRENCY = 'USDT'
+
+
+def load_replay(replay_file: str) -> List[Dict]:
+    """Recorded ticks, one JSON object per line: {"symbol": "BTC-USDT", "price": "43250.1"}"""
+    with open(replay_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class StandInFeedServer:
+    """Local ticker feed following the KuCoin public WebSocket protocol"""
+
+    def __init__(self, prices: Optional[Dict[str, float]] = None, interval: float = TICK_INTERVAL,
+                 replay_file: Optional[str] = None, host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+        if not WEBSOCKETS_AVAILABLE:
+            raise RuntimeError("the stand-in feed needs the websockets package")
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self.interval = interval
+        self.replay = load_replay(replay_file) if replay_file else None
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.sent = 0
+        self.clients = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """WebSocket URL clients connect to"""
+        return f'ws://{self.host}:{self.port}/'
+
+    def next_ticks(self, round_number: int) -> List[Dict]:
+        """One publish round of {"symbol", "price"} ticks"""
+        if self.replay:
+            return [self.replay[round_number % len(self.replay)]]
+        ticks = []
+        for symbol, price in self.prices.items():
+            price *= 1 + self.random.gauss(0, 0.001)
+            self.prices[symbol] = price
+            ticks.append({'symbol': f'{symbol}-{QUOTE_CURRENCY}', 'price': f'{price:.8g}'})
+        return ticks
+
+    @staticmethod
+    def wants(topics: List[str], pair: str) -> bool:
+        """Whether a client's subscriptions cover a trading pair"""
+        return any(topic == '/market/ticker:all' or pair in topic.split(':', 1)[1].split(',') for topic in topics)
+
+    async def handler(self, ws):
+        """Serve one client: welcome, then subscriptions and pings alongside the tick stream"""
+        self.clients += 1
+        topics: List[str] = []
+        await ws.send(json.dumps({'id': uuid.uuid4().hex, 'type': 'welcome'}))
+
+        async def publish():
+            """Send ticks for the client's subscribed pairs every interval"""
+            round_number = 0
+            while True:
+                await asyncio.sleep(self.interval)
+                for tick in self.next_ticks(round_number):
+                    for topic in topics:
+                        if self.wants([topic], tick['symbol']):
+                            all_topic = topic.endswith(':all')
+                            await ws.send(json.dumps({
+                                'type': 'message',
+                                'topic': topic if all_topic else f"/market/ticker:{tick['symbol']}",
+                                'subject': tick['symbol'] if all_topic else 'trade.ticker',
+                                'data': {'price': tick['price'], 'time': int(time.time() * 1000)},
+                            }))
+                            self.sent += 1
+                            break
+                round_number += 1
+
+        publisher = asyncio.create_task(publish())
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get('type') == 'subscribe':
+                    topics.append(message['topic'])
+                    if message.get('response'):
+                        await ws.send(json.dumps({'id': message.get('id'), 'type': 'ack'}))
+                elif message.get('type') == 'ping':
+                    await ws.send(json.dumps({'id': message.get('id'), 'type': 'pong'}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            publisher.cancel()
+
+    async def serve(self):
+        """Serve until stop() is called"""
+        self._stop = asyncio.Event()
+        async with websockets.serve(self.handler, self.host, self.port) as server:
+            self.port = next(iter(server.sockets)).getsockname()[1]
+            self._started.set()
+            await self._stop.wait()
+
+    def _thread_main(self):
+        """Run the server on its own event loop"""
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.serve())
+        self._loop.close()
+
+    def start(self) -> str:
+        """Serve from a daemon thread, returning the URL once listening"""
+        self._thread = threading.Thread(target=self._thread_main, daemon=True)
+        self._thread.start()
+        self._started.wait(10)
+        return self.url
+
+    def stop(self):
+        """Stop serving and wait for the thread"""
+        if self._loop and self._stop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    # python price_feed_server.py [port] [replay.jsonl]
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = StandInFeedServer(port=port, replay_file=sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"📡 Stand-in price feed on ws://{server.host}:{port}/ (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("🛑 Feed stopped")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Query Canonicalizer - Normalized terms and cache keys for user questions
+Maps synonyms token by token (btc -> bitcoin), strips punctuation and stop
+words and sorts the remaining bag of terms, so "What is BTC?", "what's bitcoin"
+and "bitcoin?" share one response-cache key and one retrieval query
+"""
+
+import re
+from functools import lru_cache
+from typing import List
+
+# Token-level synonyms; multi-word expansions become several terms
+SYNONYMS = {
+    'btc': ['bitcoin'],
+    'eth': ['ethereum'],
+    'crypto': ['cryptocurrency'],
+    'cryptos': ['cryptocurrency'],
+    'defi': ['decentralized', 'finance'],
+    'nft': ['non', 'fungible', 'token'],
+    'nfts': ['non', 'fungible', 'token'],
+    'dao': ['decentralized', 'autonomous', 'organization'],
+    'hodl': ['hold'],
+    'fomo': ['fear', 'missing', 'out'],
+    'fud': ['fear', 'uncertainty', 'doubt'],
+}
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'can',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    # Question filler that does not change the answer
+    'what', 'whats', 'tell', 'about', 'please',
+}
+
+CANONICAL_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _canonical_terms(text: str) -> tuple:
+    """Canonical terms of an input, memoized as an immutable tuple"""
+    text = re.sub(r"['’]", '', text.lower())  # what's -> whats
+    text = re.sub(r'[^\w\s]', ' ', text)
+
+    terms = []
+    for token in text.split():
+        for term in SYNONYMS.get(token, [token]):
+            if len(term) > 1 and term not in STOP_WORDS:
+                terms.append(term)
+    return tuple(terms)
+
+
+def canonical_terms(text: str) -> List[str]:
+    """Synonym-mapped terms with punctuation and stop words stripped, in input order"""
+    return list(_canonical_terms(text))
+
+
+def canonical_key(text: str) -> str:
+    """Order-insensitive cache key: the sorted bag of canonical terms"""
+    terms = _canonical_terms(text)
+    if not terms:
+        # Nothing but stop words: fall back to the whitespace-normalized text
+        return ' '.join(text.lower().split())
+    return ' '.join(sorted(terms))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Token buckets per upstream API provider
+Calls go through immediately while the bucket holds tokens and wait only for
+the next refill once it is empty. Buckets are shared by every thread in the
+process, and across worker processes when a state directory is configured
+(file-lock backend). Each bucket counts acquisitions, throttled calls and
+time spent waiting
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+    FILE_LOCKS_AVAILABLE = True
+except ImportError:
+    FILE_LOCKS_AVAILABLE = False
+
+# Sustained requests per second and burst size for each upstream provider
+PROVIDER_LIMITS = {
+    'coingecko': {'rate': 0.5, 'capacity': 10},  # public API: ~30 calls/minute
+    'kucoin': {'rate': 10.0, 'capacity': 30},
+}
+DEFAULT_LIMIT = {'rate': 1.0, 'capacity': 5}
+
+# Set to a directory shared by worker processes to share their budgets
+RATE_LIMIT_STATE_DIR = os.environ.get('KOINTOSS_RATE_LIMIT_DIR')
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a token would not become available within the caller's timeout"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `capacity` burst, refilled at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        """Token count after refilling from `updated` to `now`"""
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+
+    def _reserve_state(self, tokens: float, max_wait: Optional[float]) -> Optional[float]:
+        """Take tokens from the in-memory state, returning the wait until they are ours"""
+        with self._lock:
+            now = self.clock()
+            available = self._refill(self._tokens, self._updated, now)
+            wait = max(0.0, (tokens - available) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens, self._updated = available - tokens, now
+            return wait
+
+    def reserve(self, tokens: float = 1, max_wait: Optional[float] = None) -> float:
+        """Claim tokens now (the balance may go negative) and return how long to wait before using them"""
+        if tokens > self.capacity:
+            raise ValueError("cannot request more tokens than the bucket holds")
+        wait = self._reserve_state(tokens, max_wait)
+        if wait is None:
+            raise RateLimitTimeout(f"no token available within {max_wait:.2f}s")
+
+        with self._lock:
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> float:
+        """Block until tokens are available, returning the time waited"""
+        wait = self.reserve(tokens, timeout)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1, timeout: Optional[float] = None) -> float:
+        """acquire for coroutines: waits with asyncio.sleep instead of blocking the loop"""
+        wait = self.reserve(tokens, timeout)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict:
+        """Configuration plus acquisition, throttling and wait-time counters"""
+        return {
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'throttle_rate': round(self.throttled / self.acquired * 100, 1) if self.acquired else 0.0,
+            'total_wait': round(self.total_wait, 3),
+            'max_wait': round(self.max_wait, 3),
+            'avg_wait': round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+        }
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket whose balance lives in a file guarded by flock, shared by every process using it"""
+
+    def __init__(self, state_file: str, rate: float, capacity: float,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        if not FILE_LOCKS_AVAILABLE:
+            raise RuntimeError("file-lock rate limiting needs fcntl (POSIX only)")
+        super().__init__(rate, capacity, clock=clock, sleep=sleep)
+        self.state_file = state_file
+        os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+
+    def _reserve_state(self, tokens: float, max_wait: Optional[float]) -> Optional[float]:
+        """Read-modify-write the shared balance under an exclusive file lock"""
+        # Wall-clock time so every process agrees on elapsed refill time
+        with self._lock, open(self.state_file, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                    stored, updated = state['tokens'], state['updated']
+                except (ValueError, KeyError):
+                    stored, updated = float(self.capacity), self.clock()
+
+                now = self.clock()
+                available = self._refill(stored, updated, now)
+                wait = max(0.0, (tokens - available) / self.rate)
+                if max_wait is not None and wait > max_wait:
+                    return None
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({'tokens': available - tokens, 'updated': now}))
+                f.flush()
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Shared bucket for a provider, file-backed when RATE_LIMIT_STATE_DIR is set"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limit = PROVIDER_LIMITS.get(provider, DEFAULT_LIMIT)
+            if RATE_LIMIT_STATE_DIR and FILE_LOCKS_AVAILABLE:
+                state_file = os.path.join(RATE_LIMIT_STATE_DIR, f'{provider}.bucket')
+                limiter = FileTokenBucket(state_file, limit['rate'], limit['capacity'])
+            else:
+                limiter = TokenBucket(limit['rate'], limit['capacity'])
+            _limiters[provider] = limiter
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict]:
+    """Counters for every provider bucket created so far"""
+    with _limiters_lock:
+        return {provider: limiter.stats() for provider, limiter in _limiters.items()}
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Sparse Retrieval Engine - Inverted index shared by the dataset trainers
+Keeps term -> postings (sample id, term count) with precomputed norms and IDF
+so a query only touches the samples that share at least one term with it
+"""
+
+import heapq
+import math
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Queries scored per sparse product so the (queries x samples) matrix stays bounded
+BATCH_CHUNK_SIZE = 256
+
+# Similarity scoring modes: raw count-cosine, TF-IDF cosine and normalized BM25
+SCORING_MODES = ('cosine', 'tfidf', 'bm25')
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Count-cosine keeps the legacy fallback ladder below the caller's threshold;
+# TF-IDF and BM25 use one cut-off calibrated on the bundled datasets' queries
+# (BM25 is normalized by the query's saturation bound, so its scores run lower)
+COSINE_FALLBACK_THRESHOLDS = [0.05, 0.02, 0.01]
+CALIBRATED_THRESHOLDS = {'tfidf': 0.2, 'bm25': 0.1}
+
+
+def tokenize_text(text: str) -> List[str]:
+    """Simple tokenization function shared by the trainers"""
+    # Remove punctuation and split into words
+    text = re.sub(r'[^\w\s]', ' ', text)
+    words = text.split()
+    return [word for word in words if len(word) > 2]  # Filter short words
+
+
+def count_terms(tokens: Iterable[str]) -> Dict[str, int]:
+    """Count term frequencies for a token list"""
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def top_k(scores: Dict[int, float], k: int) -> List[Tuple[int, float]]:
+    """Best k (sample id, score) pairs of sparse scores via a size-k heap, ties to the lowest id"""
+    return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def top_k_array(scores: np.ndarray, k: int, candidates: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+    """Best k (index, score) pairs of a dense score vector via argpartition, ties to the lowest index"""
+    if candidates is not None:
+        values = scores[candidates]
+    else:
+        values = scores
+    if k <= 0 or not len(values):
+        return []
+
+    if k < len(values):
+        best = np.argpartition(-values, k - 1)[:k]
+        # Fill the slots left at the k-th score with the lowest tied positions so the result matches top_k()
+        kth = values[best].min()
+        better = best[values[best] > kth]
+        ties = np.flatnonzero(values == kth)[:k - len(better)]
+        positions = np.concatenate((better, ties))
+    else:
+        positions = np.arange(len(values))
+
+    order = np.lexsort((positions if candidates is None else candidates[positions], -values[positions]))[:k]
+    positions = positions[order]
+    indices = positions if candidates is None else candidates[positions]
+    return list(zip(indices.tolist(), values[positions].tolist()))
+
+
+class InvertedIndex:
+    """Inverted index scoring queries by count-cosine, TF-IDF cosine or BM25"""
+
+    def __init__(self, tokenizer: Callable[[str], List[str]] = tokenize_text, scoring: str = 'cosine'):
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode '{scoring}', expected one of {SCORING_MODES}")
+        self.tokenizer = tokenizer
+        self.scoring = scoring
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.norms: List[float] = []
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self.idf: Dict[str, float] = {}
+        self.tfidf_norms: List[float] = []
+        self._arrays = None
+        self._statistics_stale = False  # set by add_document, cleared by compute_statistics
+
+    def __len__(self) -> int:
+        return len(self.norms)
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct indexed terms"""
+        return len(self.postings)
+
+    def build(self, documents: Iterable[str]):
+        """Index a collection of documents from scratch"""
+        self.postings = {}
+        self.norms = []
+        self.doc_lengths = []
+        self.total_length = 0
+        self.idf = {}
+        self.tfidf_norms = []
+        self._arrays = None
+        for document in documents:
+            self.add_document(document)
+        self.compute_statistics()
+
+    def add_document(self, text: str) -> int:
+        """Append one document's postings and return its sample id"""
+        doc_id = len(self.norms)
+        counts = count_terms(self.tokenizer(text.lower()))
+
+        for term, count in counts.items():
+            self.postings.setdefault(term, []).append((doc_id, float(count)))
+
+        length = sum(counts.values())
+        self.norms.append(math.sqrt(sum(count * count for count in counts.values())))
+        self.doc_lengths.append(length)
+        self.total_length += length
+
+        # A new document changes every term's IDF and every TF-IDF norm, so they are recomputed before the next score
+        self._statistics_stale = self.scoring != 'cosine'
+        self._arrays = None
+        return doc_id
+
+    def idf_value(self, doc_freq, n_docs):
+        """Inverse document frequency for the active scoring mode (scalar or array)"""
+        if self.scoring == 'bm25':
+            return np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        return np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+
+    def compute_statistics(self):
+        """Precompute IDF and TF-IDF norms for the active scoring mode"""
+        self.idf = {}
+        self.tfidf_norms = []
+        self._arrays = None
+        self._statistics_stale = False
+        if self.scoring == 'cosine' or not len(self):
+            return
+
+        term_ids, indptr, docs, counts = self.postings_arrays()
+        doc_freqs = np.diff(indptr)
+        idf = self.idf_value(doc_freqs.astype(np.float64), len(self))
+        self.idf = dict(zip(term_ids, idf.tolist()))
+
+        if self.scoring == 'tfidf':
+            weights = counts * np.repeat(idf, doc_freqs)
+            self.tfidf_norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=len(self))).tolist()
+
+    def refresh_statistics(self):
+        """Recompute IDF and TF-IDF norms if documents were added since they were last computed"""
+        if self._statistics_stale:
+            self.compute_statistics()
+
+    def query_terms(self, text: str) -> Dict[str, int]:
+        """Term counts of a query restricted to the indexed vocabulary"""
+        counts = count_terms(self.tokenizer(text.lower()))
+        return {term: count for term, count in counts.items() if term in self.postings}
+
+    def score(self, text: str) -> Dict[int, float]:
+        """Similarity in [0, 1] for every sample sharing a term with the query"""
+        query = self.query_terms(text)
+        if not query:
+            return {}
+        self.refresh_statistics()
+
+        dot_products: Dict[int, float] = {}
+
+        if self.scoring == 'bm25':
+            average_length = self.total_length / len(self)
+            for term, query_count in query.items():
+                idf = self.idf[term]
+                for doc_id, count in self.postings[term]:
+                    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                    weight = query_count * idf * count * (BM25_K1 + 1) / (count + length_norm)
+                    dot_products[doc_id] = dot_products.get(doc_id, 0.0) + weight
+            # Normalize by the score of a sample saturating every query term
+            upper_bound = sum(query_count * self.idf[term] * (BM25_K1 + 1) for term, query_count in query.items())
+            return {doc_id: dot / upper_bound for doc_id, dot in dot_products.items()}
+
+        if self.scoring == 'tfidf':
+            query_weights = {term: count * self.idf[term] for term, count in query.items()}
+            doc_norms = self.tfidf_norms
+        else:
+            query_weights = query
+            doc_norms = self.norms
+
+        query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+        for term, query_weight in query_weights.items():
+            term_weight = self.idf[term] if self.scoring == 'tfidf' else 1.0
+            for doc_id, count in self.postings[term]:
+                dot_products[doc_id] = dot_products.get(doc_id, 0.0) + query_weight * count * term_weight
+
+        return {
+            doc_id: dot / (query_norm * doc_norms[doc_id])
+            for doc_id, dot in dot_products.items()
+        }
+
+    def min_score(self, best_score: float, threshold: float = 0.1) -> Optional[float]:
+        """Single-pass cut-off for a query whose best match scored best_score"""
+        if self.scoring != 'cosine':
+            cutoff = CALIBRATED_THRESHOLDS[self.scoring]
+            return cutoff if best_score >= cutoff else None
+
+        # Equivalent to retrying the legacy ladder, without rescanning the scores
+        for cutoff in [threshold] + COSINE_FALLBACK_THRESHOLDS:
+            if best_score >= cutoff:
+                return cutoff
+        return None
+
+    def postings_arrays(self) -> Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+        """CSC-style view of the postings: term ids, indptr, sample ids and term counts"""
+        if self._arrays is None:
+            term_ids = {term: i for i, term in enumerate(self.postings)}
+            indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(entries) for entries in self.postings.values()])
+            docs = np.array([doc for entries in self.postings.values() for doc, _ in entries], dtype=np.int64)
+            counts = np.array([count for entries in self.postings.values() for _, count in entries], dtype=np.float64)
+            self._arrays = (term_ids, indptr, docs, counts)
+        return self._arrays
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Similarities of many queries at once as a (queries x samples) matrix"""
+        n_queries, n_docs = len(texts), len(self)
+        self.refresh_statistics()
+        term_ids, indptr, docs, counts = self.postings_arrays()
+
+        # Sparse query matrix in coordinate form
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for term, count in self.query_terms(text).items():
+                rows.append(row)
+                cols.append(term_ids[term])
+                values.append(count)
+
+        scores = np.zeros((n_queries, n_docs), dtype=np.float64)
+        if not rows:
+            return scores
+
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+
+        # Sparse (queries x terms) @ (terms x samples): expand every query term over its postings
+        starts = indptr[cols].astype(np.int64)
+        lengths = indptr[cols + 1].astype(np.int64) - starts
+        block_starts = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - block_starts, lengths) + np.arange(lengths.sum())
+        posting_docs = docs[positions]
+        posting_counts = counts[positions]
+
+        if self.scoring == 'cosine':
+            query_weights = values
+            doc_weights = posting_counts
+        else:
+            idf = np.array([self.idf[term] for term in term_ids], dtype=np.float64)[cols]
+            if self.scoring == 'tfidf':
+                query_weights = values * idf
+                doc_weights = posting_counts * np.repeat(idf, lengths)
+            else:
+                query_weights = values
+                doc_lengths = np.asarray(self.doc_lengths, dtype=np.float64)[posting_docs]
+                length_norms = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / (self.total_length / n_docs))
+                doc_weights = np.repeat(idf, lengths) * posting_counts * (BM25_K1 + 1) / (posting_counts + length_norms)
+
+        flat = np.repeat(rows, lengths) * n_docs + posting_docs
+        contributions = np.repeat(query_weights, lengths) * doc_weights
+        dot_products = np.bincount(flat, weights=contributions, minlength=n_queries * n_docs)
+
+        if self.scoring == 'bm25':
+            query_factors = np.bincount(rows, weights=values * idf * (BM25_K1 + 1), minlength=n_queries)
+            doc_factors = np.ones(n_docs)
+        else:
+            query_factors = np.sqrt(np.bincount(rows, weights=query_weights * query_weights, minlength=n_queries))
+            doc_factors = np.asarray(self.tfidf_norms if self.scoring == 'tfidf' else self.norms, dtype=np.float64)
+
+        denominators = np.outer(query_factors, doc_factors)
+        np.divide(dot_products.reshape(n_queries, n_docs), denominators, out=scores, where=denominators > 0)
+        return scores
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Sentiment Engine - Batch lexicon scoring for news in one automaton pass per text
+Compiles the bullish/bearish/neutral lexicons and the technical and fundamental
+factor keywords into a single keyword_router automaton. A batch of articles
+comes back as NumPy arrays (keyword hits per lexicon, factor flags), so labels
+and the counts get_market_insights needs are vectorized reductions
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from keyword_router import KeywordAutomaton
+
+# Lexicon columns of SentimentBatch.counts: (polarity, intensity, weight per distinct keyword)
+LEXICON_COLUMNS = [
+    ('bullish', 'strong', 2.0),
+    ('bullish', 'moderate', 1.0),
+    ('bullish', 'weak', 0.5),
+    ('bearish', 'strong', 2.0),
+    ('bearish', 'moderate', 1.0),
+    ('bearish', 'weak', 0.5),
+    ('neutral', None, 1.0),
+]
+WEIGHTS = np.array([weight for _, _, weight in LEXICON_COLUMNS])
+
+# Label codes of SentimentBatch.labels
+LABELS = [
+    ('bullish', 'strong'), ('bullish', 'moderate'), ('bullish', 'weak'),
+    ('bearish', 'strong'), ('bearish', 'moderate'), ('bearish', 'weak'),
+    ('neutral', 'balanced'),
+]
+NEUTRAL_LABEL = len(LABELS) - 1
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+
+KINDS = ('lexicon', 'technical', 'fundamental')  # automaton categories
+
+
+def _intensity(scores: np.ndarray) -> np.ndarray:
+    """0/1/2 (strong/moderate/weak) from one polarity's strong, moderate and weak score columns"""
+    return np.where(scores[:, 0] > 0, 0, np.where(scores[:, 1] > scores[:, 2], 1, 2))
+
+
+def _name_counts(names: List[str]) -> Dict[str, int]:
+    """Occurrences of each factor name (names never seen are left out)"""
+    if not names:
+        return {}
+    values, counts = np.unique(np.array(names), return_counts=True)
+    return {str(name): int(count) for name, count in zip(values, counts)}
+
+
+def summarize(analyses: Sequence[Dict]) -> Tuple[np.ndarray, Dict[str, int], Dict[str, int]]:
+    """Label counts and factor counts over analyses stored on articles when they were scored"""
+    codes = np.array([LABEL_CODES[(analysis['sentiment'], analysis['intensity'])] for analysis in analyses],
+                     dtype=np.int64)
+    return (np.bincount(codes, minlength=len(LABELS)),
+            _name_counts([name for analysis in analyses for name in analysis['technical_factors']]),
+            _name_counts([name for analysis in analyses for name in analysis['fundamental_factors']]))
+
+
+class SentimentBatch:
+    """Lexicon scores, labels and factor flags for a batch of texts"""
+
+    def __init__(self, counts: np.ndarray, technical: np.ndarray, fundamental: np.ndarray,
+                 technical_names: List[str], fundamental_names: List[str]):
+        self.counts = counts  # (texts, lexicon columns) distinct keywords matched
+        self.technical = technical  # (texts, technical factors) bool
+        self.fundamental = fundamental  # (texts, fundamental factors) bool
+        self.technical_names = technical_names
+        self.fundamental_names = fundamental_names
+
+        self.scores = counts * WEIGHTS
+        self.bullish = self.scores[:, 0:3].sum(axis=1)
+        self.bearish = self.scores[:, 3:6].sum(axis=1)
+        self.neutral = self.scores[:, 6]
+
+        # A side wins only when it outweighs the other side plus the neutral hits
+        bullish = self.bullish > self.bearish + self.neutral
+        bearish = ~bullish & (self.bearish > self.bullish + self.neutral)
+        self.labels = np.where(bullish, _intensity(self.scores[:, 0:3]),
+                               np.where(bearish, 3 + _intensity(self.scores[:, 3:6]), NEUTRAL_LABEL))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def label_counts(self) -> np.ndarray:
+        """Texts per label code, in LABELS order"""
+        return np.bincount(self.labels, minlength=len(LABELS))
+
+    def factor_counts(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Texts mentioning each technical and each fundamental factor (factors never seen are left out)"""
+        technical = self.technical.sum(axis=0)
+        fundamental = self.fundamental.sum(axis=0)
+        return ({name: int(count) for name, count in zip(self.technical_names, technical) if count},
+                {name: int(count) for name, count in zip(self.fundamental_names, fundamental) if count})
+
+    def analysis(self, i: int) -> Dict:
+        """analyze_sentiment-style dict for one text"""
+        sentiment, intensity = LABELS[self.labels[i]]
+        return {
+            'sentiment': sentiment,
+            'intensity': intensity,
+            'bullish_score': float(self.bullish[i]),
+            'bearish_score': float(self.bearish[i]),
+            'technical_factors': [name for name, hit in zip(self.technical_names, self.technical[i]) if hit],
+            'fundamental_factors': [name for name, hit in zip(self.fundamental_names, self.fundamental[i]) if hit],
+        }
+
+
+class SentimentEngine:
+    """Every sentiment and factor lexicon compiled into one automaton"""
+
+    def __init__(self, sentiment_keywords: Dict, technical_keywords: Dict[str, List[str]],
+                 fundamental_keywords: Dict[str, List[str]]):
+        self.automaton = KeywordAutomaton()
+        for column, (polarity, intensity, _) in enumerate(LEXICON_COLUMNS):
+            lexicon = sentiment_keywords[polarity][intensity] if intensity else sentiment_keywords[polarity]
+            for phrase in lexicon:
+                self._add(phrase, 'lexicon', (column, phrase.lower()))
+        self.technical_names = list(technical_keywords)
+        self.fundamental_names = list(fundamental_keywords)
+        for category, factors in (('technical', technical_keywords), ('fundamental', fundamental_keywords)):
+            for name, phrases in factors.items():
+                for phrase in phrases:
+                    self._add(phrase, category, name)
+        self.automaton.compile()
+
+        # Each pattern maps to a distinct (category, value) key; a key counts once per text
+        keys: Dict[tuple, int] = {}
+        self.pattern_keys = np.array([keys.setdefault((category, value), len(keys))
+                                      for category, value, _, _ in self.automaton.patterns], dtype=np.int64)
+        self.key_kinds = np.array([KINDS.index(category) for category, _ in keys], dtype=np.int64)
+        self.key_columns = np.array([value[0] if category == 'lexicon' else
+                                     (self.technical_names if category == 'technical' else
+                                      self.fundamental_names).index(value)
+                                     for category, value in keys], dtype=np.int64)
+
+    def _add(self, phrase: str, category: str, value):
+        """Register a phrase; acronyms such as 'SEC' or 'ETF' only match as whole words"""
+        self.automaton.add(phrase, category, value, whole_word=phrase.isupper())
+
+    def score_batch(self, texts: Sequence[str]) -> SentimentBatch:
+        """Scan the batch in one automaton pass and scatter the matches into arrays"""
+        counts = np.zeros((len(texts), len(LEXICON_COLUMNS)))
+        technical = np.zeros((len(texts), len(self.technical_names)), dtype=bool)
+        fundamental = np.zeros((len(texts), len(self.fundamental_names)), dtype=bool)
+
+        # No phrase contains a newline, so matches never span two texts
+        lowered = [text.lower() for text in texts]
+        hits = np.array(list(self.automaton.matches('\n'.join(lowered))), dtype=np.int64).reshape(-1, 2)
+        if len(hits):
+            next_starts = np.cumsum([len(text) + 1 for text in lowered])
+            rows = np.searchsorted(next_starts, hits[:, 0], side='right')
+            # Distinct (text, key) pairs: a keyword scores once per text however often it appears
+            n_keys = len(self.key_kinds)
+            pairs = np.unique(rows * n_keys + self.pattern_keys[hits[:, 1]])
+            rows, keys = pairs // n_keys, pairs % n_keys
+            kinds, columns = self.key_kinds[keys], self.key_columns[keys]
+
+            lexicon = kinds == 0
+            np.add.at(counts, (rows[lexicon], columns[lexicon]), 1)
+            technical[rows[kinds == 1], columns[kinds == 1]] = True
+            fundamental[rows[kinds == 2], columns[kinds == 2]] = True
+
+        return SentimentBatch(counts, technical, fundamental, self.technical_names, self.fundamental_names)
+
+    def analyze(self, text: str) -> Dict:
+        """Sentiment, intensity, scores and factors for a single text"""
+        return self.score_batch([text]).analysis(0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Sentiment Service - One shared VADER analyzer with crypto keyword adjustments
+Loads the VADER lexicon once per process, scores batches of texts, and
+memoizes results by text hash in a bounded LRU, so re-rendering a feed of
+headlines only scores the ones it has not seen. Crypto slang ('moon', 'fud',
+'sell off') nudges the compound score in the same per-text pass
+"""
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from keyword_router import KeywordAutomaton
+from response_cache import ResponseCache
+
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    VADER_AVAILABLE = True
+except ImportError:
+    SentimentIntensityAnalyzer = None
+    VADER_AVAILABLE = False
+
+CRYPTO_KEYWORDS = {
+    'positive': ['moon', 'rocket', 'hodl', 'diamond hands', 'bullish', 'pump', 'surge', 'rally'],
+    'negative': ['dump', 'crash', 'bear', 'dip', 'fud', 'panic', 'sell off', 'decline'],
+}
+KEYWORD_WEIGHT = 0.1  # compound adjustment per distinct keyword present
+SENTIMENT_CACHE_SIZE = 4096
+
+
+def text_key(text: str) -> bytes:
+    """Compact cache key for a text, so the cache does not hold whole articles"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentService:
+    """VADER polarity plus crypto keyword adjustment, memoized per text"""
+
+    def __init__(self, cache_size: int = SENTIMENT_CACHE_SIZE, analyzer=None):
+        if analyzer is None:
+            if not VADER_AVAILABLE:
+                raise RuntimeError("sentiment scoring needs the vaderSentiment package")
+            analyzer = SentimentIntensityAnalyzer()
+        self.analyzer = analyzer
+        self.cache = ResponseCache(max_size=cache_size, default_ttl=None)
+        self.keywords = KeywordAutomaton()
+        for polarity, sign in (('positive', 1), ('negative', -1)):
+            for keyword in CRYPTO_KEYWORDS[polarity]:
+                self.keywords.add(keyword, 'crypto', (sign, keyword))
+        self.keywords.compile()
+        self._lock = threading.Lock()  # guards the scored counter
+        self.scored = 0
+
+    def _score_text(self, text: str) -> Dict[str, float]:
+        """VADER scores with the keyword adjustment folded into the clamped compound"""
+        scores = self.analyzer.polarity_scores(text)
+        matched = self.keywords.scan(text.lower()).get('crypto', ())
+        compound = scores['compound'] + KEYWORD_WEIGHT * sum(sign for sign, _ in matched)
+        return {
+            'compound': max(-1, min(1, compound)),
+            'positive': scores['pos'],
+            'negative': scores['neg'],
+            'neutral': scores['neu'],
+        }
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Scores for one text"""
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """Scores for each text in order; cached texts and repeats within the batch are scored once"""
+        keys = [text_key(text) for text in texts]
+        results: Dict[bytes, Dict[str, float]] = {}
+        for key, text in zip(keys, texts):
+            if key in results:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = self._score_text(text)
+                self.cache.set(key, cached)
+                with self._lock:
+                    self.scored += 1
+            results[key] = cached
+        return [dict(results[key]) for key in keys]
+
+    def stats(self) -> Dict:
+        """Texts scored and cache counters"""
+        return {'scored': self.scored, 'cache': self.cache.stats()}
+
+
+@lru_cache(maxsize=1)
+def get_sentiment_service() -> SentimentService:
+    """Process-wide service, so the VADER lexicon is loaded once"""
+    return SentimentService()
+
+
+def score_texts(texts: Sequence[str]) -> Optional[List[Dict[str, float]]]:
+    """Scores from the shared service, or None when VADER is not installed"""
+    return get_sentiment_service().score_batch(texts) if VADER_AVAILABLE else None
@@ -8,7 +8,6 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import pandas as pd
 import requests
 import time
@@ -18,17 +17,18 @@ import re
 import os
 import json
 
+from sentiment_service import get_sentiment_service
+
 # Store import status messages for later display
 import_messages = []
 
 # Import API utilities with error handling
 try:
-    from api_utils import CryptoAPIs, RATE_LIMIT_DELAY
+    from market_snapshot import get_market_snapshot_service
     API_UTILS_AVAILABLE = True
 except ImportError as e:
     import_messages.append(("warning", f"⚠️ API utilities not available: {e}"))
     API_UTILS_AVAILABLE = False
-    RATE_LIMIT_DELAY = 1.5  # fallback value
 
 # Import chatbot with error handling - try multiple versions
 CHATBOT_AVAILABLE = False
@@ -80,36 +80,8 @@ def format_number(num):
 def analyze_sentiment(text, symbol):
     """Analyze sentiment of text"""
     try:
-        analyzer = SentimentIntensityAnalyzer()
-        scores = analyzer.polarity_scores(text)
-        
-        # Additional crypto-specific keyword analysis
-        crypto_keywords = {
-            'positive': ['moon', 'rocket', 'hodl', 'diamond hands', 'bullish', 'pump', 'surge', 'rally'],
-            'negative': ['dump', 'crash', 'bear', 'dip', 'fud', 'panic', 'sell off', 'decline']
-        }
-        
-        text_lower = text.lower()
-        keyword_score = 0
-        
-        for word in crypto_keywords['positive']:
-            if word in text_lower:
-                keyword_score += 0.1
-        
-        for word in crypto_keywords['negative']:
-            if word in text_lower:
-                keyword_score -= 0.1
-        
-        # Combine scores
-        final_score = scores['compound'] + keyword_score
-        final_score = max(-1, min(1, final_score))  # Clamp between -1 and 1
-        
-        return {
-            'compound': final_score,
-            'positive': scores['pos'],
-            'negative': scores['neg'],
-            'neutral': scores['neu']
-        }
+        # Shared analyzer: the VADER lexicon loads once and repeated headlines come from its cache
+        return get_sentiment_service().score(text)
     except Exception as e:
         st.error(f"Error in sentiment analysis: {e}")
         return {'compound': 0, 'positive': 0, 'negative': 0, 'neutral': 1}
@@ -121,9 +93,9 @@ def get_crypto_data():
         return get_fallback_crypto_data()
     
     try:
-        crypto_apis = CryptoAPIs()
-        data = crypto_apis.get_markets_data()  # Fixed method name
-        return data[:10] if data else get_fallback_crypto_data()  # Return top 10 or fallback
+        # Served from the background snapshot; stale data is refreshed without blocking the rerun
+        data = get_market_snapshot_service().get_snapshot().top(10)
+        return data if data else get_fallback_crypto_data()  # Return top 10 or fallback
     except Exception as e:
         st.warning(f"⚠️ API temporarily unavailable: {e}")
         return get_fallback_crypto_data()
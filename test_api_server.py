@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent API sessions keep their own personality and that shutdown never starts services
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import enhanced_kointoss_api_server as server
+import market_snapshot
+
+
+class SlowChatbot:
+    """Stand-in chatbot whose answers take a while and report the active personality"""
+
+    def __init__(self):
+        self.personality_mode = "normal"
+        self.active = 0
+        self.overlaps = 0
+        self._count_lock = threading.Lock()
+
+    def switch_personality(self, mode: str) -> str:
+        """Switch the shared mode"""
+        self.personality_mode = mode
+        return f"{mode} mode"
+
+    def get_response(self, message: str) -> dict:
+        """Answer slowly, counting calls that overlap"""
+        with self._count_lock:
+            self.active += 1
+            self.overlaps += self.active > 1
+        personality = self.personality_mode
+        time.sleep(0.01)
+        answered_as = self.personality_mode
+        with self._count_lock:
+            self.active -= 1
+        return {'message': message, 'personality': answered_as, 'started_as': personality, 'type': 'test'}
+
+
+def test_sessions_answered_in_their_own_personality():
+    print("🧪 Testing API Server Sessions")
+    print("=" * 40)
+
+    original = server.chatbot
+    server.chatbot = SlowChatbot()
+    try:
+        wanted = ['normal', 'subzero'] * 10
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(lambda p: server.respond_as(p, f"hi from {p}"), wanted))
+        assert [r['personality'] for r in responses] == wanted
+        assert all(r['started_as'] == r['personality'] for r in responses)
+        assert server.chatbot.overlaps == 0
+        assert server.switch_locked('subzero') == 'subzero mode'
+        print("✅ Each request is answered in its session's personality")
+    finally:
+        server.chatbot = original
+
+
+def test_shutdown_does_not_create_the_snapshot_service():
+    market_snapshot.get_market_snapshot_service.cache_clear()
+    market_snapshot.stop_market_snapshot_service()
+    assert market_snapshot.get_market_snapshot_service.cache_info().currsize == 0
+    print("✅ Stopping an unstarted snapshot service is a no-op")
+
+
+if __name__ == "__main__":
+    test_sessions_answered_in_their_own_personality()
+    test_shutdown_does_not_create_the_snapshot_service()
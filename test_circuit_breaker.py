@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test per-provider circuit breakers and hedged provider requests
+"""
+
+import time
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, call_all, hedged_call
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_and_recovers():
+    print("🧪 Testing Circuit Breaker")
+    print("=" * 40)
+
+    clock = FakeClock()
+    breaker = CircuitBreaker('coingecko', window_size=10, min_calls=4, open_duration=30, clock=clock)
+    for success in (True, False, True, False):
+        breaker.record(success, 0.1)
+    assert breaker.state == OPEN and breaker.rejecting()
+    try:
+        breaker.call(lambda: 'never called')
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    print("✅ Error rate at the threshold opens the breaker and fails fast")
+
+    clock.now = 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one trial at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    print("✅ A successful half-open trial closes it again")
+
+    for _ in range(4):
+        breaker.record(True, breaker.slow_call_threshold)
+    assert breaker.state == OPEN
+    assert breaker.stats()['opened'] == 2 and breaker.stats()['rejected'] == 2
+    print("✅ Slow calls trip the latency threshold")
+
+
+def test_hedged_call_bounded_by_fastest_healthy_provider():
+    def slow():
+        time.sleep(0.5)
+        return 'primary'
+
+    def fast():
+        return 'secondary'
+
+    def failing():
+        raise ConnectionError("down")
+
+    breakers = {name: CircuitBreaker(name) for name in ('primary', 'secondary')}
+    for _ in range(20):
+        breakers['primary'].record(True, 0.05)  # p95 of 50 ms sets the hedge delay
+
+    start = time.monotonic()
+    assert hedged_call([('primary', slow), ('secondary', fast)], breakers) == {'secondary': 'secondary'}
+    assert time.monotonic() - start < 0.3
+    print("✅ Secondary asked once the primary exceeds its p95")
+
+    assert hedged_call([('primary', failing), ('secondary', fast)], breakers) == {'secondary': 'secondary'}
+    breakers['secondary'] = CircuitBreaker('secondary', min_calls=1)
+    breakers['secondary'].record(False, 0.0)
+    try:
+        hedged_call([('primary', failing), ('secondary', fast)], breakers)
+        assert False, "expected every provider to fail"
+    except (ConnectionError, CircuitOpenError):
+        pass
+    print("✅ Failed or tripped providers are skipped")
+
+
+def test_call_all_runs_providers_concurrently():
+    def provider(value):
+        def fetch():
+            time.sleep(0.2)
+            return value
+        return fetch
+
+    def failing():
+        raise ConnectionError("down")
+
+    breakers = {name: CircuitBreaker(name) for name in ('a', 'b', 'c')}
+    start = time.monotonic()
+    results, errors = call_all([('a', provider(1)), ('b', provider(2)), ('c', failing)], breakers)
+    assert time.monotonic() - start < 0.35
+    assert results == {'a': 1, 'b': 2} and isinstance(errors['c'], ConnectionError)
+    print("✅ Merged fetch waits for the slowest provider, not the sum")
+
+
+if __name__ == "__main__":
+    test_breaker_opens_and_recovers()
+    test_hedged_call_bounded_by_fastest_healthy_provider()
+    test_call_all_runs_providers_concurrently()
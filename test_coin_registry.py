@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the coin alias registry's hash lookups and longest-match scanning
+"""
+
+from coin_registry import CoinRegistry, get_registry, resolve_coin_id
+
+
+def test_resolve_and_scan():
+    print("🧪 Testing Coin Registry")
+    print("=" * 40)
+
+    registry = get_registry()
+    assert len(registry) > 100
+    assert resolve_coin_id("BTC") == resolve_coin_id("xbt") == resolve_coin_id("Bitcoin") == "bitcoin"
+    assert resolve_coin_id("pi coin") == resolve_coin_id("pi") == "pi-network"
+    assert resolve_coin_id("Polygon") == "matic-network"
+    assert resolve_coin_id("not a coin at all") is None
+    print("✅ Ids, symbols, names and aliases resolve to one CoinGecko id")
+
+    assert registry.scan("bitcoin cash vs bitcoin") == ["bitcoin-cash", "bitcoin"]
+    assert registry.scan("Shiba Inu and dogecoins, then more BTC") == ["shiba-inu", "dogecoin", "bitcoin"]
+    # Everyday words that are also tickers only resolve on explicit lookup
+    assert registry.scan("one link near the flow of magic") == []
+    assert resolve_coin_id("link") == "chainlink"
+    assert registry.recognize("eth") == "ethereum" and registry.recognize("one") is None
+    print("✅ Free text scanned by longest alias match")
+
+    assert registry.scan("What is Bitcoin's market cap?") == ["bitcoin"]
+    assert registry.scan("What's Ethereum's roadmap? is solana's network fast") == ["ethereum", "solana"]
+    assert registry.scan("bitcoin cash's fees vs bitcoins") == ["bitcoin-cash", "bitcoin"]
+    assert registry.scan("'s s") == []
+    print("✅ Possessives and a bare 's' scan without errors")
+
+
+def test_priority_and_scan_limit():
+    registry = CoinRegistry([
+        {"id": "big-coin", "symbol": "abc", "name": "Big Coin"},
+        {"id": "abc-clone", "symbol": "abc", "name": "ABC Clone"},
+        {"id": "tail-coin", "symbol": "tail", "name": "Tail Coin"},
+    ], scan_max_priority=2)
+    assert registry.resolve("ABC") == "big-coin"
+    assert registry.scan("abc clone and abc") == ["abc-clone", "big-coin"]
+    assert registry.scan("tail") == [] and registry.resolve("tail") == "tail-coin"
+    print("✅ Higher-ranked coins win symbol collisions; long tail needs explicit lookup")
+
+
+def test_trainers_use_registry():
+    from enhanced_normal_trainer import PureNormalTrainer
+    from enhanced_subzero_trainer import EnhancedSubZeroTrainer
+
+    subzero = EnhancedSubZeroTrainer()
+    assert subzero.detect_price_query("how much is SOL and ADA worth") == (True, ["cardano", "solana"])
+    for query in ("What is Bitcoin's market cap?", "What's Ethereum's roadmap?", "What is Bitcoin's energy usage?"):
+        assert subzero.find_best_response(query)
+
+    trainer = PureNormalTrainer()
+    assert "Pi Network" in trainer.get_coin_information("pi")
+    assert "Bitcoin" in trainer.get_coin_information("btc")
+    print("✅ Trainers recognize coins by symbol through the registry")
+
+
+if __name__ == "__main__":
+    test_resolve_and_scan()
+    test_priority_and_scan_limit()
+    test_trainers_use_registry()
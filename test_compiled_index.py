@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the compiled, memory-mapped dataset index
+"""
+
+import json
+import os
+import tempfile
+
+from compiled_index import MappedIndex, index_path_for, open_index
+from retrieval_engine import InvertedIndex
+
+
+def test_compiled_index_roundtrip_and_rebuild():
+    print("🧪 Testing Compiled Dataset Index")
+    print("=" * 40)
+
+    conversations = [
+        {"user": "What is Bitcoin?", "sub_zero": "🧊 Bitcoin is frozen gold!"},
+        {"user": "Explain Ethereum staking", "sub_zero": "❄️ Ethereum stakers guard the realm."},
+        {"user": "How do wallets work?", "sub_zero": "🌨️ Wallets hold your keys, warrior."},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_file = os.path.join(tmp, "dataset.json")
+        with open(dataset_file, "w", encoding="utf-8") as f:
+            json.dump(conversations, f)
+
+        index = open_index(dataset_file, "sub_zero")
+        assert isinstance(index, MappedIndex)
+        assert os.path.exists(index_path_for(dataset_file))
+        assert list(index.questions) == [c["user"] for c in conversations]
+        assert list(index.responses) == [c["sub_zero"] for c in conversations]
+
+        reference = InvertedIndex()
+        reference.build(index.questions)
+        for query in ["bitcoin", "ethereum staking wallets", "nothing here"]:
+            assert index.score(query) == reference.score(query)
+        print("✅ Mapped index scores match the in-memory index")
+
+        bm25 = open_index(dataset_file, "sub_zero", scoring="bm25")
+        reference = InvertedIndex(scoring="bm25")
+        reference.build(bm25.questions)
+        assert bm25.score("ethereum staking") == reference.score("ethereum staking")
+
+        # Compiling with the canonical tokenizer replaces the plain-words index
+        canonical = open_index(dataset_file, "sub_zero", tokenizer="canonical")
+        assert canonical.source_hash != index.source_hash
+        assert canonical.score("what is btc") == canonical.score("bitcoin") != []
+        index = open_index(dataset_file, "sub_zero")
+
+        # Reopening an unchanged dataset reuses the compiled file
+        mtime = os.path.getmtime(index_path_for(dataset_file))
+        assert open_index(dataset_file, "sub_zero").source_hash == index.source_hash
+        assert os.path.getmtime(index_path_for(dataset_file)) == mtime
+
+        # Changing the JSON content triggers a rebuild
+        conversations.append({"user": "What is Solana?", "sub_zero": "🧊 Solana is swift as the north wind!"})
+        with open(dataset_file, "w", encoding="utf-8") as f:
+            json.dump(conversations, f)
+        rebuilt = open_index(dataset_file, "sub_zero")
+        assert len(rebuilt) == 4
+        assert rebuilt.responses[3].startswith("🧊 Solana")
+        print("✅ Index rebuilt after dataset content changed")
+
+
+if __name__ == "__main__":
+    test_compiled_index_roundtrip_and_rebuild()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the single-pass Aho-Corasick keyword router against naive substring scans
+"""
+
+import re
+
+from keyword_router import AUTOMATON, KEYWORD_TABLES, WORD_TABLES, KeywordAutomaton, route
+
+
+def naive_scan(text: str) -> dict:
+    """Reference: one substring or \\b regex scan per keyword"""
+    found = {}
+    for category, entries in KEYWORD_TABLES.items():
+        for value, phrases in entries.items():
+            if any(phrase in text for phrase in phrases):
+                found.setdefault(category, set()).add(value)
+    for category, entries in WORD_TABLES.items():
+        for value, phrases in entries.items():
+            if any(re.search(r'\b' + re.escape(phrase) + r'\b', text) for phrase in phrases):
+                found.setdefault(category, set()).add(value)
+    return found
+
+
+def test_keyword_router_matches_naive_scans():
+    print("🧪 Testing Keyword Router")
+    print("=" * 40)
+
+    inputs = [
+        "Switch to Sub-Zero now!",
+        "what is the price of BTC?",
+        "Tell me about this project",
+        "hi, how much is Solana worth",
+        "this is high value cardano news",
+        "bye! see you",
+        "the method behind ethics",
+        "",
+    ]
+    for text in inputs:
+        result = route(text)
+        assert {category: set(values) for category, values in result.matches.items()} == naive_scan(text.lower()), text
+        print(f"✅ '{text}' -> {sorted(result.matches)}")
+
+    result = route("What is the price of BTC?")
+    assert result.has('price_word', 'price') and result.has('price', 'what is the price') and result.has('topic', 'bitcoin')
+    assert not result.has('greeting')
+    assert result.first('topic', ['ethereum', 'bitcoin', 'crypto']) == 'bitcoin'
+    # Repeated routing of the same input reuses the first scan
+    assert route("what is the price of btc?") is result
+
+
+def test_automaton_overlapping_patterns():
+    automaton = KeywordAutomaton()
+    for phrase in ['he', 'she', 'his', 'hers']:
+        automaton.add(phrase, 'word', phrase)
+    automaton.add('she', 'whole', 'she', whole_word=True)
+    assert automaton.scan('ushers') == {'word': frozenset({'he', 'she', 'hers'})}
+    assert automaton.scan('she said')['whole'] == frozenset({'she'})
+    assert AUTOMATON.scan('') == {}
+
+
+if __name__ == "__main__":
+    test_keyword_router_matches_naive_scans()
+    test_automaton_overlapping_patterns()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the pooled market-data client against a local HTTP server
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from market_data_client import AsyncMarketDataClient, MarketDataClient
+
+
+class MarketHandler(BaseHTTPRequestHandler):
+    """Serves /simple/price and /coins/markets, failing the first request with 503"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    state = {}
+
+    def do_GET(self):
+        """Record the request and answer with canned JSON"""
+        state = self.state
+        with state['lock']:
+            state['requests'] += 1
+            state['ports'].add(self.client_address[1])
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            fail = state['fail_next']
+            state['fail_next'] = False
+        time.sleep(0.05)
+
+        if fail:
+            body = b'{}'
+            self.send_response(503)
+        else:
+            if self.path.startswith('/simple/price'):
+                body = json.dumps({'bitcoin': {'usd': 50000.0}}).encode()
+            else:
+                page = int(parse_qs(urlsplit(self.path).query)['page'][0])
+                body = json.dumps([{'id': f'coin-{page}', 'market_cap': page}]).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with state['lock']:
+            state['active'] -= 1
+
+    def log_message(self, *args):
+        """Silence request logging"""
+
+
+def test_pooling_retries_and_concurrency_limit():
+    print("🧪 Testing Market Data Client")
+    print("=" * 40)
+
+    MarketHandler.state = {'lock': threading.Lock(), 'requests': 0, 'ports': set(),
+                           'active': 0, 'peak': 0, 'fail_next': True}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MarketHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = MarketDataClient(base_url=f'http://127.0.0.1:{server.server_port}', max_per_host=2,
+                              backoff=0)
+    try:
+        assert client.get_prices(['bitcoin']) == {'bitcoin': 50000.0}
+        assert MarketHandler.state['requests'] == 2
+        print("✅ Transient 503 retried transparently")
+
+        for _ in range(5):
+            client.get_prices(['bitcoin'])
+        assert len(MarketHandler.state['ports']) == 1
+        print("✅ Sequential requests reuse one keep-alive connection")
+
+        markets = asyncio.run(AsyncMarketDataClient(client).get_markets_pages(6))
+        assert [market['id'] for market in markets] == [f'coin-{page}' for page in range(1, 7)]
+        assert MarketHandler.state['peak'] == 2
+        print("✅ Async pages fetched concurrently within the per-host limit")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_pooling_retries_and_concurrency_limit()
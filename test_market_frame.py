@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the columnar market frame against the list-of-dicts merge it replaces
+"""
+
+import random
+
+from market_frame import MarketFrame
+
+
+def reference_merge(markets):
+    """The old set-loop dedup plus full sort by market cap"""
+    seen = set()
+    unique_markets = []
+    for market in markets:
+        if market['id'] not in seen:
+            seen.add(market['id'])
+            unique_markets.append(market)
+    return sorted(unique_markets, key=lambda x: x.get('market_cap') or 0, reverse=True)
+
+
+def random_markets(n, seed=7):
+    """Markets with duplicate ids, tied caps and missing fields"""
+    rng = random.Random(seed)
+    markets = []
+    for i in range(n):
+        market = {
+            'id': f'coin-{rng.randrange(n // 2)}',
+            'symbol': f'c{i}',
+            'name': f'Coin {i}',
+            'current_price': rng.random() * 100,
+            'market_cap': rng.choice([None, 0, 1e6, rng.random() * 1e9]),
+            'total_volume': rng.random() * 1e7,
+            'price_change_percentage_24h': rng.uniform(-20, 20),
+        }
+        if rng.random() < 0.1:
+            del market['price_change_percentage_24h']
+        markets.append(market)
+    return markets
+
+
+def test_frame_matches_list_merge():
+    print("🧪 Testing Market Frame")
+    print("=" * 40)
+
+    markets = random_markets(600)
+    frame = MarketFrame(markets)
+    expected = reference_merge(markets)
+    assert len(frame) == len(expected)
+    assert frame.records(frame.top(len(frame))) == expected
+    assert frame.records(frame.top(10)) == expected[:10]
+    print("✅ Dedup and argpartition top-N match the sorted list of dicts")
+
+    gainers = frame.records(frame.gainers(5))
+    changes = [market.get('price_change_percentage_24h') or 0 for market in expected]
+    assert [g['price_change_percentage_24h'] for g in gainers] == sorted((c for c in changes if c > 0), reverse=True)[:5]
+    losers = frame.records(frame.losers(5))
+    assert [l['price_change_percentage_24h'] for l in losers] == sorted(c for c in changes if c < 0)[:5]
+    print("✅ Gainers and losers ranked on the change column")
+
+    rows = frame.where(min_market_cap=1e6, min_volume=5e6, max_change=0)
+    for market in frame.records(rows):
+        assert (market['market_cap'] or 0) >= 1e6 and market['total_volume'] >= 5e6
+        assert market.get('price_change_percentage_24h', 0) <= 0
+    assert len(rows) == sum(1 for m in expected if (m['market_cap'] or 0) >= 1e6 and m['total_volume'] >= 5e6
+                            and m.get('price_change_percentage_24h', 0) <= 0)
+    assert frame.records(frame.top(3, candidates=rows)) == [m for m in expected if frame.position(m['id']) in set(rows.tolist())][:3]
+    print("✅ Range filters combine with top-N")
+
+
+def test_lookup_and_empty_frame():
+    frame = MarketFrame([{'id': 'bitcoin', 'symbol': 'btc', 'market_cap': 1.0},
+                         {'id': 'btc', 'symbol': 'BTC', 'market_cap': 2.0}])
+    assert frame.get('bitcoin')['id'] == 'bitcoin' and frame.get('BTC')['id'] == 'btc'
+    empty = MarketFrame([])
+    assert len(empty) == 0 and empty.records(empty.top(10)) == [] and empty.records(empty.gainers(3)) == []
+
+
+if __name__ == "__main__":
+    test_frame_matches_list_merge()
+    test_lookup_and_empty_frame()
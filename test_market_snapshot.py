@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the background market snapshot service and its stale-while-revalidate reads
+"""
+
+import threading
+
+from market_snapshot import MarketSnapshotService
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_stale_snapshot_served_while_refreshing():
+    print("🧪 Testing Market Snapshot Service")
+    print("=" * 40)
+
+    clock = FakeClock()
+    release = threading.Event()
+    fetches = []
+
+    def fetch():
+        fetches.append(clock.now)
+        if len(fetches) > 1:
+            release.wait(5)  # slow upstream on revalidation
+        return [{'id': 'bitcoin', 'symbol': 'btc', 'current_price': 50000.0 + len(fetches)}]
+
+    service = MarketSnapshotService(fetch=fetch, stale_after=60, clock=clock)
+    first = service.get_snapshot()
+    assert len(first) == 1 and first.get('BTC')['current_price'] == 50001.0
+    assert service.status()['stale'] is False and service.status()['age'] == 0
+    print("✅ Cold start waits for the first snapshot")
+
+    clock.now += 61
+    assert service.get_snapshot() is first  # returned immediately, refresh runs behind it
+    assert service.get_snapshot() is first and service.status()['refreshing']
+    release.set()
+    for _ in range(100):
+        if service.refreshes == 2:
+            break
+        threading.Event().wait(0.01)
+    assert len(fetches) == 2
+    assert service.get_snapshot().get('bitcoin')['current_price'] == 50002.0
+    print("✅ Stale snapshot served while one background refresh runs")
+
+    try:
+        first.get('bitcoin')['current_price'] = 0
+        assert False, "snapshots must be read-only"
+    except TypeError:
+        pass
+
+
+def test_failed_refresh_keeps_last_snapshot():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            raise ConnectionError("upstream down")
+        return [{'id': 'ethereum', 'symbol': 'eth', 'current_price': 3000.0}]
+
+    service = MarketSnapshotService(fetch=fetch)
+    snapshot = service.get_snapshot()
+    assert service.refresh() is False
+    assert service.peek() is snapshot
+    status = service.status()
+    assert status['failures'] == 1 and status['last_error'] == "upstream down"
+    print("✅ Failed refreshes keep the previous snapshot")
+
+
+if __name__ == "__main__":
+    test_stale_snapshot_served_while_refreshing()
+    test_failed_refresh_keeps_last_snapshot()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the persistent market store and warm starts from it
+"""
+
+import os
+import tempfile
+
+from market_snapshot import MarketSnapshotService
+from market_store import MarketStore, format_age
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_write_through_and_warm_start():
+    print("🧪 Testing Market Store")
+    print("=" * 40)
+
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'market_cache.db')
+        markets = [{'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin', 'current_price': 50000.0, 'market_cap': 1e12}]
+        service = MarketSnapshotService(fetch=lambda: markets, clock=clock, store=MarketStore(path, clock=clock))
+        assert service.refresh()
+
+        store = MarketStore(path, clock=clock)
+        assert store.load_price('bitcoin') == (50000.0, 1000.0)
+        assert store.load_coin('bitcoin') == (markets[0], 1000.0)
+        print("✅ Refreshes are written through to SQLite")
+
+        # A "restarted" process serves the persisted snapshot without fetching
+        restarted = MarketSnapshotService(fetch=lambda: 1 / 0, clock=clock, store=store)
+        assert restarted.peek().get('btc')['current_price'] == 50000.0
+        clock.now += 30
+        assert restarted.get_snapshot(cold_start_timeout=0).fetched_at == 1000.0
+        print("✅ Restart warms from disk")
+
+        store.save_prices({'bitcoin': 51000.0, 'unknown': None})
+        assert store.load_price('bitcoin') == (51000.0, 1030.0) and store.load_price('unknown') is None
+
+    assert format_age(45) == "45 seconds" and format_age(60) == "1 minute" and format_age(7300) == "2 hours"
+
+
+def test_fallback_quotes_last_known_values():
+    import api_utils
+
+    store = MarketStore(':memory:')
+    original = api_utils.get_market_store
+    api_utils.get_market_store = lambda: store
+    try:
+        assert api_utils.get_last_known_price('btc') is None
+        assert api_utils.get_static_crypto_info('bitcoin')['current_price'] == 0
+
+        store.save_markets([{'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin', 'current_price': 42000.0,
+                             'market_cap': 8e11, 'price_change_percentage_24h': 1.5}])
+        price, age = api_utils.get_last_known_price('BTC')
+        assert price == 42000.0 and age < 60
+        info = api_utils.get_static_crypto_info('btc')
+        assert info['current_price'] == 42000.0 and info['price_change_24h'] == 1.5
+        assert "last known market data" in info['description']
+        print("✅ Fallback serves last-known values with their age")
+    finally:
+        api_utils.get_market_store = original
+
+
+if __name__ == "__main__":
+    test_write_through_and_warm_start()
+    test_fallback_quotes_last_known_values()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the record/replay mock market server and the I/O paths pointed at it
+"""
+
+import os
+import time
+from unittest import mock
+
+import requests
+
+from market_data_client import MarketDataClient, api_base
+from mock_market_server import MockMarketServer
+
+
+def test_replays_fixtures_for_every_route():
+    print("🧪 Testing Mock Market Server")
+    print("=" * 40)
+
+    server = MockMarketServer(seed=7)
+    server.start()
+    try:
+        markets = server.fixtures['coins_markets']
+        client = MarketDataClient(base_url=server.environ()['KOINTOSS_COINGECKO_API'], retries=0)
+        assert client.get_prices(['bitcoin', 'no-such-coin']) == {'bitcoin': markets[0]['current_price']}
+        assert [m['market_cap_rank'] for m in client.get_markets(per_page=5, page=2)] == [6, 7, 8, 9, 10]
+        assert client.get_markets(ids=['ethereum'])[0]['id'] == 'ethereum'
+
+        tickers = requests.get(f'{server.url}/api/v1/market/allTickers', timeout=5).json()
+        assert tickers['code'] == '200000' and tickers['data']['ticker'][0]['symbol'] == 'BTC-USDT'
+        print("✅ CoinGecko and KuCoin routes replay the fixtures")
+
+        # The news and trainer fetchers follow the environment overrides
+        with mock.patch.dict(os.environ, server.environ()):
+            assert api_base('fear_greed') == server.url
+            from crypto_news_insights import CryptoNewsInsights
+            articles = CryptoNewsInsights()._fetch_coingecko_news('bitcoin', 3)
+            assert len(articles) == 3 and articles[0]['source'] == 'CoinGecko'
+
+            from dual_personality_intensive_trainer import DualPersonalityAdvancedTrainer
+            data = DualPersonalityAdvancedTrainer(None).fetch_enhanced_market_data()
+            assert len(data['trending_names']) == 5 and len(data['market_data']) == 20
+            assert data['fear_greed']['data'][0]['value']
+        assert api_base('coingecko') == 'https://api.coingecko.com/api/v3'
+        print("✅ News and trainer fetches served locally")
+    finally:
+        server.stop()
+
+
+def test_latency_and_error_injection():
+    server = MockMarketServer(seed=3)
+    server.start()
+    try:
+        client = MarketDataClient(base_url=f'{server.url}/api/v3', retries=0)
+        server.configure('coins_markets', latency=0.2, jitter=0.05)
+        start = time.perf_counter()
+        client.get_markets(per_page=1)
+        assert time.perf_counter() - start >= 0.15
+
+        server.configure('simple_price', error_rate=1.0, error_status=503)
+        try:
+            client.get_prices(['bitcoin'])
+            assert False, "injected error was not raised"
+        except requests.HTTPError as e:
+            assert e.response.status_code == 503
+        assert server.stats()['errors'] == {'simple_price': 1}
+
+        # Half the requests fail, reproducibly for a given seed
+        outcomes = []
+        for seed in (11, 11):
+            flaky = MockMarketServer(seed=seed, error_rate=0.5)
+            outcomes.append([flaky.respond('/api/v3/ping')[0] for _ in range(40)])
+        assert outcomes[0] == outcomes[1] and 10 < outcomes[0].count(503) < 30
+        assert server.respond('/unknown')[0] == 404
+        print("✅ Injected latency, jitter and errors behave as configured")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_replays_fixtures_for_every_route()
+    test_latency_and_error_injection()
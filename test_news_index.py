@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the coin/tag news index against the substring filter it replaces
+"""
+
+import time
+
+from mock_market_server import synthetic_fixtures
+from news_index import NewsIndex
+from news_ingest import NewsIngestor
+from news_store import normalize_article
+
+ARTICLES = [
+    {'title': 'Bitcoin ETF inflows hit a record', 'description': 'Funds keep buying BTC.', 'published_ts': 300.0},
+    {'title': 'Ethereum staking yields climb', 'description': 'Validators earn more ETH.', 'published_ts': 100.0},
+    {'title': 'Miners sell as bitcoin hash rate climbs', 'description': '', 'published_ts': 200.0},
+    {'title': 'Solana DeFi volume jumps', 'description': 'Staking rewards draw users.', 'published_ts': 400.0},
+]
+
+
+def titles(articles):
+    """Titles in order, for readable comparisons"""
+    return [article['title'] for article in articles]
+
+
+def test_coin_and_tag_lookups_newest_first():
+    print("🧪 Testing News Index")
+    print("=" * 40)
+
+    index = NewsIndex()
+    for ref, article in enumerate(ARTICLES, 1):
+        index.add(ref, article)
+    assert titles(index.search('bitcoin')) == [ARTICLES[0]['title'], ARTICLES[2]['title']]
+    assert index.search('BTC') == index.search('Bitcoin') == index.search('bitcoin')
+    assert titles(index.search('eth', 1)) == [ARTICLES[1]['title']]
+    assert titles(index.search('bitcoin and solana', 2)) == [ARTICLES[3]['title'], ARTICLES[0]['title']]
+    assert titles(index.search('staking')) == [ARTICLES[3]['title'], ARTICLES[1]['title']]
+    assert titles(index.search('staking rewards')) == [ARTICLES[3]['title']]
+    assert index.search('dogecoin') == [] and index.search('') == []
+
+    index.remove(1)
+    assert titles(index.search('btc')) == [ARTICLES[2]['title']]
+    assert 'tag:etf' not in index.postings and len(index) == 3
+    print("✅ Coin ids, symbols and tags resolve to the newest articles")
+
+
+def test_ingested_log_is_indexed_incrementally():
+    ingestor = NewsIngestor(max_articles=30)
+    feeds = [synthetic_fixtures(seed=seed)['news']['data'] for seed in range(3)]
+    for seed, feed in enumerate(feeds):
+        ingestor.ingest([dict(item, url=f"{item['url']}?seed={seed}", title=f"{item['title']} ({seed})")
+                         for item in feed])
+    assert len(ingestor) == 30 and len(ingestor.index) == 30
+
+    # Same answer as scanning every stored article, newest first
+    stored = ingestor.latest(30)
+    for coin in ('bitcoin', 'ethereum', 'solana'):
+        expected = [a for a in stored if coin in a['coins']][:3]
+        assert ingestor.search(coin, 3) == expected, coin
+    assert set(ingestor.index.articles) == {seq for _, seq, _ in ingestor.entries}
+    print("✅ Ingest and eviction keep the index in step with the log")
+
+
+def test_lookup_stays_flat_as_the_pool_grows():
+    sizes, timings = (500, 5000), []
+    for size in sizes:
+        index = NewsIndex()
+        for ref in range(size):
+            coin = ('Bitcoin', 'Ethereum', 'Solana', 'Cardano', 'Dogecoin')[ref % 5]
+            index.add(ref, normalize_article({'title': f'{coin} update {ref}', 'published_at': 1_700_000_000 + ref}))
+        start = time.perf_counter()
+        for _ in range(200):
+            found = index.search('solana', 3)
+        timings.append(time.perf_counter() - start)
+        assert titles(found) == [f'Solana update {size - 3}', f'Solana update {size - 8}', f'Solana update {size - 13}']
+    print(f"✅ Top-3 lookup: {timings[0] * 5000:.1f} µs at {sizes[0]} articles, "
+          f"{timings[1] * 5000:.1f} µs at {sizes[1]}")
+
+
+def test_coin_news_served_from_the_index():
+    from crypto_news_insights import CryptoNewsInsights
+    news = CryptoNewsInsights(fetch_news=lambda: [])  # offline: the pool stays on the demo articles
+    assert titles(news._get_mock_news('eth', 5)) == ['Ethereum 2.0 Staking Rewards Attract More Validators']
+    news.news_ingestor.ingest(synthetic_fixtures(seed=2)['news']['data'])
+    assert 'Cardano' in news.get_specific_coin_news('ADA')
+    print("✅ Coin news comes from the ingested index")
+
+
+if __name__ == "__main__":
+    test_coin_and_tag_lookups_newest_first()
+    test_ingested_log_is_indexed_incrementally()
+    test_lookup_stays_flat_as_the_pool_grows()
+    test_coin_news_served_from_the_index()
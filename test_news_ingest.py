@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the streaming news ingestion: one schema, URL and near-duplicate dedup, scoring once
+"""
+
+import os
+from unittest import mock
+
+from mock_market_server import MockMarketServer, synthetic_fixtures
+from news_ingest import NewsIngestor, canonical_url, normalize
+
+STORY = {
+    'title': 'Bitcoin surges past $70,000 as spot ETF inflows hit a record',
+    'description': 'BTC climbed above $70K on Tuesday after US spot bitcoin ETFs logged their largest '
+                   'daily inflows since launch.',
+    'url': 'https://www.coindesk.com/markets/btc-70k/?utm_source=twitter',
+    'publishedAt': '2026-10-18T10:00:00Z',
+    'source': {'id': None, 'name': 'CoinDesk'},
+}
+REWRITE = {
+    'headline': 'Bitcoin surges above $70K as spot ETF inflows reach record',
+    'summary': 'BTC climbed past $70,000 on Tuesday after US spot bitcoin ETFs logged their biggest '
+               'daily inflows since launch.',
+    'link': 'https://cointelegraph.com/news/bitcoin-70k',
+    'pubDate': 'Sun, 18 Oct 2026 10:05:00 GMT',
+}
+OTHER = {
+    'title': 'Ethereum developers schedule the next network upgrade',
+    'description': 'Core developers agreed on a testnet date for the upgrade.',
+    'url': 'https://decrypt.co/eth-upgrade',
+    'created_at': 1792321200,
+    'news_site': 'Decrypt',
+}
+
+
+def test_normalizes_sources_into_one_schema():
+    print("🧪 Testing News Ingest")
+    print("=" * 40)
+
+    story, rewrite, other = normalize(STORY), normalize(REWRITE, source='Cointelegraph'), normalize(OTHER)
+    assert story['source'] == 'CoinDesk' and rewrite['source'] == 'Cointelegraph' and other['source'] == 'Decrypt'
+    assert rewrite['url'] == REWRITE['link'] and rewrite['description'] == REWRITE['summary']
+    assert rewrite['published_ts'] - story['published_ts'] == 300
+    assert other['published_ts'] == 1792321200 and normalize({'title': 'x'})['published_ts'] == 0.0
+    assert canonical_url(STORY['url']) == canonical_url('http://coindesk.com/markets/btc-70k#top')
+    print("✅ CoinGecko, NewsAPI and RSS-style items share one schema")
+
+
+def test_dedups_by_url_and_near_duplicate_text():
+    scored = []
+    ingestor = NewsIngestor(score=lambda articles: scored.extend(a['title'] for a in articles))
+    added = ingestor.ingest([STORY, dict(STORY, url='https://coindesk.com/markets/btc-70k'), REWRITE, OTHER])
+    assert [a['title'] for a in added] == [STORY['title'], OTHER['title']]
+    assert ingestor.duplicates == {'url': 1, 'near': 1}
+    assert added[0]['coins'] == ['bitcoin']
+
+    # Re-fetching the same feed scores nothing again
+    assert ingestor.ingest([STORY, OTHER, REWRITE]) == []
+    assert scored == [STORY['title'], OTHER['title']]
+
+    # Templated headlines about different coins are distinct stories
+    for seed in range(10):
+        news = synthetic_fixtures(seed=seed)['news']['data']
+        assert len(NewsIngestor().ingest(news)) == len(news)
+    print("✅ URL copies and rewrites are dropped, each unique article is scored once")
+
+
+def test_bounded_log_in_publication_order():
+    ingestor = NewsIngestor(max_articles=5)
+    news = synthetic_fixtures(seed=1)['news']['data']  # newest first
+    ingestor.ingest(news[:3])
+    first, cursor = ingestor.since(0)
+    assert [a['title'] for a in first] == [a['title'] for a in reversed(news[:3])]
+
+    ingestor.ingest(news[3:8])
+    added, cursor = ingestor.since(cursor)
+    assert len(ingestor) == 5 and ingestor.evicted == 3
+    assert [a['title'] for a in ingestor.latest(5)] == [a['title'] for a in news[:5]]
+    assert [a['title'] for a in added] == [a['title'] for a in reversed(news[3:5])]
+    assert ingestor.since(cursor) == ([], cursor)
+
+    # Evicted stories are still remembered by URL
+    assert ingestor.ingest(news[7:8]) == []
+    print("✅ The log keeps the newest articles and readers follow it by cursor")
+
+
+def test_insights_read_the_ingested_log():
+    server = MockMarketServer(seed=5)
+    server.start()
+    try:
+        with mock.patch.dict(os.environ, server.environ()):
+            from crypto_news_insights import CryptoNewsInsights
+            news = CryptoNewsInsights()
+            pool = news._fetch_news_pool()
+            assert len(pool) == 20 and all('analysis' in article for article in pool)
+            assert news._fetch_news_pool() == pool
+            assert news.news_ingestor.stats()['duplicates']['url'] >= 20
+            news.news_store.refresh()
+        assert 'COMPREHENSIVE MARKET ANALYSIS' in news.get_market_insights()
+        print("✅ Insights are built from the ingested, scored pool")
+    finally:
+        server.stop()
+
+
+def test_insights_aggregate_stored_scores_by_cursor():
+    from crypto_news_insights import CryptoNewsInsights
+    news = CryptoNewsInsights(fetch_news=lambda: [])
+    feeds = [synthetic_fixtures(seed=seed)['news']['data'] for seed in (3, 4)]
+    news.news_ingestor.ingest(feeds[0])
+    with mock.patch.object(news.sentiment_engine, 'score_batch', side_effect=AssertionError("rescored")):
+        assert 'COMPREHENSIVE MARKET ANALYSIS' in news.get_market_insights()
+        assert [a['title'] for a in news.insight_articles] == [a['title'] for a in news.news_ingestor.latest(5)]
+        cursor = news.insight_cursor
+        assert news.get_market_insights('subzero') and news.insight_cursor == cursor
+    news.news_ingestor.ingest([dict(item, url=f"{item['url']}?seed=4", title=f"{item['title']} (4)")
+                               for item in feeds[1]])
+    with mock.patch.object(news.sentiment_engine, 'score_batch', side_effect=AssertionError("rescored")):
+        news.get_market_insights()
+    assert news.insight_cursor > cursor
+    assert [a['title'] for a in news.insight_articles] == [a['title'] for a in news.news_ingestor.latest(5)]
+    print("✅ Insights read new articles by cursor and reuse the scores from ingest")
+
+
+if __name__ == "__main__":
+    test_normalizes_sources_into_one_schema()
+    test_dedups_by_url_and_near_duplicate_text()
+    test_bounded_log_in_publication_order()
+    test_insights_read_the_ingested_log()
+    test_insights_aggregate_stored_scores_by_cursor()
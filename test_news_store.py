@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the topic-agnostic news store: pool reuse and stale-while-revalidate
+"""
+
+import threading
+import time
+
+from news_store import NewsStore
+
+ARTICLES = [
+    {'title': 'Bitcoin ETF inflows hit a record', 'description': 'Funds keep buying.', 'url': 'u1'},
+    {'title': 'Ethereum gas fees fall', 'description': 'Layer 2 usage grows.', 'url': 'u2'},
+    {'title': 'Miners sell as bitcoin hash rate climbs', 'description': None, 'url': 'u3'},
+    {'title': 'Solana outage resolved', 'description': 'Validators restart.', 'url': 'u4'},
+]
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until condition() is true or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_pool_serves_every_topic_and_limit():
+    print("🧪 Testing News Store")
+    print("=" * 40)
+
+    fetches = []
+    store = NewsStore(lambda: fetches.append(1) or ARTICLES, clock=lambda: 1000.0)
+    assert store.refresh() and len(fetches) == 1
+
+    assert [a['url'] for a in store.get('bitcoin', 5)] == ['u1', 'u3']
+    assert [a['url'] for a in store.get('Bitcoin', 1)] == ['u1']  # smaller limit, same cached match
+    assert [a['url'] for a in store.get('cryptocurrency', 3)] == ['u1', 'u2', 'u3']
+    assert len(store.get('dogecoin', 10)) == 4  # no match: the whole pool, as the demo news did
+    assert store.get('bitcoin', 5)[1]['description'] == ''  # normalized
+    assert len(fetches) == 1
+    print("✅ Every topic and limit served from one fetch")
+
+
+def test_stale_pool_served_while_refreshing():
+    now = [0.0]
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        """Upstream that blocks until released"""
+        calls.append(1)
+        release.wait(5)
+        return ARTICLES[1:]
+
+    store = NewsStore(slow_fetch, fallback=lambda: ARTICLES[:1], stale_after=60, clock=lambda: now[0])
+    start = time.monotonic()
+    assert [a['url'] for a in store.get('bitcoin')] == ['u1']  # demo pool, no waiting
+    assert store.get('bitcoin') and time.monotonic() - start < 0.5
+    assert wait_for(lambda: calls) and len(calls) == 1  # one background refresh despite two reads
+    assert store.status()['refreshing']
+
+    release.set()
+    assert wait_for(lambda: store.refreshes == 1)
+    assert [a['url'] for a in store.get('bitcoin')] == ['u3']
+
+    # Failed refreshes keep serving the last good pool
+    now[0] = 1000.0
+    store.fetch = lambda: []
+    assert not store.refresh() and store.get('bitcoin')[0]['url'] == 'u3'
+    assert store.status()['last_error'] == 'upstream returned no articles'
+    print("✅ Stale pool served while one background refresh runs")
+
+
+def test_failed_refreshes_back_off():
+    now = [0.0]
+    calls = []
+
+    def down():
+        """Upstream that always fails"""
+        calls.append(now[0])
+        raise ConnectionError("news API unreachable")
+
+    store = NewsStore(down, fallback=lambda: ARTICLES, stale_after=60, clock=lambda: now[0])
+    for _ in range(20):
+        assert len(store.get('bitcoin')) == 2
+    assert wait_for(lambda: store.failures == 1) and len(calls) == 1
+    assert store.status()['backing_off'] and store.retry_delay() == 30
+
+    # Reads during the backoff do not fetch; the next one after it does, and the delay doubles
+    now[0] = 29.0
+    store.get('bitcoin')
+    time.sleep(0.05)
+    assert len(calls) == 1
+    now[0] = 30.0
+    store.get('bitcoin')
+    assert wait_for(lambda: store.failures == 2) and store.retry_delay() == 60
+
+    store.fetch = lambda: ARTICLES[1:]
+    now[0] = 90.0
+    store.get('bitcoin')
+    assert wait_for(lambda: store.refreshes == 1) and store.retry_delay() == 0 and not store.backing_off()
+    print("✅ Failed refreshes back off exponentially instead of refetching on every read")
+
+
+def test_news_insights_reads_from_the_store():
+    from crypto_news_insights import CryptoNewsInsights
+    fetches = []
+    news = CryptoNewsInsights(fetch_news=lambda: fetches.append(1) or ARTICLES)
+    assert not fetches  # constructing the service does not touch the network
+    assert len(news.get_latest_news('cryptocurrency', 5)) == 5
+    assert wait_for(lambda: news.news_store.refreshes == 1) and len(fetches) == 1
+    assert 'Latest' in news.get_specific_coin_news('bitcoin')
+    print("✅ CryptoNewsInsights served from the article pool")
+
+
+if __name__ == "__main__":
+    test_pool_serves_every_topic_and_limit()
+    test_stale_pool_served_while_refreshing()
+    test_failed_refreshes_back_off()
+    test_news_insights_reads_from_the_store()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test coalescing of concurrent price lookups into batched requests
+"""
+
+import threading
+import time
+
+from price_coalescer import PriceCoalescer
+
+
+def run_concurrently(coalescer, coin_ids):
+    """Look up every coin id from its own thread, returning the prices in order"""
+    results = [None] * len(coin_ids)
+
+    def lookup(i):
+        """Store one lookup's result"""
+        try:
+            results[i] = coalescer.get(coin_ids[i], timeout=5)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(len(coin_ids))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_lookups_share_one_batch():
+    print("🧪 Testing Price Coalescer")
+    print("=" * 40)
+
+    calls = []
+    prices = {'bitcoin': 50000.0, 'ethereum': 3000.0, 'solana': 150.0}
+
+    def fetch(coin_ids):
+        calls.append(list(coin_ids))
+        time.sleep(0.02)
+        return {coin_id: prices[coin_id] for coin_id in coin_ids if coin_id in prices}
+
+    coalescer = PriceCoalescer(fetch, window=0.05)
+    coin_ids = ['bitcoin', 'ethereum', 'solana', 'unknown-coin'] * 5
+    results = run_concurrently(coalescer, coin_ids)
+
+    assert results == [prices.get(coin_id) for coin_id in coin_ids]
+    assert len(calls) == 1 and sorted(calls[0]) == sorted(set(coin_ids))
+    stats = coalescer.stats()
+    assert stats['lookups'] == 20 and stats['coalesced'] == 16 and stats['batches'] == 1
+    assert stats['in_flight'] == 0
+    print("✅ 20 concurrent lookups for 4 coins became one 4-id request")
+
+    coalescer.max_batch = 2
+    run_concurrently(coalescer, ['bitcoin', 'ethereum', 'solana'])
+    assert [len(call) for call in calls[1:]] == [2, 1]
+    print("✅ Large windows split into bounded batches")
+
+
+def test_fetch_errors_fan_out():
+    def fetch(coin_ids):
+        raise ConnectionError("upstream down")
+
+    coalescer = PriceCoalescer(fetch, window=0.02)
+    results = run_concurrently(coalescer, ['bitcoin', 'bitcoin', 'ethereum'])
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert coalescer.stats()['in_flight'] == 0
+    print("✅ A failed batch fails every waiting lookup")
+
+
+if __name__ == "__main__":
+    test_concurrent_lookups_share_one_batch()
+    test_fetch_errors_fan_out()
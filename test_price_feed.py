@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test streaming price ingestion against the local stand-in feed server
+"""
+
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+
+import price_feed
+from price_feed import PriceTable, TickerFeed
+from price_feed_server import StandInFeedServer
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until condition() is true or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_feed_streams_into_price_table():
+    print("🧪 Testing Streaming Price Feed")
+    print("=" * 40)
+
+    server = StandInFeedServer(interval=0.02, seed=1)
+    url = server.start()
+    feed = TickerFeed(symbols=['btc', 'eth'], ws_url=url)
+    try:
+        assert feed.start(wait=5)
+        assert wait_for(lambda: feed.table.get('BTC') and feed.table.get('ETH'))
+        assert feed.table.get('SOL') is None  # not subscribed
+        assert abs(feed.table.get('BTC') - 43250.0) / 43250.0 < 0.05
+        print(f"✅ Subscribed ticks stream into the table ({feed.messages} messages)")
+
+        # Coin ids resolve to the streamed symbol (get_crypto_price asks feed_price first)
+        server.stop()  # freeze the random walk so both reads see the same tick
+        price_feed._feed = feed
+        assert price_feed.feed_price('bitcoin') == feed.table.get('BTC')
+        assert price_feed.feed_price('solana') is None
+        print("✅ Coin ids served from the feed")
+    finally:
+        price_feed._feed = None
+        feed.stop()
+        server.stop()
+
+
+def test_all_topic_replay_and_quote_age():
+    with tempfile.TemporaryDirectory() as tmp:
+        replay_file = os.path.join(tmp, 'ticks.jsonl')
+        with open(replay_file, 'w') as f:
+            f.write(json.dumps({'symbol': 'PI-USDT', 'price': '0.7'}) + '\n')
+            f.write(json.dumps({'symbol': 'PI-BTC', 'price': '0.00001'}) + '\n')
+        server = StandInFeedServer(interval=0.02, replay_file=replay_file)
+        feed = TickerFeed(ws_url=server.start())
+        try:
+            feed.start(wait=5)
+            assert wait_for(lambda: feed.table.get('PI') == 0.7)
+            assert len(feed.table) == 1  # non-USDT pairs ignored
+        finally:
+            feed.stop()
+            server.stop()
+
+    now = [100.0]
+    table = PriceTable(clock=lambda: now[0])
+    table.update('btc', 1.0)
+    now[0] += 31
+    assert table.get('BTC') == 1.0 and table.get('BTC', max_age=30) is None
+    print("✅ Replayed ticks ingested; stale quotes are not served")
+
+
+def test_bullet_token_follows_the_kucoin_base_url():
+    bullet = {'data': {'token': 'abc', 'instanceServers': [{'endpoint': 'ws://127.0.0.1:1', 'pingInterval': 5000}]}}
+    with mock.patch.dict(os.environ, {'KOINTOSS_KUCOIN_API': 'http://127.0.0.1:8099/'}), \
+            mock.patch.object(price_feed.requests, 'post') as post:
+        post.return_value.json.return_value = bullet
+        url, ping_interval = TickerFeed().resolve_endpoint()
+    assert post.call_args[0][0] == 'http://127.0.0.1:8099/api/v1/bullet-public'
+    assert url.startswith('ws://127.0.0.1:1?token=abc&connectId=') and ping_interval == 5.0
+    print("✅ Bullet token requested from the configured KuCoin base URL")
+
+
+if __name__ == "__main__":
+    test_feed_streams_into_price_table()
+    test_all_topic_replay_and_quote_age()
+    test_bullet_token_follows_the_kucoin_base_url()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test query canonicalization for response-cache keys and retrieval terms
+"""
+
+from query_canonicalizer import canonical_key, canonical_terms
+
+
+def test_equivalent_questions_share_a_key():
+    print("🧪 Testing Query Canonicalization")
+    print("=" * 40)
+
+    assert canonical_key("What is BTC?") == canonical_key("what's bitcoin") == canonical_key("bitcoin?") == "bitcoin"
+    assert canonical_key("ETH price") == canonical_key("price of ethereum")
+    assert canonical_key("What is it?") == "what is it?"
+    print("✅ Paraphrases map to one sorted bag of terms")
+
+    # Token-level synonyms never rewrite inside a longer word
+    assert canonical_terms("ethereum and defi") == ["ethereum", "decentralized", "finance"]
+    assert canonical_terms("Is crypto a good hodl?") == ["cryptocurrency", "good", "hold"]
+
+
+def test_normal_trainer_cache_hits_paraphrases():
+    from enhanced_normal_trainer import PureNormalTrainer
+
+    trainer = PureNormalTrainer()
+    first = trainer.get_response("How does blockchain mining work?")
+    assert first["source"] in ("similarity", "fallback")
+    assert trainer.get_response("how does mining work in blockchain").get("source") == "cache"
+    print("✅ Reworded question served from the response cache")
+
+    # The retrieval index is built and queried on the same canonical terms
+    assert trainer.index.tokenizer("What's BTC?") == ["bitcoin"]
+    assert trainer.index.score("What is BTC?") == trainer.index.score("bitcoin")
+    print("✅ Retrieval matches synonyms and ignores stop words")
+
+
+def test_continuous_learning_uses_canonical_terms():
+    from continuous_learning_trainer import ContinuousLearningTrainer
+
+    trainer = ContinuousLearningTrainer()
+    assert trainer.simple_tokenize("What's ETH?") == ["ethereum"]
+    assert trainer.index.score("btc") == trainer.index.score("bitcoin")
+
+
+if __name__ == "__main__":
+    test_equivalent_questions_share_a_key()
+    test_normal_trainer_cache_hits_paraphrases()
+    test_continuous_learning_uses_canonical_terms()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the per-provider token-bucket rate limiter
+"""
+
+import asyncio
+import os
+import tempfile
+
+from rate_limiter import FILE_LOCKS_AVAILABLE, FileTokenBucket, RateLimitTimeout, TokenBucket
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep just moves time forward"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        """Advance time instead of blocking"""
+        self.now += seconds
+
+
+def test_burst_then_throttle():
+    print("🧪 Testing Token Bucket Rate Limiter")
+    print("=" * 40)
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.now == 1000.0
+    print("✅ Calls within budget proceed without waiting")
+
+    assert bucket.acquire() == 0.5 and clock.now == 1000.5
+    try:
+        bucket.acquire(timeout=0.1)
+        assert False, "expected RateLimitTimeout"
+    except RateLimitTimeout:
+        pass
+    print("✅ Empty bucket waits for the next refill, or times out")
+
+    clock.now += 10  # refill is capped at capacity
+    assert asyncio.run(bucket.acquire_async()) == 0.0
+    stats = bucket.stats()
+    assert stats['acquired'] == 5 and stats['throttled'] == 1
+    assert stats['total_wait'] == 0.5 and stats['max_wait'] == 0.5
+
+
+def test_file_backend_shares_budget():
+    if not FILE_LOCKS_AVAILABLE:
+        return
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as state_dir:
+        state_file = os.path.join(state_dir, 'coingecko.bucket')
+        worker_a = FileTokenBucket(state_file, rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+        worker_b = FileTokenBucket(state_file, rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+        assert worker_a.reserve() == 0.0 and worker_b.reserve() == 0.0
+        # The third call waits no matter which process makes it
+        assert worker_a.reserve() == 1.0 and worker_b.reserve() == 2.0
+    print("✅ File-lock backend shares one budget across processes")
+
+
+if __name__ == "__main__":
+    test_burst_then_throttle()
+    test_file_backend_shares_budget()
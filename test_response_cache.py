@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the TTL- and size-bounded response cache
+"""
+
+import enhanced_normal_trainer
+from enhanced_normal_trainer import CACHE_TTLS, PureNormalTrainer
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_ttl_and_counters():
+    print("🧪 Testing Response Cache")
+    print("=" * 40)
+
+    clock = FakeClock()
+    cache = ResponseCache(max_size=2, default_ttl=10, clock=clock)
+    cache.set("a", "A")
+    cache.set("b", "B", ttl=100)
+    assert cache.get("a") == "A"  # "a" becomes most recently used
+    cache.set("c", "C")
+    assert "b" not in cache and cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    print("✅ Least recently used entry evicted at the size cap")
+
+    clock.now = 10
+    assert cache.get("a") is None and len(cache) == 1
+    print("✅ Entries expire after their TTL")
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 2
+    assert stats["evictions"] == 1 and stats["expirations"] == 1 and stats["size"] == 1
+
+
+def test_live_answers_expire_before_dataset_answers():
+    clock = FakeClock()
+    trainer = PureNormalTrainer(response_cache=ResponseCache(clock=clock))
+    price_calls = []
+    trainer.get_real_time_price = lambda coin_name: price_calls.append(coin_name) or f"{coin_name} is $1.00"
+
+    trainer.get_response("hello")
+    similar = trainer.get_response("How does blockchain mining work?")
+    assert similar["source"] == "similarity"
+    # Cached similarity answers keep picking among the top candidates
+    assert trainer.get_response("How does blockchain mining work?")["source"] == "cache"
+
+    if enhanced_normal_trainer.API_AVAILABLE:
+        trainer.get_response("btc price")
+        assert trainer.get_response("btc price")["source"] == "cache"
+        clock.now = CACHE_TTLS["live_api"] + 1
+        assert trainer.get_response("btc price")["source"] == "live_api"
+        assert price_calls == ["btc", "btc"]
+
+    assert trainer.get_response("hello")["source"] == "cache"
+    assert trainer.get_training_info()["cache_stats"]["hits"] >= 2
+    print("✅ Live-data answers refresh while dataset answers stay cached")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_ttl_and_counters()
+    test_live_answers_expire_before_dataset_answers()
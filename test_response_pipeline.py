@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test that PureNormalTrainer answers and labels a request in one evaluation
+"""
+
+import enhanced_normal_trainer
+from enhanced_normal_trainer import PureNormalTrainer
+
+
+def test_response_provenance_from_single_evaluation():
+    print("🧪 Testing Response Pipeline Provenance")
+    print("=" * 40)
+
+    trainer = PureNormalTrainer()
+    price_calls = []
+
+    def fake_price(coin_name):
+        price_calls.append(coin_name)
+        return f"The current price of {coin_name.upper()} is $1.00 USD."
+
+    trainer.get_real_time_price = fake_price
+
+    greeting = trainer.get_response("hello there")
+    assert greeting["source"] == "keyword" and greeting["type"] == "normal_keyword_match"
+    assert trainer.get_response("hello there")["source"] == "cache"
+    # Cached keyword hits keep their candidate replies, so repeats still vary
+    greetings = {trainer.get_response("hello there")["message"] for _ in range(40)}
+    assert len(greetings) > 1
+
+    similar = trainer.get_response("How does blockchain mining work?")
+    assert similar["source"] == "similarity" and similar["type"] == "normal_similarity_match"
+    print("✅ Keyword, cache and similarity answers carry their provenance")
+
+    if enhanced_normal_trainer.API_AVAILABLE:
+        live = trainer.get_response("btc price")
+        assert live["source"] == "live_api" and live["type"] == "normal_live_data"
+        # The live price is fetched once per request, not again to label the response
+        assert price_calls == ["btc"]
+        print("✅ Live price fetched once per request")
+
+    batch = trainer.get_responses(["hello there", "zzzz qqqq"])
+    assert [response["source"] for response in batch] == ["cache", "fallback"]
+
+
+if __name__ == "__main__":
+    test_response_provenance_from_single_evaluation()
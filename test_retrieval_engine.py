@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the sparse inverted-index retrieval engine against dense count-cosine
+"""
+
+import math
+import random
+
+import numpy as np
+
+from retrieval_engine import SCORING_MODES, InvertedIndex, tokenize_text, top_k, top_k_array
+
+
+def dense_cosine(query: str, document: str, vocabulary: list) -> float:
+    """Reference implementation using full vocabulary-sized vectors"""
+    query_words = tokenize_text(query.lower())
+    document_words = tokenize_text(document.lower())
+    vec1 = [query_words.count(word) for word in vocabulary]
+    vec2 = [document_words.count(word) for word in vocabulary]
+    magnitude1 = math.sqrt(sum(a * a for a in vec1))
+    magnitude2 = math.sqrt(sum(b * b for b in vec2))
+    if magnitude1 == 0 or magnitude2 == 0:
+        return 0.0
+    return sum(a * b for a, b in zip(vec1, vec2)) / (magnitude1 * magnitude2)
+
+
+def test_inverted_index_matches_dense_cosine():
+    print("🧪 Testing Inverted Index Retrieval")
+    print("=" * 40)
+
+    documents = [
+        "What is Bitcoin?",
+        "How does Bitcoin mining work?",
+        "Tell me about Ethereum smart contracts",
+        "What is a crypto wallet and how do I use it?",
+        "ok",
+    ]
+    index = InvertedIndex()
+    index.build(documents)
+
+    vocabulary = sorted({word for doc in documents for word in tokenize_text(doc.lower())})
+    assert index.vocabulary_size == len(vocabulary)
+
+    for query in ["bitcoin mining", "what is ethereum", "wallet wallet crypto", "unknown words"]:
+        scores = index.score(query)
+        for doc_id, document in enumerate(documents):
+            expected = dense_cosine(query, document, vocabulary)
+            assert math.isclose(scores.get(doc_id, 0.0), expected, abs_tol=1e-12), (query, document)
+        # Only samples sharing a term with the query are scored
+        assert all(score > 0 for score in scores.values())
+        print(f"✅ '{query}' -> {len(scores)} matching samples")
+
+    assert index.score("") == {}
+
+
+def test_score_batch_matches_single_queries():
+    print("🧪 Testing Batch Scoring")
+    print("=" * 40)
+
+    index = InvertedIndex()
+    index.build(["What is Bitcoin?", "Bitcoin mining rewards", "Ethereum gas fees", "Ethereum staking rewards"])
+
+    queries = ["bitcoin rewards", "ethereum", "nothing matches", "staking staking gas"]
+    scores = index.score_batch(queries)
+    assert scores.shape == (len(queries), len(index))
+
+    for row, query in zip(scores, queries):
+        expected = index.score(query)
+        for doc_id in range(len(index)):
+            assert math.isclose(row[doc_id], expected.get(doc_id, 0.0), abs_tol=1e-12)
+    print(f"✅ {len(queries)} queries scored in one sparse product")
+
+
+def test_scoring_modes_batch_parity_and_range():
+    print("🧪 Testing TF-IDF and BM25 Scoring")
+    print("=" * 40)
+
+    documents = ["What is Bitcoin?", "Bitcoin mining rewards explained", "Ethereum gas fees",
+                 "What is the Ethereum merge and what changed?", "Bitcoin Bitcoin Bitcoin"]
+    queries = ["bitcoin rewards", "what is ethereum", "gas gas fees", "nothing matches"]
+
+    for mode in SCORING_MODES:
+        index = InvertedIndex(scoring=mode)
+        index.build(documents)
+        scores = index.score_batch(queries)
+        for row, query in zip(scores, queries):
+            expected = index.score(query)
+            for doc_id in range(len(index)):
+                assert math.isclose(row[doc_id], expected.get(doc_id, 0.0), abs_tol=1e-12), (mode, query)
+        assert scores.min() >= 0.0 and scores.max() <= 1.0 + 1e-12
+        print(f"✅ {mode}: batch matches single queries, scores within [0, 1]")
+
+    # Rare terms gain weight over common ones once IDF is applied
+    cosine, tfidf = InvertedIndex(), InvertedIndex(scoring='tfidf')
+    cosine.build(documents)
+    tfidf.build(documents)
+    plain, weighted = cosine.score("what is mining"), tfidf.score("what is mining")
+    assert weighted[1] / weighted[0] > plain[1] / plain[0]
+
+    # Incremental adds score exactly like a full rebuild, with no explicit recompute
+    for mode in ('tfidf', 'bm25'):
+        grown = InvertedIndex(scoring=mode)
+        grown.build(documents[:3])
+        grown.score("bitcoin")  # statistics computed for the smaller collection first
+        for document in documents[3:]:
+            grown.add_document(document)
+        rebuilt = InvertedIndex(scoring=mode)
+        rebuilt.build(documents)
+        for query in ("bitcoin ethereum", "what is mining"):
+            assert grown.score(query) == rebuilt.score(query), (mode, query)
+            assert (grown.score_batch([query]) == rebuilt.score_batch([query])).all(), (mode, query)
+
+
+def test_top_k_heap_and_argpartition_agree():
+    print("🧪 Testing Top-k Selection")
+    print("=" * 40)
+
+    rng = random.Random(7)
+    for _ in range(500):
+        values = np.array([float(rng.randint(0, 4)) for _ in range(rng.randint(1, 25))])
+        k = rng.randint(1, 5)
+        expected = sorted(enumerate(values.tolist()), key=lambda item: (-item[1], item[0]))[:k]
+        assert top_k(dict(enumerate(values.tolist())), k) == expected
+        assert top_k_array(values, k) == expected
+
+        candidates = np.array(sorted(rng.sample(range(len(values)), rng.randint(1, len(values)))))
+        expected = sorted(((int(i), values[i]) for i in candidates), key=lambda item: (-item[1], item[0]))[:k]
+        assert top_k_array(values, k, candidates) == expected
+
+    assert top_k({}, 3) == [] and top_k_array(np.array([]), 3) == []
+    print("✅ Heap and argpartition top-k match a full sort, ties to the lowest index")
+
+
+def test_continuous_learning_adds_conversations_incrementally():
+    from continuous_learning_trainer import ContinuousLearningTrainer
+
+    trainer = ContinuousLearningTrainer()
+    size = len(trainer.index)
+    trainer.add_dynamic_conversation("How do zkrollups batch transactions?",
+                                     "Zero-knowledge rollups bundle transactions off-chain and post one validity proof to Ethereum.")
+    assert len(trainer.index) == size + 1
+
+    # The new conversation is matchable right away and scores as a full rebuild would
+    scores = trainer.index.score("zkrollups")
+    assert list(scores) == [size]
+    rebuilt = InvertedIndex(trainer.simple_tokenize)
+    rebuilt.build(trainer.user_inputs)
+    assert trainer.index.score("ethereum zkrollups transactions") == rebuilt.score("ethereum zkrollups transactions")
+
+
+def test_subzero_batch_responses_match_single():
+    from enhanced_subzero_trainer import EnhancedSubZeroTrainer
+
+    trainer = EnhancedSubZeroTrainer()
+    questions = ["How does staking work?", "What is a crypto wallet?", "Explain mining difficulty"]
+    assert trainer.find_best_responses(questions) == [trainer.find_best_response(q) for q in questions]
+    assert len(trainer.get_responses(questions)) == len(questions)
+
+
+if __name__ == "__main__":
+    test_inverted_index_matches_dense_cosine()
+    test_score_batch_matches_single_queries()
+    test_scoring_modes_batch_parity_and_range()
+    test_top_k_heap_and_argpartition_agree()
+    test_continuous_learning_adds_conversations_incrementally()
+    test_subzero_batch_responses_match_single()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the batch sentiment engine against the per-keyword substring scoring it replaces
+"""
+
+from crypto_news_insights import CryptoNewsInsights
+from sentiment_engine import LABELS, summarize
+
+
+def substring_analysis(news, text):
+    """The original scoring: one `word in text` check per keyword"""
+    text_lower = text.lower()
+    lexicons = news.sentiment_keywords
+    bull = [weight * sum(word in text_lower for word in lexicons['bullish'][level])
+            for level, weight in (('strong', 2), ('moderate', 1), ('weak', 0.5))]
+    bear = [weight * sum(word in text_lower for word in lexicons['bearish'][level])
+            for level, weight in (('strong', 2), ('moderate', 1), ('weak', 0.5))]
+    neutral = sum(word in text_lower for word in lexicons['neutral'])
+    if sum(bull) > sum(bear) + neutral:
+        label = ('bullish', 'strong' if bull[0] else 'moderate' if bull[1] > bull[2] else 'weak')
+    elif sum(bear) > sum(bull) + neutral:
+        label = ('bearish', 'strong' if bear[0] else 'moderate' if bear[1] > bear[2] else 'weak')
+    else:
+        label = ('neutral', 'balanced')
+    return {
+        'sentiment': label[0], 'intensity': label[1], 'bullish_score': sum(bull), 'bearish_score': sum(bear),
+        'technical_factors': [name for name, words in news.technical_keywords.items()
+                              if any(word in text_lower for word in words)],
+        'fundamental_factors': [name for name, words in news.fundamental_keywords.items()
+                                if any(word in text_lower for word in words)],
+    }
+
+
+TEXTS = [
+    "Bitcoin surges past resistance as institutional adoption accelerates",
+    "Ethereum staking rewards see modest gains and a slight increase in volume",
+    "Altcoins plummet in a bloodbath; support at the moving average fails",
+    "Market correction deepens: fall and decline across the red board",
+    "Prices unchanged and flat in sideways consolidation with mixed signals",
+    "A dip and pullback, then a cooling period before recovery and bounce",
+    "Regulation and compliance policy: government weighs a hard fork upgrade",
+    "Analysts see a triangle pattern and head and shoulders formation",
+    "",
+]
+
+
+def test_engine_matches_substring_scoring():
+    print("🧪 Testing Sentiment Engine")
+    print("=" * 40)
+
+    news = CryptoNewsInsights()
+    texts = TEXTS + [article['title'] + ' ' + article['description']
+                     for article in news._get_mock_news('cryptocurrency', 10)]
+    for text in texts:
+        assert news.analyze_sentiment(text) == substring_analysis(news, text), text
+    print(f"✅ {len(texts)} texts score exactly as the substring checks did")
+
+    batch = news.sentiment_engine.score_batch(texts)
+    expected = [substring_analysis(news, text) for text in texts]
+    counts = batch.label_counts()
+    for code, label in enumerate(LABELS):
+        assert counts[code] == sum((a['sentiment'], a['intensity']) == label for a in expected)
+    technical, fundamental = batch.factor_counts()
+    assert technical['resistance'] == sum('resistance' in a['technical_factors'] for a in expected)
+    assert 'market_structure' not in fundamental
+    stored_counts, stored_technical, stored_fundamental = summarize(expected)
+    assert stored_counts.tolist() == counts.tolist()
+    assert (stored_technical, stored_fundamental) == (technical, fundamental)
+    print("✅ Batch label and factor counts match the per-article results")
+
+
+def test_acronyms_match_whole_words():
+    news = CryptoNewsInsights(fetch_news=lambda: [])  # insights come from the demo pool, offline
+    assert news.analyze_sentiment("SEC reviews spot Bitcoin ETF")['fundamental_factors'] == \
+        ['regulation', 'market_structure']
+    assert news.analyze_sentiment("Second sector rally")['fundamental_factors'] == []
+    insights = news.get_market_insights()
+    assert 'COMPREHENSIVE MARKET ANALYSIS' in insights
+    print("✅ Acronym keywords match whole words only")
+
+
+if __name__ == "__main__":
+    test_engine_matches_substring_scoring()
+    test_acronyms_match_whole_words()
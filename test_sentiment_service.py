@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the shared, memoized VADER sentiment service
+"""
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from sentiment_service import CRYPTO_KEYWORDS, SentimentService, get_sentiment_service
+
+HEADLINES = [
+    "Bitcoin to the moon as bulls rally behind a diamond hands crowd",
+    "Panic sell off: altcoins crash and dump amid FUD",
+    "Ethereum developers schedule a routine network upgrade",
+    "Traders buy the dip while bears warn of further decline",
+]
+
+
+def per_call_score(text):
+    """The dashboard's original scoring: a fresh analyzer and a keyword loop per call"""
+    scores = SentimentIntensityAnalyzer().polarity_scores(text)
+    text_lower = text.lower()
+    keyword_score = sum(0.1 for word in CRYPTO_KEYWORDS['positive'] if word in text_lower)
+    keyword_score -= sum(0.1 for word in CRYPTO_KEYWORDS['negative'] if word in text_lower)
+    return {'compound': max(-1, min(1, scores['compound'] + keyword_score)),
+            'positive': scores['pos'], 'negative': scores['neg'], 'neutral': scores['neu']}
+
+
+def test_matches_per_call_scoring_and_memoizes():
+    print("🧪 Testing Sentiment Service")
+    print("=" * 40)
+
+    service = SentimentService(cache_size=3)
+    results = service.score_batch(HEADLINES + HEADLINES[:1])
+    for text, result in zip(HEADLINES + HEADLINES[:1], results):
+        expected = per_call_score(text)
+        assert abs(result['compound'] - expected['compound']) < 1e-9
+        assert result['positive'] == expected['positive'] and result['neutral'] == expected['neutral']
+    assert service.scored == 4  # the repeat inside the batch was scored once
+    print("✅ Scores match the per-call analyzer with keyword adjustments")
+
+    results[3]['compound'] = 99  # callers get copies
+    assert service.score(HEADLINES[3])['compound'] != 99 and service.scored == 4
+    assert len(service.cache) == 3  # bounded LRU
+    service.score(HEADLINES[0])
+    assert service.scored == 5  # evicted, so scored again
+    assert get_sentiment_service() is get_sentiment_service()
+    print("✅ Results memoized in a bounded LRU; one shared analyzer")
+
+
+def test_news_articles_scored_in_one_batch():
+    from crypto_news_insights import CryptoNewsInsights
+    news = CryptoNewsInsights()
+    articles = news._score_articles(news._get_mock_news('cryptocurrency', 5))
+    assert all(-1 <= article['sentiment_score'] <= 1 for article in articles)
+    before = get_sentiment_service().scored
+    news._score_articles(news._get_mock_news('cryptocurrency', 5))
+    assert get_sentiment_service().scored == before  # same headlines come from the cache
+    print("✅ News articles carry cached VADER scores")
+
+
+if __name__ == "__main__":
+    test_matches_per_call_scoring_and_memoizes()
+    test_news_articles_scored_in_one_batch()